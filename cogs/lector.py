@@ -1,17 +1,26 @@
+import asyncio
 import datetime
-import re
 import typing
 
 import discord
 from discord.ext import commands, tasks
 
+from helpers import delivery, embed_layout, schedule, webhook
+from helpers.bot_config import Config
+from helpers.cleanup import CleanupQueue
 from helpers.logger import get_logger
 from helpers.repositories import (
     init_database_schema,
+    ChannelFailuresRepository,
+    DeliveryOutboxRepository,
     GuildSettingsRepository,
     SubscriptionsRepository,
+    WebhooksRepository,
 )
-from helpers import bible_url
+from helpers.fetcher import Priority
+from helpers.push_plan import PushPlan
+from helpers.render_cache import RenderCache, RenderKey
+from helpers.schedule import Schedule
 from lectionary.registry import registry
 
 _logger = get_logger(__name__)
@@ -19,17 +28,57 @@ _logger = get_logger(__name__)
 
 class LectionaryCog(commands.Cog):
     MAX_SUBSCRIPTIONS = 10
+    # Default delivery time (hour, UTC) for new guilds
     EARLIEST_TIME = 0
-    LATEST_TIME = 23
+    # Longest a push's deliveries are spread over (minutes), so they land
+    # close to the guild's chosen minute
+    MAX_PUSH_WINDOW = 15
+    # Content refreshed ahead of a push must still be fresh when it starts
+    MAX_REFRESH_LEAD = 25
+    # Longest the push loop sleeps before checking the schedule again
+    MAX_IDLE = datetime.timedelta(hours=1)
+    # Deliveries due longer ago than this (e.g. while the bot was down) are skipped
+    MAX_LATENESS = datetime.timedelta(hours=1)
+    # Seconds the push loop waits after a failure (e.g. the database is down),
+    # doubling with each failure in a row up to the maximum
+    LOOP_RETRY_SECONDS = 30
+    MAX_LOOP_RETRY_SECONDS = 600
+    # Days of delivery history kept in the outbox
+    OUTBOX_RETENTION_DAYS = 7
+    # Unsubscribe a channel after this many pushes in a row failed permanently
+    PRUNE_AFTER_FAILURES = 3
+    # How often queued guild/channel removals are applied, and how often the
+    # database is fully reconciled against the guilds the bot can see
+    CLEANUP_MINUTES = 5
+    RECONCILE_HOURS = 6
 
     def __init__(self, bot):
-        self.last_fulfill = None
         self.bot = bot
+        self.render_cache = RenderCache()
+        self.webhook_cache = RenderCache()
+        self.webhooks = webhook.WebhookClient()
+        config = Config()
+        self.push_concurrency = config.push_concurrency
+        self.push_mode = config.push_mode
+        self.push_window = min(config.push_window, self.MAX_PUSH_WINDOW) * 60
+        self.refresh_lead = datetime.timedelta(minutes=min(config.refresh_lead, self.MAX_REFRESH_LEAD))
+        # Pushes in progress, by the time they're for
+        self._pushes = {}
+        # Push loop iterations that failed in a row
+        self._loop_failures = 0
+        # Today's push plan; rebuilt when the day or a schedule changes
+        self._plan = None
+        # Delivery jobs prepared from the plan, by the slot they're for
+        self._prepared = {}
+        # Set when a guild's schedule changes, so the push loop re-reads it
+        self._schedule_changed = asyncio.Event()
+        # Guilds the bot left and channels that were deleted, waiting for the next cleanup
+        self.cleanup = CleanupQueue(GuildSettingsRepository.delete_many, self._purge_channels)
 
         self._init_sql_commands()
         self._start_event_loop()
 
-        _logger.debug(f'Bot booted. Will not fulfill subscriptions for {self.last_fulfill}:00 GMT or prior.')
+        _logger.debug('Bot booted. Pending deliveries will resume from the outbox.')
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -37,6 +86,18 @@ class LectionaryCog(commands.Cog):
         _logger.info(f'Guilds: {", ".join([g.name for g in self.bot.guilds])}')
         _logger.info(f'Commands: {", ".join([c.name for c in self.bot.commands])}')
 
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        self.cleanup.guild_joined(guild.id, (channel.id for channel in guild.channels))
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.cleanup.guild_removed(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self.cleanup.channel_deleted(channel.id)
+
     @commands.Cog.listener()
     async def on_command_error(self, ctx, error):
         _logger.error(f'Error in {ctx.command}: {str(error)}')
@@ -45,18 +106,29 @@ class LectionaryCog(commands.Cog):
             await ctx.send(f'You need the following permission(s): {", ".join(error.missing_permissions)}')
     
     def _start_event_loop(self):
-        # Start up the event loop
-        self.last_fulfill = datetime.datetime.utcnow().hour
+        # The push loop sleeps until the next subscription is due. The outbox
+        # records what was already delivered, so an interrupted push is
+        # resumed (see before_fulfill_subscriptions) rather than skipped.
         self.fulfill_subscriptions.start()
+        self.apply_cleanup.start()
+        self.reconcile.start()
+
+    def _stop_event_loops(self):
+        self.fulfill_subscriptions.stop()
+        self.apply_cleanup.stop()
+        self.reconcile.stop()
+        for task in self._pushes.values():
+            task.cancel()
 
     @staticmethod
     def _init_sql_commands():
         """Initialize database schema using the repository."""
         init_database_schema()
 
-    def regenerate_all(self):
-        """Regenerate all lectionaries using the registry."""
-        registry.regenerate_all()
+    @staticmethod
+    async def regenerate_all():
+        """Regenerate all lectionaries using the registry (off the event loop)."""
+        await registry.regenerate_all_async()
 
     @staticmethod
     def _index_lectionary_name(lectionary):
@@ -84,13 +156,9 @@ class LectionaryCog(commands.Cog):
         index = self._index_lectionary_name(lec)
 
         if index > -1:
-            lectionary = registry.get(index)
-            if lectionary is None:
+            if not await self.send_lectionary(ctx, index):
                 await ctx.message.add_reaction('❌')
                 await ctx.send("Lectionary failed. Please report to the bot owner (@Tarkavor) for assistance.")
-                return
-
-            await self.send_lectionary(ctx, lectionary)
         else:
             await ctx.send('You didn\'t specify a valid lectionary.\n\nCurrent options are:\n'
                            '\"Armenian\" (shortcut `a`)\n'
@@ -110,93 +178,48 @@ class LectionaryCog(commands.Cog):
         return ' '.join(lec).lower()
 
     @staticmethod
-    def _truncate_title(title, max_length=256):
-        if len(title) <= max_length:
-            return title
-        
-        suffix = " ... [truncated]"
-        suffix_length = len(suffix)
-        truncated_length = max_length - suffix_length
-        return f"{title[:truncated_length]}{suffix}"
-
-    @staticmethod
-    def _inject_combined_link(piece):
+    def _prepare_payload(embed, combined_links):
         """
-        Inject a combined Bible Gateway link into an embed piece.
-        
-        Extracts all Bible references from the fields and/or description
-        and adds a combined link at the top of the description.
+        Get the payload to send for a rendered embed, with the combined link
+        added if enabled. Discord's size limits are applied when packing.
         """
-        # Collect text from both fields and description
-        all_refs_text = ''
-        
-        # Check fields if present
-        if 'fields' in piece:
-            all_refs_text += ' '.join(field.get('value', '') for field in piece['fields'])
-        
-        # Also check description (some lectionaries like Armenian put readings here)
-        if 'description' in piece:
-            all_refs_text += ' ' + piece.get('description', '')
-        
-        if not all_refs_text.strip():
-            return piece
-        
-        # Extract references from markdown links: [Reference](url)
-        markdown_refs = re.findall(r'\[([^\]]+)\]\(https://biblegateway\.com/passage/\?search=', all_refs_text)
-        
-        if not markdown_refs:
-            return piece
-        
-        # Build combined URL from the extracted references
-        combined_link = bible_url.build_combined_url(markdown_refs, "Read all on Bible Gateway")
-        
-        if combined_link:
-            # If embed uses fields, add as a new field at the end
-            # If embed uses description only, append to description
-            if 'fields' in piece and piece['fields']:
-                piece['fields'].append({
-                    'name': '─────────────────────',
-                    'value': combined_link,
-                    'inline': False
-                })
-            else:
-                # Append to description (for lectionaries like Armenian)
-                current_desc = piece.get('description', '')
-                if current_desc:
-                    piece['description'] = f"{current_desc}\n\n─────────────────────\n{combined_link}"
-                else:
-                    piece['description'] = combined_link
-        
-        return piece
+        return embed.with_combined_link() if combined_links else embed.payload
 
-    async def send_lectionary(self, ctx, lectionary, combined_links_enabled=None):
+    async def send_lectionary(self, ctx, index, combined_links_enabled=None):
         """
         Send lectionary embeds to a context.
-        
+
+        Embeds are streamed: if the lectionary has to be regenerated, the
+        ones it produces early (e.g. Catholic's first page) are sent while
+        the rest is still loading.
+
         Args:
             ctx: Discord context
-            lectionary: The lectionary object
+            index: The lectionary index
             combined_links_enabled: Override for combined links setting. 
                                    If None, uses guild setting.
+
+        Returns:
+            False if there was no such lectionary, otherwise True (errors
+            are reported to the context)
         """
         try:
             # Determine if combined links should be shown
             if combined_links_enabled is None:
                 combined_links_enabled = GuildSettingsRepository.get_combined_links(ctx.guild.id)
-            
-            for piece in lectionary.build_json():
-                if 'title' in piece and piece['title']:
-                    piece['title'] = self._truncate_title(piece['title'])
-                
-                # Inject combined link if enabled
-                if combined_links_enabled:
-                    piece = self._inject_combined_link(piece)
-                
-                await ctx.send(embed=discord.Embed.from_dict(piece))
+
+            found = False
+            async for batch in registry.stream_async(index):
+                found = True
+                pieces = [self._prepare_payload(embed, combined_links_enabled) for embed in batch]
+                for message in embed_layout.pack(pieces):
+                    await ctx.send(embeds=[discord.Embed.from_dict(piece) for piece in message])
+            return found
         except Exception as e:
             error_msg = f"Error: please contact <@239877908435435520> for assistance\nDetails: {str(e)}"
             await ctx.send(error_msg)
             _logger.error(f"Error in send_lectionary: {str(e)}", exc_info=True)
+            return True
     
     '''SUBSCRIPTION COMMANDS'''
 
@@ -208,45 +231,49 @@ class LectionaryCog(commands.Cog):
         else:
             await self._update_guild_time(ctx, time)
 
-    @staticmethod
-    async def _send_current_time(ctx):
-        now = datetime.datetime.utcnow()
-        output = now.strftime(f'It is currently: %A, %B {now.day}, %Y, %I:%M:%S %p (GMT).')
+    async def _send_current_time(self, ctx):
+        current = self._get_schedule(ctx.guild.id)
+        now = datetime.datetime.now(current.zone)
+        output = now.strftime(f'It is currently: %A, %B {now.day}, %Y, %I:%M:%S %p ({current.label}).')
         await ctx.send(output)
 
     async def _update_guild_time(self, ctx, time):
-        time = self._parse_time(time)
-        if time is not None:
-            guild_id = ctx.guild.id
-            self._update_guild_settings(guild_id, time)
-            await ctx.send(f'The guild\'s subscriptions will come {time}:00 GMT daily.')
-        else:
-            await ctx.send('You didn\'t specify a valid time.')
-
-    def _parse_time(self, time):
-        # If the user specified an integer, it's possibly 24-hour time
-        if time.isdigit():
-            time = int(time)
-        # If a meridiem was possibly specified
-        else:
-            time = time.lower()
-            match = re.search(r'([0-9]+) *(am|pm)', time)
-            if match:
-                time = int(match.group(1))
-                if match.group(2) == 'pm':
-                    time += 12
-            else:
-                return None
-
-        if not (self.EARLIEST_TIME <= time <= self.LATEST_TIME):
-            return None
-
-        return time
+        parsed = schedule.parse_time(time)
+        if parsed is None:
+            await ctx.send('You didn\'t specify a valid time. For example: `7:30 am America/New_York`')
+            return
 
-    @staticmethod
-    def _update_guild_settings(guild_id, time):
-        """Update or create guild settings using the repository."""
-        GuildSettingsRepository.set_time(guild_id, time)
+        guild_id = ctx.guild.id
+        if not parsed.timezone:
+            # Keep the guild's time zone unless a new one was given
+            parsed = parsed._replace(timezone=self._get_schedule(guild_id).timezone)
+        GuildSettingsRepository.set_schedule(guild_id, parsed)
+        self._reschedule(guild_id)
+        await ctx.send(f'The guild\'s subscriptions will come daily at {parsed.describe()}.')
+
+    def _get_schedule(self, guild_id):
+        """Get a guild's delivery schedule (the default if it has none)."""
+        return GuildSettingsRepository.get_schedule(guild_id) or Schedule(self.EARLIEST_TIME)
+
+    def _reschedule(self, guild_id):
+        """Recompute when a guild's subscriptions are next due, and wake the push loop."""
+        next_fire = self._get_schedule(guild_id).next_fire(datetime.datetime.utcnow())
+        SubscriptionsRepository.set_next_fire(guild_id, next_fire)
+        self._invalidate_plan()
+        self._schedule_changed.set()
+
+    def _invalidate_plan(self, channel_ids=()):
+        """
+        Rebuild the push plan when it's next needed, and drop any jobs already
+        prepared for some channels (e.g. after their guild changed a setting
+        or they unsubscribed). Their deliveries are then prepared afresh from
+        the outbox, or not at all if they're gone.
+        """
+        self._plan = None
+        channel_ids = set(channel_ids)
+        if channel_ids:
+            for due, jobs in self._prepared.items():
+                self._prepared[due] = [job for job in jobs if job.key not in channel_ids]
 
     @commands.command(aliases=['combined'])
     @commands.has_permissions(administrator=True)
@@ -278,11 +305,13 @@ class LectionaryCog(commands.Cog):
             elif toggle.lower() in ('on', 'true', 'yes', 'enable', '1'):
                 _logger.debug("Setting combined_links to True...")
                 GuildSettingsRepository.set_combined_links(guild_id, True)
+                self._invalidate_plan(channel.id for channel in ctx.guild.channels)
                 await ctx.send('Combined Bible Gateway links have been **enabled**. '
                                'Lectionary readings will now include a "Read all on Bible Gateway" link.')
             elif toggle.lower() in ('off', 'false', 'no', 'disable', '0'):
                 _logger.debug("Setting combined_links to False...")
                 GuildSettingsRepository.set_combined_links(guild_id, False)
+                self._invalidate_plan(channel.id for channel in ctx.guild.channels)
                 await ctx.send('Combined Bible Gateway links have been **disabled**. '
                                'Lectionary readings will show only individual reading links.')
             else:
@@ -338,6 +367,7 @@ class LectionaryCog(commands.Cog):
         
         # Add subscription
         SubscriptionsRepository.add(guild_id, channel_id, sub_type)
+        self._reschedule(guild_id)
         await ctx.send(f'<#{channel_id}> has been subscribed to the {sub_name} lectionary.')
 
     @commands.command(aliases=['unsub'])
@@ -347,6 +377,7 @@ class LectionaryCog(commands.Cog):
         if (channel is None) and (lectionary is None):
             # Remove all the guild's subscriptions (cascades via foreign key)
             GuildSettingsRepository.delete(ctx.guild.id)
+            self._invalidate_plan(channel.id for channel in ctx.guild.channels)
             await ctx.send(f'All subscriptions for {ctx.guild.name} have been removed.')
 
         elif isinstance(channel, discord.TextChannel):
@@ -354,6 +385,7 @@ class LectionaryCog(commands.Cog):
 
             if lectionary is None:
                 SubscriptionsRepository.delete_for_channel(channel_id)
+                self._invalidate_plan([channel_id])
                 await ctx.send(f'<#{channel_id}> has been unsubscribed from all lectionaries.')
             else:
                 sub_type = self._index_lectionary_name(lectionary)
@@ -363,6 +395,7 @@ class LectionaryCog(commands.Cog):
                     return
 
                 SubscriptionsRepository.delete_for_channel(channel_id, sub_type)
+                self._invalidate_plan([channel_id])
                 await ctx.send(
                     f'<#{channel_id}> has been unsubscribed from the {registry.get_name(sub_type).title()} lectionary.')
 
@@ -374,21 +407,21 @@ class LectionaryCog(commands.Cog):
         Helper method to generate an embed listing the subscriptions for a
         guild given the guild id.
         """
-        time, subscriptions = self._get_subscriptions(ctx)
-        embed = self._create_embed(ctx, time, subscriptions)
+        current, subscriptions = self._get_subscriptions(ctx)
+        embed = self._create_embed(ctx, current, subscriptions)
         return embed
 
     def _get_subscriptions(self, ctx):
         """Get subscriptions for a guild using the repository."""
-        time = GuildSettingsRepository.get_time(ctx.guild.id)
-        if time is None:
-            time = self.EARLIEST_TIME
-            GuildSettingsRepository.ensure_exists(ctx.guild.id, time)
+        current = GuildSettingsRepository.get_schedule(ctx.guild.id)
+        if current is None:
+            current = Schedule(self.EARLIEST_TIME)
+            GuildSettingsRepository.ensure_exists(ctx.guild.id, current.hour)
         
         subscriptions = SubscriptionsRepository.get_for_guild(ctx.guild.id)
-        return time, subscriptions
+        return current, subscriptions
 
-    def _create_embed(self, ctx, time, subscriptions):
+    def _create_embed(self, ctx, current, subscriptions):
         embed = discord.Embed(title=f'Subscriptions for {ctx.guild.name}')
         if subscriptions:
             embed.description = ''
@@ -397,12 +430,17 @@ class LectionaryCog(commands.Cog):
                 sub_name = registry.get_name(subscription[2]).title()
                 embed.description += f'\n<#{channel_id}> - {sub_name} lectionary'
 
-            embed.set_footer(text=f'(Daily @ {time}:00 GMT)')
+            embed.set_footer(text=f'(Daily @ {current.describe()})')
         else:
             embed.description = 'There are none'
 
         return embed
 
+    async def cog_unload(self):
+        self._stop_event_loops()
+        self._flush_cleanup()
+        await self.webhooks.close()
+
     '''SYSTEM COMMANDS'''
 
     @commands.command()
@@ -413,7 +451,10 @@ class LectionaryCog(commands.Cog):
         damaging the database. (Bot owner only.)
         """
         try:
-            self.fulfill_subscriptions.stop()
+            self._stop_event_loops()
+            self._flush_cleanup()
+            registry.shutdown()
+            await self.webhooks.close()
             await ctx.message.add_reaction('✅')
             _logger.debug('Shutdown request, logging out')
             await ctx.bot.close()
@@ -423,100 +464,429 @@ class LectionaryCog(commands.Cog):
 
     @commands.command()
     @commands.is_owner()
-    async def push(self, ctx, current_hour: int = datetime.datetime.utcnow().hour):
-        _logger.debug(f'Manual subscription push requested for {current_hour}:00 GMT')
+    async def push(self, ctx):
+        """Push every subscription that is due or still pending now."""
+        _logger.debug('Manual subscription push requested')
 
         try:
-            if self.EARLIEST_TIME <= current_hour <= self.LATEST_TIME:
-                # Regenerate all if it's the earliest time
-                self.regenerate_all()
-
-                await ctx.message.add_reaction('✅')
-                await self.push_subscriptions(current_hour)
-            else:
-                await ctx.message.add_reaction('❌')
-                _logger.debug(f'Push failed. current_hour={current_hour} is outside the acceptable range.')
+            await self.regenerate_all()
+            await ctx.message.add_reaction('✅')
+            now = datetime.datetime.utcnow()
+            self._fire_schedules(now)
+            await self.push_subscriptions(now)
         except Exception as e:
             _logger.debug(f'An error occurred during push: {e}')
             await ctx.send(f'An error occurred during push: {e}')
 
+    @commands.command()
+    @commands.is_owner()
+    async def plan(self, ctx):
+        """Show today's push plan: the deliveries and renders due in each hour. (Bot owner only.)"""
+        summary = self._get_plan(datetime.datetime.utcnow().date()).summary()
+        await ctx.send(f'```\n{embed_layout.truncate(summary, 1900)}\n```')
+
     '''SUBSCRIPTIONS TASK LOOP'''
 
-    @tasks.loop(minutes=10)
+    @tasks.loop(seconds=0)  # Each iteration sleeps until the next subscription is due
     async def fulfill_subscriptions(self):
-        # Push the current hour's subscriptions if they haven't been already
-        current_hour = datetime.datetime.utcnow().hour
+        # An exception escaping a tasks.loop stops it for good, so one
+        # database hiccup mustn't end every scheduled push
+        try:
+            await self._run_schedule()
+            self._loop_failures = 0
+        except Exception as e:
+            delay = min(self.LOOP_RETRY_SECONDS * 2 ** self._loop_failures, self.MAX_LOOP_RETRY_SECONDS)
+            self._loop_failures += 1
+            _logger.error(f'Push loop failed, retrying in {delay}s: {e}', exc_info=True)
+            await asyncio.sleep(delay)
+
+    async def _run_schedule(self):
+        """Wait for the next subscription that is due, then refresh and push."""
+        # Subscriptions from before schedules were stored (or whose reschedule
+        # failed) have no next_fire yet
+        now = datetime.datetime.utcnow()
+        for guild_id, guild_schedule in SubscriptionsRepository.get_unscheduled():
+            SubscriptionsRepository.set_next_fire(guild_id, guild_schedule.next_fire(now))
+
+        due = SubscriptionsRepository.next_fire()
+        # Plan the day once it starts
+        self._get_plan(now.date())
+        if due is None or due - self.refresh_lead > now + self.MAX_IDLE:
+            await self._sleep_until(now + self.MAX_IDLE)
+            return
 
-        if (self.EARLIEST_TIME <= current_hour <= self.LATEST_TIME) and (self.last_fulfill != current_hour):
-            _logger.debug(f"Starting to fulfill subscriptions for {current_hour} hour")
-            # Make sure the lectionary embeds are updated for the day
-            self.regenerate_all()
+        # Refresh the lectionaries ahead of time, then push right on time
+        if not await self._sleep_until(due - self.refresh_lead):
+            return
+        await self.regenerate_all()
+        await self._prepare_slot(due)
+        if not await self._sleep_until(due):
+            return
 
-            try:
-                await self.push_subscriptions(current_hour)
-                self.last_fulfill = current_hour
-                _logger.debug(f"Successfully fulfilled subscriptions for {current_hour} hour")
-            except Exception as e:
-                _logger.debug(f"Error during fulfilling subscriptions for {current_hour} hour: {e}")
+        # Pushes run in the background so a long push window doesn't hold up
+        # the next schedule; firing first moves next_fire on before the next tick
+        self._fire_schedules(due)
+        self._start_push(due, self.push_window)
 
     @fulfill_subscriptions.before_loop
     async def before_fulfill_subscriptions(self):
         await self.bot.wait_until_ready()
+        # Resume anything still pending (e.g. after a restart partway through
+        # a push) without holding up the schedule
+        self._start_push(datetime.datetime.utcnow(), regenerate=True)
 
-    '''SUBSCRIPTIONS HELPER METHODS'''
+    async def _sleep_until(self, when):
+        """
+        Sleep until a (naive UTC) time.
+
+        Returns:
+            False if woken early because a schedule changed, otherwise True
+        """
+        delay = (when - datetime.datetime.utcnow()).total_seconds()
+        if delay <= 0:
+            return True
+        try:
+            await asyncio.wait_for(self._schedule_changed.wait(), delay)
+        except asyncio.TimeoutError:
+            return True
+        self._schedule_changed.clear()
+        return False
+
+    def _get_plan(self, day):
+        """Get the push plan for a (UTC) day, building it if needed."""
+        if self._plan is None or self._plan.day != day:
+            rows = SubscriptionsRepository.get_scheduled_between(*PushPlan.bounds(day))
+            self._plan = PushPlan.build(day, rows)
+            _logger.debug(self._plan.summary())
+        return self._plan
+
+    async def _prepare_slot(self, due):
+        """
+        Turn a slot's planned deliveries into jobs ahead of time: resolve
+        each channel (or webhook) and render each variant once, so the
+        slot's push only sends.
+        """
+        # Slots that never fired (e.g. their guild changed its time)
+        for stale in [key for key in self._prepared if key < due]:
+            del self._prepared[stale]
+
+        slot = self._get_plan(due.date()).slot(due)
+        if slot is None:
+            return
+
+        # Each guild gets the readings for its own date, which may not be
+        # today's in UTC; fetch every one the slot needs at once
+        await asyncio.gather(*(registry.get_async(sub_type, Priority.SCHEDULED, delivery_date)
+                               for sub_type, delivery_date in slot.readings), return_exceptions=True)
+
+        known_webhooks = {}
+        if self.push_mode == 'webhook':
+            known_webhooks = WebhooksRepository.get_for_channels([entry.channel_id for entry in slot.entries])
 
-    async def _remove_deleted_guilds(self):
+        jobs = []
+        for entry in slot.entries:
+            try:
+                job = await self._prepare_job(entry.channel_id, entry.sub_type, entry.combined_links,
+                                              entry.delivery_date, known_webhooks)
+            except Exception as e:
+                # The push prepares it from the outbox instead
+                _logger.warning(f'Could not prepare push of {entry.sub_type} to {entry.channel_id}: {e}')
+                continue
+            if job is not None:
+                jobs.append(job)
+
+        self._prepared[due] = jobs
+        _logger.debug(f'Prepared {len(jobs)} of {len(slot.entries)} deliveries '
+                      f'({len(slot.variants)} variants) for {due:%H:%M} GMT')
+
+    def _start_push(self, due, window=0, regenerate=False):
+        task = asyncio.ensure_future(self._fulfill(due, window, regenerate))
+        self._pushes[due] = task
+        task.add_done_callback(lambda _: self._pushes.pop(due, None))
+
+    async def _fulfill(self, due, window=0, regenerate=False):
+        """Push what's pending in the outbox for a time, plus anything left over from earlier."""
+        _logger.debug(f'Starting to fulfill subscriptions due by {due:%H:%M} GMT')
+        try:
+            if regenerate:
+                await self.regenerate_all()
+            await self.push_subscriptions(due, window)
+            _logger.debug(f'Successfully fulfilled subscriptions due by {due:%H:%M} GMT')
+        except Exception as e:
+            # Whatever is left is still pending in the outbox for the next push
+            _logger.debug(f'Error during fulfilling subscriptions due by {due:%H:%M} GMT: {e}')
+
+    '''CLEANUP TASK LOOPS'''
+
+    @tasks.loop(minutes=CLEANUP_MINUTES)
+    async def apply_cleanup(self):
+        self._flush_cleanup()
+
+    @tasks.loop(hours=RECONCILE_HOURS)
+    async def reconcile(self):
         """
-        Purge settings of deleted guilds using the repository.
-        The ON CASCADE DELETE option also wipes subscriptions automatically.
+        Catch guilds and channels that disappeared while the bot was offline
+        (or whose events were missed), and queue them for cleanup.
         """
         guild_ids = GuildSettingsRepository.get_all_guild_ids()
-        total = len(guild_ids)
-        
-        _logger.debug(f"Checking {total} guilds for deletion")
-        
-        deleted_guild_ids = [gid for gid in guild_ids if not self.bot.get_guild(gid)]
-        
-        if deleted_guild_ids:
-            count = GuildSettingsRepository.delete_many(deleted_guild_ids)
-            _logger.debug(f'Purged {count} out of {total} guilds')
+        channel_ids = SubscriptionsRepository.get_all_channel_ids()
+        gone = self.cleanup.reconcile(guild_ids, channel_ids,
+                                      lambda guild_id: self.bot.get_guild(guild_id) is not None,
+                                      lambda channel_id: self.bot.get_channel(channel_id) is not None)
+        _logger.debug(f'Reconciled {len(guild_ids)} guilds and {len(channel_ids)} channels: '
+                      f'{gone.guilds} and {gone.channels} are gone')
+        self._flush_cleanup()
+
+    @apply_cleanup.before_loop
+    @reconcile.before_loop
+    async def before_cleanup(self):
+        await self.bot.wait_until_ready()
 
-    async def push_subscriptions(self, hour):
-        """Push lectionary embeds to all channels subscribed for this hour."""
-        await self._remove_deleted_guilds()
-        
-        subscriptions = SubscriptionsRepository.get_for_hour(hour)
-        total_subs = len(subscriptions)
-        successful_subs = 0
+    def _flush_cleanup(self):
+        """
+        Delete the settings of removed guilds (the ON CASCADE DELETE option
+        also wipes their subscriptions) and the subscriptions of deleted
+        channels, in one batch each.
+        """
+        purged = self.cleanup.flush()
+        if purged.guilds or purged.channels:
+            _logger.debug(f'Purged {purged.guilds} removed guilds and {purged.channels} subscriptions '
+                          f'of deleted channels')
+
+    @staticmethod
+    def _purge_channels(channel_ids):
+        """Delete the subscriptions, webhooks and failure counts of deleted channels."""
+        count = SubscriptionsRepository.delete_many_channels(channel_ids)
+        WebhooksRepository.delete_many(channel_ids)
+        ChannelFailuresRepository.clear(channel_ids)
+        return count
+
+    '''SUBSCRIPTIONS HELPER METHODS'''
+
+    async def _render_messages(self, index, lec, combined_links):
+        """
+        Get the messages (lists of discord.Embed objects, packed as tightly
+        as Discord allows) for a lectionary snapshot, building each
+        (lectionary, date, combined_links, version) variant only once.
+        """
+        combined_links = bool(combined_links)
+        key = RenderKey(index, lec.today, combined_links, lec.content_version)
+
+        async def build():
+            return [[discord.Embed.from_dict(piece) for piece in message]
+                    for message in await self._render_packed(lec, combined_links)]
+
+        return await self.render_cache.get(key, build)
+
+    async def _render_webhook_bodies(self, index, lec, combined_links):
+        """
+        Like _render_messages(), but serialized once per variant into JSON
+        webhook request bodies, so webhook deliveries build no objects at all.
+        """
+        combined_links = bool(combined_links)
+        key = RenderKey(index, lec.today, combined_links, lec.content_version)
+
+        async def build():
+            user = self.bot.user
+            return webhook.serialize_messages(await self._render_packed(lec, combined_links),
+                                              user.name, user.display_avatar.url)
+
+        return await self.webhook_cache.get(key, build)
+
+    async def _render_packed(self, lec, combined_links):
+        pieces = [self._prepare_payload(embed, combined_links) for embed in await registry.render_async(lec)]
+        return embed_layout.pack(pieces)
+
+    async def _get_webhook(self, channel, known):
+        """
+        Get the managed webhook for a channel, creating it if needed.
+
+        Returns:
+            The webhook, or None if it can't be created (e.g. missing the
+            Manage Webhooks permission), in which case the bot sends directly.
+            Either way the result is recorded in `known` for the rest of the push
+        """
+        if channel.id in known:
+            return known[channel.id]
+        guild = getattr(channel, 'guild', None)
+        if guild is None or not channel.permissions_for(guild.me).manage_webhooks:
+            # Creating it would only fail with Forbidden
+            return None
+        try:
+            created = await channel.create_webhook(name=self.bot.user.name, reason='Lectionary subscriptions')
+        except (discord.HTTPException, AttributeError) as e:
+            _logger.debug(f'Could not create webhook for channel {channel.id}, sending directly: {e}')
+            return None
+        managed = webhook.ManagedWebhook(channel.id, created.id, created.token)
+        WebhooksRepository.save(managed)
+        return managed
+
+    def _fire_schedules(self, through):
+        """
+        Queue a delivery for every subscription due by a time, and move each
+        one's next_fire on to its schedule's next day.
+
+        Args:
+            through: Naive UTC time
+        """
+        now = datetime.datetime.utcnow()
+        fires = SubscriptionsRepository.get_due(through)
+        # Schedules that were due long ago (e.g. the bot was down) are only moved on
+        DeliveryOutboxRepository.enqueue([(guild_id, fired, guild_schedule.local_date(fired))
+                                          for guild_id, guild_schedule, fired in fires
+                                          if fired > now - self.MAX_LATENESS])
+        SubscriptionsRepository.advance([(guild_id, fired, guild_schedule.next_fire(max(fired, now)))
+                                         for guild_id, guild_schedule, fired in fires])
+        DeliveryOutboxRepository.delete_before(now.date() - datetime.timedelta(days=self.OUTBOX_RETENTION_DAYS))
+
+    async def _prepare_job(self, channel_id, sub_type, combined_links, delivery_date, known_webhooks):
+        """
+        Resolve a delivery's target and render its messages.
+
+        Args:
+            known_webhooks: Managed webhooks by channel ID (webhook mode);
+                            updated with any created or found missing
+
+        Returns:
+            The delivery job, or None if there's nothing to send (the channel
+            was deleted or the lectionary has no content)
+        """
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            # Deleted; removed by the next cleanup
+            self.cleanup.channel_deleted(channel_id)
+            return None
+
+        lec = await registry.get_async(sub_type, Priority.SCHEDULED, delivery_date)
+        if not lec:
+            return None
+
+        managed = None
+        if self.push_mode == 'webhook':
+            managed = known_webhooks[channel_id] = await self._get_webhook(channel, known_webhooks)
+        if managed is not None:
+            target = managed
+            messages = await self._render_webhook_bodies(sub_type, lec, combined_links)
+        else:
+            target = channel
+            messages = await self._render_messages(sub_type, lec, combined_links)
+        return delivery.DeliveryJob(channel_id, target, messages, tag=(channel_id, sub_type, delivery_date))
+
+    async def push_subscriptions(self, due, window=0):
+        """
+        Push lectionary embeds to every channel with a pending delivery due by a time.
+
+        The slot's jobs prepared from the push plan are sent as they are;
+        anything else pending in the outbox is prepared here.
+
+        Args:
+            due: Naive UTC time
+            window: Seconds to spread the deliveries due exactly then over
+                    (0 sends them all now)
+        """
+        prepared = self._prepared.pop(due, [])
+        planned = {job.tag for job in prepared}
+
+        since = datetime.datetime.utcnow() - self.MAX_LATENESS
+        # Each pending row is a tuple: (channel_id, sub_type, combined_links, due_at, delivery_date).
+        # Deliveries another push in progress is spreading out are left to it.
+        pending = [row for row in DeliveryOutboxRepository.get_pending(since, due)
+                   if (row[0], row[1], row[4]) not in planned
+                   and (row[3] == due or row[3] not in self._pushes)]
+        total_subs = len(prepared) + len(pending)
 
         if total_subs > 0:
-            _logger.debug(f"Preparing to push {total_subs} subscription(s) for {hour}:00 GMT")
-
-        # Each subscription is a tuple: (channel_id, sub_type, combined_links)
-        for channel_id, sub_type, combined_links in subscriptions:
-            channel = self.bot.get_channel(channel_id)
-
-            if channel:
-                lec = registry.get(sub_type)
-                if lec:
-                    feed = lec.build_json()
-                    for item in feed:
-                        if 'title' in item and item['title']:
-                            item['title'] = self._truncate_title(item['title'])
-                        
-                        # Inject combined link if enabled for this guild
-                        if combined_links:
-                            item = self._inject_combined_link(item)
-                        
-                        await channel.send(embed=discord.Embed.from_dict(item))
-                    successful_subs += 1
-            else:
-                # Channel was deleted, remove subscription
-                SubscriptionsRepository.delete_by_channel_id(channel_id)
+            _logger.debug(f"Preparing to push {total_subs} subscription(s) due by {due:%H:%M} GMT "
+                          f"({len(prepared)} prepared from the plan)")
+
+        known_webhooks = {}
+        if self.push_mode == 'webhook' and pending:
+            known_webhooks = WebhooksRepository.get_for_channels([row[0] for row in pending])
 
-        if successful_subs > 0:
+        jobs = list(prepared)
+        overdue = []
+        for channel_id, sub_type, combined_links, due_at, delivery_date in pending:
+            try:
+                job = await self._prepare_job(channel_id, sub_type, combined_links, delivery_date, known_webhooks)
+            except Exception as e:
+                # Left pending for the next tick; don't hold up everyone else
+                _logger.error(f'Could not prepare push of {sub_type} to {channel_id}: {e}', exc_info=True)
+                continue
+            if job is not None:
+                # Jobs left over from an earlier push go out right away
+                (jobs if due_at == due else overdue).append(job)
+
+        # Would only fail with Forbidden; counts as a failed delivery without the API call
+        refused = set()
+        for job in jobs + overdue:
+            if not isinstance(job.target, webhook.ManagedWebhook) and not self._can_send(job.target):
+                refused.add(job.key)
+                DeliveryOutboxRepository.settle(*job.tag, False)
+        jobs = [job for job in jobs if job.key not in refused]
+        overdue = [job for job in overdue if job.key not in refused]
+
+        # The window isn't shrunk for small pushes, so a channel keeps its
+        # place in it however many others share its slot
+        elapsed = max(0.0, (datetime.datetime.utcnow() - due).total_seconds())
+        jobs = overdue + delivery.plan(jobs, window, elapsed)
+        report = await delivery.deliver(
+            jobs, self._send_message, self.push_concurrency,
+            claim=lambda job: DeliveryOutboxRepository.claim(*job.tag),
+            settle=lambda job, succeeded: DeliveryOutboxRepository.settle(*job.tag, succeeded),
+            classify=self._classify_failure)
+
+        self._prune_failing_channels(refused.union(report.failed_keys(delivery.Failure.PERMANENT)),
+                                     report.delivered_keys)
+
+        if report.delivered > 0 or report.failed > 0:
             _logger.debug(
-                f'Successfully pushed {successful_subs} out of {total_subs} subscriptions for {hour}:00 GMT')
+                f'Pushed {report.delivered} out of {total_subs} subscriptions due by {due:%H:%M} GMT '
+                f'({len(refused)} channels lacked permissions): {report.summary()}')
+
+    @staticmethod
+    def _can_send(channel):
+        """Check, from the cached permission state, that the bot can post embeds in a channel."""
+        guild = getattr(channel, 'guild', None)
+        if guild is None:
+            return True
+        permissions = channel.permissions_for(guild.me)
+        return permissions.view_channel and permissions.send_messages and permissions.embed_links
+
+    @staticmethod
+    def _classify_failure(error):
+        """Tell what kind of delivery failure an exception from _send_message() is."""
+        if isinstance(error, (discord.Forbidden, discord.NotFound)):
+            return delivery.Failure.PERMANENT
+        if isinstance(error, webhook.WebhookRateLimited) or (
+                isinstance(error, discord.HTTPException) and error.status == 429):
+            return delivery.Failure.RATE_LIMITED
+        # Everything else, including a deleted webhook (recreated next push)
+        return delivery.Failure.TRANSIENT
+
+    def _prune_failing_channels(self, failed, delivered):
+        """
+        Count permanent failures per channel and unsubscribe channels that
+        keep failing, in one batch. Delivering to a channel resets its count.
+        """
+        ChannelFailuresRepository.clear(list(delivered))
+        counts = ChannelFailuresRepository.record(list(failed))
+        dead = [channel_id for channel_id, count in counts.items() if count >= self.PRUNE_AFTER_FAILURES]
+        if dead:
+            removed = SubscriptionsRepository.delete_many_channels(dead)
+            ChannelFailuresRepository.clear(dead)
+            _logger.debug(f'Pruned {removed} subscriptions from {len(dead)} channels that kept failing')
+
+    async def _send_message(self, target, message):
+        """Send one packed message, either as a webhook body or through the channel."""
+        if isinstance(target, webhook.ManagedWebhook):
+            try:
+                await self.webhooks.execute(target, message)
+            except webhook.WebhookGone:
+                # Deleted by someone in the guild; a new one is created next time
+                WebhooksRepository.delete(target.channel_id)
+                raise
+        else:
+            await target.send(embeds=message)
 
 
 async def setup(bot):
@@ -3,7 +3,399 @@ Bible reference normalization utilities.
 
 This module consolidates reference-cleaning logic used by different lectionaries
 to normalize Bible book abbreviations to their full names.
+
+It also provides the structured reference parser: parse() turns a reference
+string into a compact BibleReference record (canonical book IDs, chapter and
+verse ranges, deuterocanon flag) that the link builders in bible_url render
+from, instead of each re-scanning the string.
 """
+import json
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+def load_json(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+REPLACEMENTS = load_json('helpers/replacements.json')
+ABBREVIATIONS = load_json('helpers/abbreviations.json')
+DEUTEROCANON = load_json('helpers/deuterocanon.json')
+
+# Canonical book IDs: Bible Gateway codes in the order they first appear in
+# abbreviations.json (Old Testament, deuterocanon, New Testament)
+BOOK_CODES: Tuple[str, ...] = tuple(dict.fromkeys(ABBREVIATIONS.values()))
+BOOK_IDS = {code: book_id for book_id, code in enumerate(BOOK_CODES)}
+DEUTEROCANON_IDS = frozenset(BOOK_IDS[code] for code in DEUTEROCANON)
+
+# Source-specific spellings that aren't in abbreviations.json
+BOOK_ALIASES = {
+    'Azariah': 'Prayer of Azariah',
+}
+ROMAN_ORDINALS = {'I': '1', 'II': '2', 'III': '3', 'IV': '4'}
+
+# Full names come first so 'Prayer of Azariah' isn't expanded a second time
+_DISPLAY_PATTERN = re.compile(
+    r'\b(?:(?P<ordinal>IV|I{1,3}) (?=[A-Za-z])|'
+    + '|'.join(re.escape(name) for name in list(BOOK_ALIASES.values()) + list(BOOK_ALIASES))
+    + r')\b')
+
+
+def _book_key(name):
+    """Lookup key for a book name or code: title-cased, spaces removed."""
+    return name.title().replace(' ', '')
+
+
+# Full names first, then Bible Gateway codes ('1Sa', 'Ps', ...) as fallbacks
+_BOOK_LOOKUP = {_book_key(name): BOOK_IDS[code] for name, code in ABBREVIATIONS.items()}
+for _code, _book_id in BOOK_IDS.items():
+    _BOOK_LOOKUP.setdefault(_book_key(_code), _book_id)
+
+# Tokenizer for the cleanup applied before parsing. One scan handles, in
+# order of precedence at each position:
+#   - REPLACEMENTS entries (longest first)
+#   - alternative chapter numbers in brackets: '4[2] Kings' => '2 Kings'
+#   - letter subreferences on verses: '2:8ABCD' => '2:8'
+CLEANUP_PATTERN = re.compile(
+    '(?P<replacement>'
+    + '|'.join(re.escape(item) for item in sorted(REPLACEMENTS, key=len, reverse=True))
+    + r')|(?P<bracket>[0-9]+\[(?P<alternative>[0-9]+)])'
+    + r'|(?P<number>[0-9]+)(?P<letters>[a-zA-Z]+)'
+)
+
+# '1 Samuel 2:8' => book '1 Samuel', passage '2:8'. A segment without a book
+# (e.g. '2:3' after a semicolon) continues the previous book.
+SEGMENT_PATTERN = re.compile(
+    r"^\s*(?P<book>(?:(?:[1-4]|I{1,3}|IV) ?)?[A-Za-z][A-Za-z .']*?)\s*(?P<passage>[0-9].*)?$",
+    re.DOTALL)
+
+# Where one book's passage ends and the next begins: every semicolon, and a
+# comma followed by a book name ('Matthew 1:1, Luke 2:3' but not '1:1, 10')
+BOOK_SEPARATOR_PATTERN = re.compile(r'(;|,(?=\s*(?:[1-4] ?)?[A-Za-z]))')
+
+# One comma/semicolon-separated chunk of a passage: '3', '3-4', '1:1',
+# '1:1-5', '1:1-2:5', or (after a comma) a bare verse or verse range
+CHUNK_PATTERN = re.compile(r'^(?:([0-9]+):)?([0-9]+)(?:-(?:([0-9]+):)?([0-9]+))?$')
+
+
+def clean(reference: str) -> Tuple[str, str]:
+    """
+    Run the cleanup tokenizer over a reference in a single pass.
+
+    Returns:
+        (anchor, cleaned): the display text (replacements applied, verse
+        letters lower-cased) and the reference cleaned for linking
+    """
+    anchor = []
+    cleaned = []
+    position = 0
+
+    for match in CLEANUP_PATTERN.finditer(reference):
+        literal = reference[position:match.start()]
+        anchor.append(literal)
+        cleaned.append(literal)
+        position = match.end()
+
+        if match.group('replacement') is not None:
+            replacement = REPLACEMENTS[match.group('replacement')]
+            anchor.append(replacement)
+            cleaned.append(replacement)
+        elif match.group('bracket') is not None:
+            anchor.append(match.group('bracket'))
+            cleaned.append(match.group('alternative'))
+        else:
+            # '1 Samuel 2:8ABCD' => '1 Samuel 2:8abcd' (anchor), '1 Samuel 2:8' (link)
+            anchor.append(match.group('number') + match.group('letters').lower())
+            cleaned.append(match.group('number'))
+
+    anchor.append(reference[position:])
+    cleaned.append(reference[position:])
+    return ''.join(anchor), ''.join(cleaned)
+
+
+class VerseRange(NamedTuple):
+    """
+    An inclusive span of Scripture within one book. A verse of None means
+    the whole chapter.
+    """
+    start_chapter: int
+    start_verse: Optional[int]
+    end_chapter: int
+    end_verse: Optional[int]
+
+
+class Passage(NamedTuple):
+    """The part of a reference that falls within a single book."""
+    book: Optional[int]  # Canonical book ID, or None if the book is unknown
+    name: str  # Book name as written (ordinals and aliases normalized)
+    spec: str  # Chapter/verse text, e.g. '1:1-5,7'
+    ranges: Tuple[VerseRange, ...]  # Empty if spec couldn't be parsed
+
+    @property
+    def code(self) -> Optional[str]:
+        """Bible Gateway book code, e.g. 'Ge'."""
+        return None if self.book is None else BOOK_CODES[self.book]
+
+    @property
+    def deuterocanon(self) -> bool:
+        return self.book in DEUTEROCANON_IDS
+
+
+class BibleReference(NamedTuple):
+    """A parsed reference: display text plus one passage per book cited."""
+    text: str
+    passages: Tuple[Passage, ...]
+    # What each passage after the first was joined to the previous one with
+    # (';' or ','); defaults to ';'
+    separators: Tuple[str, ...] = ()
+
+    def joined(self, parts: Iterable[str], spacing: str = '') -> str:
+        """Join one string per passage with the reference's own separators."""
+        parts = list(parts)
+        separators = self.separators or (';',) * (len(parts) - 1)
+        return ''.join(part if not index else separators[index - 1] + spacing + part
+                       for index, part in enumerate(parts))
+
+    @property
+    def deuterocanon(self) -> bool:
+        return any(passage.deuterocanon for passage in self.passages)
+
+    @property
+    def display(self) -> str:
+        """The reference rendered from the record, e.g. '2 Kings 2:1-5'."""
+        return self.joined((f'{passage.name} {passage.spec}'.strip() for passage in self.passages), ' ')
+
+
+@lru_cache(maxsize=4096)
+def parse(reference: str) -> BibleReference:
+    """
+    Parse a reference string into a structured BibleReference.
+
+    Handles the cleanup used for links (replacements, bracketed alternative
+    chapters, verse letters), Roman-numeral ordinals ('II Kings') and
+    multi-book references ('Matthew 1:1; Luke 1:1' or 'Matthew 1:1, Luke
+    1:1'). Results are cached,
+    so each distinct string is only parsed once.
+
+    Args:
+        reference: A Bible reference string, e.g. '1 Samuel 2:1-8ABCD, 10'
+
+    Returns:
+        The parsed reference
+    """
+    anchor, cleaned = clean(reference)
+    passages = []
+    separators = []
+    # split() alternates segments and the separators between them
+    pieces = BOOK_SEPARATOR_PATTERN.split(cleaned)
+
+    for segment, separator in zip(pieces[::2], [';'] + pieces[1::2]):
+        match = SEGMENT_PATTERN.match(segment)
+        if match:
+            passage = _passage(match.group('book'), match.group('passage') or '')
+        elif passages and segment.strip():
+            # '1:1; 2:3' => the second chapter continues the previous book
+            previous = passages[-1]
+            spec = f'{previous.spec};{_normalize_spec(segment)}'
+            passages[-1] = previous._replace(spec=spec, ranges=_parse_ranges(spec))
+            continue
+        elif segment.strip():
+            passage = Passage(None, '', _normalize_spec(segment), ())
+        else:
+            continue
+        if passages:
+            separators.append(separator)
+        passages.append(passage)
+
+    return BibleReference(anchor, tuple(passages), tuple(separators))
+
+
+def _passage(book_text: str, spec: str) -> Passage:
+    words = book_text.split()
+    if len(words) > 1 and words[0] in ROMAN_ORDINALS:
+        words[0] = ROMAN_ORDINALS[words[0]]
+    name = ' '.join(words)
+    name = BOOK_ALIASES.get(name, name)
+    spec = _normalize_spec(spec)
+    return Passage(_BOOK_LOOKUP.get(_book_key(name)), name, spec, _parse_ranges(spec))
+
+
+def normalize_book_names(reference: str) -> str:
+    """
+    Normalize Roman-numeral ordinals and aliased book names in display text.
+
+    In: "II Kings 2:1-5"
+    Out: "2 Kings 2:1-5"
+    """
+    return _DISPLAY_PATTERN.sub(
+        lambda match: (ROMAN_ORDINALS[match.group('ordinal')] + ' ' if match.group('ordinal')
+                       else BOOK_ALIASES.get(match.group(0), match.group(0))),
+        reference)
+
+
+def _normalize_spec(spec: str) -> str:
+    return spec.strip().replace(', ', ',')
+
+
+def _parse_ranges(spec: str) -> Tuple[VerseRange, ...]:
+    """
+    Parse chapter/verse text into ranges.
+
+    After a comma a bare number is a verse in the current chapter; anywhere
+    else it's a whole chapter. Returns an empty tuple if any part of the
+    text isn't understood.
+    """
+    ranges = []
+    chapter = None
+    separator = None
+
+    for token in re.split(r'([,;])', spec):
+        if token in (',', ';'):
+            separator = token
+            continue
+        match = CHUNK_PATTERN.match(token.strip())
+        if not match:
+            return ()
+        start_chapter, start, end_chapter, end = match.groups()
+
+        if start_chapter is not None:
+            first = (int(start_chapter), int(start))
+        elif separator == ',' and chapter is not None:
+            first = (chapter, int(start))
+        elif end_chapter is None:
+            # Whole chapters: '3' or '3-4'
+            last = int(end) if end is not None else int(start)
+            ranges.append(VerseRange(int(start), None, last, None))
+            chapter = None
+            continue
+        else:
+            return ()
+
+        if end_chapter is not None:
+            last = (int(end_chapter), int(end))
+        elif end is not None:
+            last = (first[0], int(end))
+        else:
+            last = first
+        ranges.append(VerseRange(first[0], first[1], last[0], last[1]))
+        chapter = last[0]
+
+    return tuple(ranges)
+
+
+def merge_passages(references: Iterable[BibleReference]) -> Tuple[Passage, ...]:
+    """
+    Merge the passages of several references into one canonical list.
+
+    Passages from the same book are combined, their verse ranges merged
+    where they overlap or are adjacent (a repeated psalm response collapses
+    into one range), and the books put in canonical order. Passages whose
+    book or verses couldn't be parsed are kept verbatim, deduplicated, after
+    the rest.
+
+    Args:
+        references: Parsed references, e.g. every reading of one day
+
+    Returns:
+        One passage per known book, in canonical order, then the leftovers
+    """
+    ranges_by_book: Dict[int, List[VerseRange]] = {}
+    leftovers: Dict[Passage, None] = {}
+
+    for reference in references:
+        for passage in reference.passages:
+            if passage.book is None or not passage.ranges:
+                leftovers[passage] = None
+            else:
+                ranges_by_book.setdefault(passage.book, []).extend(passage.ranges)
+
+    merged = []
+    for book in sorted(ranges_by_book):
+        ranges = _merge_ranges(ranges_by_book[book])
+        merged.append(Passage(book, BOOK_CODES[book], format_ranges(ranges), ranges))
+    return tuple(merged) + tuple(leftovers)
+
+
+def format_ranges(ranges: Iterable[VerseRange]) -> str:
+    """
+    Render verse ranges compactly, e.g. '1:1-5,7;2:3' or '3-4'.
+
+    A range in the chapter the previous one ended in is joined with a comma
+    and written without the chapter; any other range starts a new ';' group.
+    """
+    parts = []
+    chapter = None
+
+    for start_chapter, start_verse, end_chapter, end_verse in ranges:
+        if start_verse is None:
+            if parts:
+                parts.append(';')
+            parts.append(str(start_chapter) if end_chapter == start_chapter else f'{start_chapter}-{end_chapter}')
+            chapter = None
+            continue
+
+        if start_chapter == chapter:
+            parts.append(',')
+            text = str(start_verse)
+        else:
+            if parts:
+                parts.append(';')
+            text = f'{start_chapter}:{start_verse}'
+
+        if end_chapter != start_chapter:
+            text += f'-{end_chapter}:{end_verse}'
+        elif end_verse != start_verse:
+            text += f'-{end_verse}'
+        parts.append(text)
+        chapter = end_chapter
+
+    return ''.join(parts)
+
+
+_END_OF_CHAPTER = float('inf')
+
+
+def _start(verse_range: VerseRange) -> Tuple[int, int]:
+    return verse_range.start_chapter, verse_range.start_verse or 0
+
+
+def _end(verse_range: VerseRange) -> Tuple[int, float]:
+    end_verse = verse_range.end_verse
+    return verse_range.end_chapter, _END_OF_CHAPTER if end_verse is None else end_verse
+
+
+def _merge_ranges(ranges: Iterable[VerseRange]) -> Tuple[VerseRange, ...]:
+    """Sort ranges and merge the ones that overlap or touch."""
+    merged: List[VerseRange] = []
+
+    # Widest range first among those that start at the same place
+    for verse_range in sorted(set(ranges), key=lambda r: (_start(r), tuple(-x for x in _end(r)))):
+        if not merged:
+            merged.append(verse_range)
+            continue
+
+        previous = merged[-1]
+        if _end(verse_range) <= _end(previous):
+            continue  # Already covered
+
+        last_chapter, last_verse = _end(previous)
+        following = (last_chapter + 1, 1) if last_verse == _END_OF_CHAPTER else (last_chapter, last_verse + 1)
+        # A range starting mid-chapter can't absorb one that runs to the end
+        # of a chapter without knowing how many verses that chapter has
+        representable = previous.start_verse is None or verse_range.end_verse is not None
+        if _start(verse_range) <= following and representable:
+            start_verse = previous.start_verse
+            if start_verse is None and verse_range.end_verse is not None:
+                start_verse = 1
+            merged[-1] = VerseRange(previous.start_chapter, start_verse,
+                                    verse_range.end_chapter, verse_range.end_verse)
+        else:
+            merged.append(verse_range)
+
+    return tuple(merged)
+
 
 # USCCB (Catholic) abbreviation mappings - used for UPPERCASE abbreviations
 USCCB_ABBREVIATIONS = {
@@ -11,7 +403,7 @@ USCCB_ABBREVIATIONS = {
     'EX': 'Exodus',
     'LV': 'Leviticus',
     'NM': 'Numbers',
-    'JDT': 'Judith',  # Must come before DT
+    'JDT': 'Judith',
     'DT': 'Deuteronomy',
     'JOS': 'Joshua',
     'JGS': 'Judges',
@@ -84,32 +476,55 @@ USCCB_ABBREVIATIONS = {
 
 # Coptic lectionary abbreviation mappings - used for mixed-case abbreviations
 COPTIC_ABBREVIATIONS = {
+    'Matt': 'Matthew',
+    'Mk': 'Mark',
+    'Lk': 'Luke',
+    'Rom': 'Romans',
+    '1Cor': '1 Corinthians',
+    '2Cor': '2 Corinthians',
+    '1Corinthians': '1 Corinthians',
+    '2Corinthians': '2 Corinthians',
+    'Col': 'Colossians',
+    'Heb': 'Hebrews',
+    '1Pet': '1 Peter',
+    '1Peter': '1 Peter',
+    '2Pet': '2 Peter',
+    '2Peter': '2 Peter',
+    '1Jn': '1 John',
+    '2Jn': '2 John',
+    '3Jn': '3 John',
+    '1John': '1 John',
+    '2John': '2 John',
+    '3John': '3 John',
+    'Jn': 'John',
+}
+
+# Coptic lectionary punctuation cleanup
+COPTIC_PUNCTUATION = {
     '  & ': '; ',
     ' - ': '-',
-    'Matt ': 'Matthew ',
-    'Mk ': 'Mark ',
-    'Lk ': 'Luke ',
-    'Rom ': 'Romans ',
-    '1Cor ': '1 Corinthians ',
-    '2Cor ': '2 Corinthians ',
-    '1Corinthians ': '1 Corinthians ',
-    '2Corinthians ': '2 Corinthians ',
-    'Col ': 'Colossians ',
-    'Heb ': 'Hebrews ',
-    '1Pet ': '1 Peter ',
-    '1Peter ': '1 Peter ',
-    '2Pet ': '2 Peter ',
-    '2Peter ': '2 Peter ',
-    '1Jn ': '1 John ',
-    '2Jn ': '2 John ',
-    '3Jn ': '3 John ',
-    '1John ': '1 John ',
-    '2John ': '2 John ',
-    '3John ': '3 John ',
-    'Jn ': 'John '
 }
 
 
+def _abbreviation_pattern(abbreviations, flags=0):
+    """
+    Compile a table of book abbreviations into one token-anchored matcher.
+
+    An abbreviation only matches as a whole token followed by a space, so
+    'DT' can't match inside 'JDT' and 'Jn' can't match inside '1Jn', however
+    the table is ordered.
+    """
+    alternatives = '|'.join(re.escape(abbrev) for abbrev in sorted(abbreviations, key=len, reverse=True))
+    return re.compile(rf'(?<![A-Za-z0-9])(?:{alternatives})(?= )', flags)
+
+
+USCCB_PATTERN = _abbreviation_pattern(USCCB_ABBREVIATIONS, re.IGNORECASE)
+COPTIC_PATTERN = re.compile(
+    _abbreviation_pattern(COPTIC_ABBREVIATIONS).pattern
+    + '|' + '|'.join(re.escape(item) for item in COPTIC_PUNCTUATION))
+_COPTIC_REPLACEMENTS = {**COPTIC_ABBREVIATIONS, **COPTIC_PUNCTUATION}
+
+
 def normalize_usccb_reference(reference: str) -> str:
     """
     Normalize a Bible reference from USCCB format to full book names.
@@ -123,11 +538,7 @@ def normalize_usccb_reference(reference: str) -> str:
     Returns:
         The reference with the book name expanded to its full form
     """
-    reference = reference.upper()
-    for abbrev, full_name in USCCB_ABBREVIATIONS.items():
-        if f'{abbrev} ' in reference:
-            reference = reference.replace(abbrev, full_name)
-            break
+    reference = USCCB_PATTERN.sub(lambda match: USCCB_ABBREVIATIONS[match.group(0).upper()], reference)
     return reference.title()
 
 
@@ -144,7 +555,5 @@ def normalize_coptic_reference(reference: str) -> str:
     Returns:
         The reference with abbreviations expanded
     """
-    for abbrev, replacement in COPTIC_ABBREVIATIONS.items():
-        reference = reference.replace(abbrev, replacement)
-    return reference
+    return COPTIC_PATTERN.sub(lambda match: _COPTIC_REPLACEMENTS[match.group(0)], reference)
 
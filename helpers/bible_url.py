@@ -1,72 +1,75 @@
-import json
 import re
 
+from helpers.bible_reference import (  # noqa: F401 - re-exported for existing callers
+    ABBREVIATIONS, DEUTEROCANON, REPLACEMENTS, BibleReference, Passage,
+    clean, load_json, merge_passages, parse)
 
-def load_json(file_path):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+# All book names in one compiled alternation, longest first, so a single
+# pass picks the longest match at each position ('1 John' over 'John')
+BOOK_PATTERN = re.compile('|'.join(re.escape(book) for book in sorted(ABBREVIATIONS, key=len, reverse=True)))
 
+ANCHOR_PATTERN = re.compile(r'<\s*a\s*>([^<>]*)<\s*/\s*a\s*>')
 
-REPLACEMENTS = load_json('helpers/replacements.json')
-ABBREVIATIONS = load_json('helpers/abbreviations.json')
-DEUTEROCANON = load_json('helpers/deuterocanon.json')
 
+def _search_term(passage: Passage) -> str:
+    """Render one passage as a Bible Gateway search term, e.g. 'Ge 1:1-5'."""
+    if passage.code is None or not passage.ranges:
+        # Unknown book or verses (e.g. 'Psalm 23 or Psalm 100'): fall back to
+        # shortening whatever was written
+        return shorten(f'{passage.name} {passage.spec}'.strip())
+    return f'{passage.code} {passage.spec}'
 
-def convert(reference):
+
+def search_query(reference: BibleReference) -> str:
+    """Render a parsed reference as a Bible Gateway search query."""
+    return reference.joined(_search_term(passage) for passage in reference.passages).replace(' ', '+')
+
+
+def link(reference: BibleReference) -> str:
+    """Render a parsed reference as a Markdown link to Bible Gateway."""
+    url = f'[{reference.text}](https://biblegateway.com/passage/?search={search_query(reference)}'
+    if reference.deuterocanon:
+        url += "&version=NRSVCE"  # can change later
+    url += ")"
+    return url
+
+
+def convert(reference, references=None):
     """
     Converts an individual Bible reference into a neat Markdown link
+
+    Args:
+        reference: The Bible reference, e.g. "Genesis 1:1"
+        references: Optional list; the parsed reference is appended to it
+                    when a link is produced (see build_combined_link)
     """
 
     # There's a weird nuance with how BibleGateway fetches Psalm 151.
     # Even when you're using a translation that includes it, the term
     # "Psalm 151" throws a "No Results Found" Error unless you write it
     # with a pseudo-chapter number: "Psalm 151 1".
+    # (REPLACEMENTS takes care of that during parsing.)
     if reference == "":
         return reference
     if not reference[-1:].isdigit():
         return '*' + reference + '*'
 
-    for item in REPLACEMENTS:
-        reference = reference.replace(item, REPLACEMENTS[item])
+    parsed = parse(reference)
+    if references is not None:
+        references.append(parsed)
+    return link(parsed)
 
-    anchor = reference
-
-    # Clean up references that have alternative chapter numbers within
-    # brackets so the links don't break
-    # Ex: '4[2] Kings 2:6-14' => '2 Kings 2:6-14'
-    reference = re.sub(r'([0-9]+\[([0-9]+)])', r'\2', reference)
-
-    # Get rid of letter subreferences in verses
-    pattern = re.compile(r'([0-9]+)([a-zA-Z]+)')
-
-    # '1 Samuel 2:8ABCD' => '1 Samuel 2:8'
-    reference = re.sub(pattern, r'\1', reference)
-
-    # '1 Samuel 2:8ABCD' => '1 Samuel 2:8abcd'
-    for item in re.findall(pattern, anchor):
-        item = ''.join(item)
-        anchor = anchor.replace(item, item.lower())
-
-    reference = shorten(reference).replace(' ', '+')
-    reference_code = reference.split("+")[0]
-    is_apocrypha = reference_code in DEUTEROCANON
-    url = f'[{anchor}](https://biblegateway.com/passage/?search={reference}'
-    if is_apocrypha:
-        url += "&version=NRSVCE"  # can change later
-    url += ")"
-    return url
-
-def html_convert(text):
+def html_convert(text, references=None):
     """
     Converts a string with anchored Bible references to Markdown
 
     In: "God creates everything\nin <a>Genesis 1:1</a>"
     Out: "God creates everything\nin [Genesis 1:1](https://www.example.com)"
-    """
-    for match in re.findall(r'(<\s*a\s*>([^<>]*)<\s*/\s*a\s*>)', text):
-        text = text.replace(match[0], convert(match[1]))
 
-    return text
+    If a references list is given, each linked reference is appended to it
+    in parsed form.
+    """
+    return ANCHOR_PATTERN.sub(lambda match: convert(match.group(1), references), text)
 
 
 def shorten(text):
@@ -77,10 +80,7 @@ def shorten(text):
 
     text = text.replace(', ', ',').replace('; ', ';').title()
 
-    for book in ABBREVIATIONS:
-        text = text.replace(book, ABBREVIATIONS[book])
-
-    return text
+    return BOOK_PATTERN.sub(lambda match: ABBREVIATIONS[match.group(0)], text)
 
 
 def extract_references(text):
@@ -90,7 +90,7 @@ def extract_references(text):
     In: "<a>Genesis 1:1</a> and <a>Exodus 2:3</a>"
     Out: ["Genesis 1:1", "Exodus 2:3"]
     """
-    matches = re.findall(r'<\s*a\s*>([^<>]*)<\s*/\s*a\s*>', text)
+    matches = ANCHOR_PATTERN.findall(text)
     # Filter out empty references and non-verse references (those not ending in a digit)
     return [ref for ref in matches if ref and ref[-1:].isdigit()]
 
@@ -100,28 +100,14 @@ def _clean_reference_for_url(reference):
     Clean a single reference for use in a combined URL.
     Similar to convert() but returns just the cleaned reference string.
     """
-    for item in REPLACEMENTS:
-        reference = reference.replace(item, REPLACEMENTS[item])
-    
-    # Clean up alternative chapter numbers: '4[2] Kings 2:6-14' => '2 Kings 2:6-14'
-    reference = re.sub(r'([0-9]+\[([0-9]+)])', r'\2', reference)
-    
-    # Remove letter subreferences: '1 Samuel 2:8ABCD' => '1 Samuel 2:8'
-    reference = re.sub(r'([0-9]+)([a-zA-Z]+)', r'\1', reference)
-    
-    return reference
+    return clean(reference)[1]
 
 
 def _check_has_deuterocanon(references):
     """
     Check if any reference in the list is from a deuterocanonical book.
     """
-    for reference in references:
-        shortened = shorten(reference)
-        reference_code = shortened.split(" ")[0].split("+")[0]
-        if reference_code in DEUTEROCANON:
-            return True
-    return False
+    return any(parse(reference).deuterocanon for reference in references)
 
 
 def build_combined_url(references, anchor_text="Read all on Bible Gateway"):
@@ -132,27 +118,39 @@ def build_combined_url(references, anchor_text="Read all on Bible Gateway"):
         references: List of Bible reference strings (e.g., ["Genesis 1:1", "Exodus 2:3"])
         anchor_text: The display text for the markdown link
         
+    Returns:
+        A markdown link string, or empty string if no valid references
+    """
+    return build_combined_link([parse(ref) for ref in references], anchor_text)
+
+
+def build_combined_link(references, anchor_text="Read all on Bible Gateway"):
+    """
+    Build a single Bible Gateway link for already-parsed references.
+
+    Args:
+        references: BibleReference records, e.g. as collected by convert()
+        anchor_text: The display text for the markdown link
+
     Returns:
         A markdown link string, or empty string if no valid references
     """
     if not references:
         return ""
-    
-    # Clean and shorten each reference for URL
-    cleaned_refs = []
-    for ref in references:
-        cleaned = _clean_reference_for_url(ref)
-        shortened = shorten(cleaned)
-        cleaned_refs.append(shortened)
-    
-    # Join references with comma (URL encoded as %2C but BibleGateway accepts comma)
-    search_param = ", ".join(cleaned_refs).replace(' ', '+')
+
+    # Merge overlapping and repeated passages and put the books in
+    # canonical order, so e.g. a psalm repeated as a response is only
+    # requested once
+    passages = merge_passages(references)
+
+    # Join books with comma (URL encoded as %2C but BibleGateway accepts comma)
+    search_param = ", ".join(_search_term(passage) for passage in passages).replace(' ', '+')
     
     # Build the URL
     url = f"https://www.biblegateway.com/passage/?search={search_param}"
     
     # Add version parameter if any deuterocanonical books are present
-    if _check_has_deuterocanon(references):
+    if any(passage.deuterocanon for passage in passages):
         url += "&version=NRSVCE"
     
     return f"[{anchor_text}]({url})"
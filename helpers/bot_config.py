@@ -12,3 +12,14 @@ class Config:
             self.prefix += ' '
         self.token = os.getenv('token')
         self.log_webhook = os.getenv('log_webhook')
+        # Pool used for regeneration and rendering: 'thread' or 'process'
+        self.executor = os.getenv('executor', 'thread').lower()
+        self.executor_workers = int(os.getenv('executor_workers', '4'))
+        # Channels sent to at once during scheduled pushes
+        self.push_concurrency = int(os.getenv('push_concurrency', '8'))
+        # Minutes each scheduled push is spread over (0 sends it all at once)
+        self.push_window = int(os.getenv('push_window', '5'))
+        # Minutes before each scheduled push to start refreshing the lectionaries
+        self.refresh_lead = int(os.getenv('refresh_lead', '5'))
+        # Scheduled push delivery: 'channel' (bot messages) or 'webhook' (managed webhooks)
+        self.push_mode = os.getenv('push_mode', 'channel').lower()
@@ -0,0 +1,86 @@
+"""
+Batched cleanup of removed guilds and deleted channels.
+
+Gateway events (and the periodic reconcile) only queue the IDs of guilds the
+bot left and channels that were deleted; flush() then deletes them in one
+batch each. A guild that invites the bot back before the next flush is taken
+off the queue again, so it keeps its settings.
+"""
+from typing import Callable, Iterable, List, NamedTuple, Set
+
+from helpers.logger import get_logger
+
+_logger = get_logger(__name__)
+
+
+class CleanupResult(NamedTuple):
+    """What one flush purged."""
+    guilds: int  # Guilds whose settings were deleted
+    channels: int  # Channels whose subscriptions were deleted
+
+
+class CleanupQueue:
+    """
+    Removed guilds and deleted channels waiting to be purged.
+
+    Args:
+        purge_guilds: Deletes the settings (and so the subscriptions) of
+                      several guilds; returns how many were deleted
+        purge_channels: Deletes everything stored for several channels;
+                        returns how many subscriptions were deleted
+    """
+
+    def __init__(self, purge_guilds: Callable[[List[int]], int],
+                 purge_channels: Callable[[List[int]], int]):
+        self._purge_guilds = purge_guilds
+        self._purge_channels = purge_channels
+        self.guilds: Set[int] = set()
+        self.channels: Set[int] = set()
+
+    def guild_removed(self, guild_id: int) -> None:
+        self.guilds.add(guild_id)
+
+    def guild_joined(self, guild_id: int, channel_ids: Iterable[int] = ()) -> None:
+        """Keep a guild that came back before the flush (and its channels)."""
+        self.guilds.discard(guild_id)
+        self.channels.difference_update(channel_ids)
+
+    def channel_deleted(self, channel_id: int) -> None:
+        self.channels.add(channel_id)
+
+    def reconcile(self, guild_ids: Iterable[int], channel_ids: Iterable[int],
+                  guild_exists: Callable[[int], bool], channel_exists: Callable[[int], bool]) -> CleanupResult:
+        """
+        Queue the stored guilds and channels the bot can no longer see, e.g.
+        ones removed while it was offline.
+
+        Returns:
+            How many guilds and channels were found to be gone
+        """
+        gone_guilds = [guild_id for guild_id in guild_ids if not guild_exists(guild_id)]
+        gone_channels = [channel_id for channel_id in channel_ids if not channel_exists(channel_id)]
+        self.guilds.update(gone_guilds)
+        self.channels.update(gone_channels)
+        return CleanupResult(len(gone_guilds), len(gone_channels))
+
+    def flush(self) -> CleanupResult:
+        """
+        Purge everything queued, one batch for guilds and one for channels.
+        If purging fails the IDs stay queued for the next flush.
+        """
+        guilds, self.guilds = self.guilds, set()
+        channels, self.channels = self.channels, set()
+        purged_guilds = purged_channels = 0
+        try:
+            if guilds:
+                purged_guilds = self._purge_guilds(list(guilds))
+                guilds = set()
+            if channels:
+                purged_channels = self._purge_channels(list(channels))
+                channels = set()
+        except Exception as e:
+            # Try again at the next flush, alongside anything queued meanwhile
+            self.guilds.update(guilds)
+            self.channels.update(channels)
+            _logger.error(f'Cleanup failed: {e}', exc_info=True)
+        return CleanupResult(purged_guilds, purged_channels)
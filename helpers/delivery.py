@@ -0,0 +1,226 @@
+"""
+Concurrent delivery engine for scheduled pushes.
+
+Sending to channels one after another makes a push take time proportional
+to the number of subscriptions. deliver() instead sends to many channels at
+once, with a bounded number of sends in flight so discord.py's rate-limit
+buckets aren't flooded, and keeps each channel's embeds in order.
+
+plan() spreads an hour's jobs across a delivery window instead of sending
+them in one burst. Each channel's place in the window comes from a stable
+hash of its ID, so it receives its reading at about the same minute every
+day.
+
+Every job is isolated: one that raises is classified as a permanent,
+transient or rate-limited Failure and the rest carry on.
+"""
+import asyncio
+import time
+import zlib
+from enum import Enum
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Mapping, NamedTuple, Optional, Sequence
+
+from helpers.logger import get_logger
+
+_logger = get_logger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+
+
+class Failure(Enum):
+    """How a failed delivery should be treated."""
+    PERMANENT = 'permanent'  # The target is gone or refuses us, e.g. lost permissions
+    TRANSIENT = 'transient'  # May well succeed another time, e.g. a server error
+    RATE_LIMITED = 'rate limited'
+
+
+class DeliveryJob(NamedTuple):
+    """Everything to send to one channel, in order."""
+    key: Hashable  # Channel ID; jobs with the same key are sent one after another
+    target: Any  # What send() is called with, e.g. a discord channel
+    items: Sequence[Any]  # e.g. discord.Embed objects
+    delay: float = 0.0  # Seconds after the start of delivery to send (see plan())
+    tag: Any = None  # Caller's reference for the job, e.g. its outbox row
+
+
+class DeliveryReport(NamedTuple):
+    """Outcome and timing of one delivery run."""
+    delivered: int  # Jobs whose items were all sent
+    failed: int  # Jobs that raised partway through
+    sends: int  # Individual items sent
+    elapsed: float  # Seconds for the whole run
+    latencies: Sequence[float]  # Seconds per successful send, sorted
+    skipped: int = 0  # Jobs the claim hook turned down (e.g. already delivered)
+    # Per job key: None if all its jobs were delivered, otherwise how one failed
+    outcomes: Mapping[Hashable, Optional[Failure]] = MappingProxyType({})
+
+    def failed_keys(self, failure: Failure) -> List[Hashable]:
+        """Keys with a job that failed this way."""
+        return [key for key, outcome in self.outcomes.items() if outcome is failure]
+
+    @property
+    def delivered_keys(self) -> List[Hashable]:
+        """Keys whose jobs were all delivered."""
+        return [key for key, outcome in self.outcomes.items() if outcome is None]
+
+    @property
+    def throughput(self) -> float:
+        """Sends per second."""
+        return self.sends / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def p50(self) -> float:
+        return percentile(self.latencies, 50)
+
+    @property
+    def p99(self) -> float:
+        return percentile(self.latencies, 99)
+
+    def summary(self) -> str:
+        failed = f'{self.failed} failed'
+        if self.failed:
+            kinds = ', '.join(f'{len(self.failed_keys(failure))} {failure.value}' for failure in Failure)
+            failed += f' ({kinds} channels)'
+        return (f'{self.delivered} delivered, {failed}, {self.skipped} skipped, '
+                f'{self.sends} sends in {self.elapsed:.1f}s '
+                f'({self.throughput:.1f}/s, p50 {self.p50 * 1000:.0f}ms, p99 {self.p99 * 1000:.0f}ms)')
+
+
+def slot(key: Hashable) -> float:
+    """
+    A channel's stable position in the delivery window, from 0 to 1.
+
+    Uses CRC32 rather than hash(), which is randomized per process.
+    """
+    return zlib.crc32(str(key).encode()) / 2 ** 32
+
+
+def plan(jobs: Iterable[DeliveryJob], window: float, elapsed: float = 0.0) -> List[DeliveryJob]:
+    """
+    Spread jobs across a delivery window.
+
+    Each job is due at its slot's share of the window, measured from the
+    window's start. Jobs whose time has already passed (e.g. the push
+    started late) are due immediately.
+
+    Args:
+        jobs: The jobs to schedule
+        window: Length of the window in seconds (0 sends everything now)
+        elapsed: Seconds since the window started
+
+    Returns:
+        The jobs with their delays set, in the order they're due
+    """
+    planned = [job._replace(delay=max(0.0, slot(job.key) * window - elapsed)) for job in jobs]
+    planned.sort(key=lambda job: job.delay)
+    return planned
+
+
+def percentile(sorted_samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of already-sorted samples (0 if there are none)."""
+    if not sorted_samples:
+        return 0.0
+    rank = min(len(sorted_samples) - 1, int(round(pct / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[rank]
+
+
+async def deliver(jobs: Iterable[DeliveryJob],
+                  send: Callable[[Any, Any], Awaitable[Any]],
+                  concurrency: int = DEFAULT_CONCURRENCY,
+                  claim: Optional[Callable[[DeliveryJob], bool]] = None,
+                  settle: Optional[Callable[[DeliveryJob, bool], None]] = None,
+                  classify: Optional[Callable[[Exception], Failure]] = None) -> DeliveryReport:
+    """
+    Send every job's items, up to `concurrency` channels at a time.
+
+    Each channel's jobs are sent sequentially, in order, by one worker;
+    different channels proceed in parallel. Jobs are started in order of
+    their delay, no earlier than it. A job that raises is counted as
+    failed without affecting the others. After a permanent failure the
+    channel's remaining jobs fail without being sent.
+
+    Args:
+        jobs: What to send where
+        send: Coroutine function called as send(job.target, item)
+        concurrency: Maximum number of channels being sent to at once
+        claim: Called right before a job is sent; if it returns False the
+               job is skipped (used for at-most-once delivery)
+        settle: Called after a claimed job finishes, with whether it succeeded
+        classify: Tells what kind of Failure an exception from send() is
+                  (by default every failure is transient)
+
+    Returns:
+        A report with counts, per-key outcomes, throughput and send latency
+        percentiles
+    """
+    # One lane per channel, so a channel's jobs can't interleave
+    lanes: Dict[Hashable, List[DeliveryJob]] = {}
+    for job in sorted(jobs, key=lambda job: job.delay):
+        lanes.setdefault(job.key, []).append(job)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for lane in lanes.values():
+        queue.put_nowait(lane)
+
+    latencies: List[float] = []
+    outcome = {'delivered': 0, 'failed': 0, 'skipped': 0}
+    outcomes: Dict[Hashable, Optional[Failure]] = {}
+
+    def fail(job, failure):
+        outcome['failed'] += 1
+        # Keep the key's first failure; a later success doesn't clear it
+        if outcomes.get(job.key) is None:
+            outcomes[job.key] = failure
+
+    async def run(job):
+        wait = start + job.delay - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        if claim is not None and not claim(job):
+            outcome['skipped'] += 1
+            return
+
+        succeeded = False
+        try:
+            if outcomes.get(job.key) is Failure.PERMANENT:
+                fail(job, Failure.PERMANENT)
+                return
+            for item in job.items:
+                sent = time.monotonic()
+                await send(job.target, item)
+                latencies.append(time.monotonic() - sent)
+            succeeded = True
+            outcome['delivered'] += 1
+            outcomes.setdefault(job.key, None)
+        except Exception as e:
+            failure = classify(e) if classify is not None else Failure.TRANSIENT
+            fail(job, failure)
+            if failure is Failure.PERMANENT:
+                _logger.debug(f'Delivery to {job.key} failed permanently: {e}')
+            else:
+                _logger.warning(f'Delivery to {job.key} failed ({failure.value}): {e}')
+        finally:
+            if settle is not None:
+                settle(job, succeeded)
+
+    async def worker():
+        while True:
+            try:
+                lane = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            for job in lane:
+                try:
+                    await run(job)
+                except Exception as e:
+                    # A failing claim/settle hook mustn't take the worker down
+                    _logger.error(f'Delivery bookkeeping for {job.key} failed: {e}', exc_info=True)
+
+    start = time.monotonic()
+    workers = max(1, min(concurrency, len(lanes)))
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+    latencies.sort()
+    return DeliveryReport(outcome['delivered'], outcome['failed'], len(latencies),
+                          time.monotonic() - start, latencies, outcome['skipped'], MappingProxyType(outcomes))
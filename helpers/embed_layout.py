@@ -0,0 +1,191 @@
+"""
+Discord embed size accounting, splitting and message packing.
+
+Discord rejects an embed with an oversized title, description or field, or
+more than 25 fields, with a 400. fit() measures each embed against those
+limits up front and continues whatever doesn't fit into extra fields and
+embeds, so long troparia or synaxarium text can't fail a send.
+
+Discord also accepts up to 10 embeds and 6000 characters of embed text per
+message, so a lectionary's embeds can usually go out in far fewer messages
+than one per embed (the Russian lectionary's four embeds fit in one).
+"""
+from typing import Iterable, List, Tuple
+
+# Discord's per-message limits
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_MESSAGE_CHARS = 6000
+
+# Discord's per-embed limits
+MAX_EMBED_CHARS = 6000
+MAX_TITLE = 256
+MAX_DESCRIPTION = 4096
+MAX_FIELDS = 25
+MAX_FIELD_NAME = 256
+MAX_FIELD_VALUE = 1024
+MAX_FOOTER = 2048
+MAX_AUTHOR_NAME = 256
+
+TRUNCATED_SUFFIX = ' ... [truncated]'
+# Name of fields that continue the previous one (names can't be empty)
+CONTINUATION_NAME = '\u200b'
+
+# Keys kept on the first embed of a split, and on the last one
+_HEAD_KEYS = ('title', 'url', 'author', 'thumbnail')
+_TAIL_KEYS = ('footer', 'image', 'timestamp')
+
+
+def embed_length(payload: dict) -> int:
+    """
+    Count an embed's characters the way Discord does: title, description,
+    field names and values, footer text and author name.
+    """
+    length = len(payload.get('title') or '') + len(payload.get('description') or '')
+    for field in payload.get('fields') or ():
+        length += len(field.get('name') or '') + len(field.get('value') or '')
+    length += len((payload.get('footer') or {}).get('text') or '')
+    length += len((payload.get('author') or {}).get('name') or '')
+    return length
+
+
+def truncate(text: str, limit: int) -> str:
+    """Shorten text to at most `limit` characters, marking it as truncated."""
+    if len(text) <= limit:
+        return text
+    return text[:limit - len(TRUNCATED_SUFFIX)] + TRUNCATED_SUFFIX
+
+
+def take(text: str, limit: int) -> Tuple[str, str]:
+    """
+    Split off as much of the text as fits in `limit` characters.
+
+    Breaks at the last line break that fits, else the last space, so words
+    and Markdown links stay whole where possible.
+
+    Returns:
+        (chunk, rest), where rest is '' if everything fit
+    """
+    if len(text) <= limit:
+        return text, ''
+    cut = text.rfind('\n', 0, limit + 1)
+    if cut <= 0:
+        cut = text.rfind(' ', 0, limit + 1)
+    if cut <= 0:
+        return text[:limit], text[limit:]
+    return text[:cut].rstrip(), text[cut + 1:].lstrip()
+
+
+def split_text(text: str, limit: int) -> List[str]:
+    """Split text into chunks of at most `limit` characters (see take())."""
+    chunks = []
+    while text:
+        chunk, text = take(text, limit)
+        chunks.append(chunk)
+    return chunks
+
+
+def within_limits(payload: dict) -> bool:
+    """Whether Discord would accept the embed as it is."""
+    fields = payload.get('fields') or ()
+    return (len(payload.get('title') or '') <= MAX_TITLE
+            and len(payload.get('description') or '') <= MAX_DESCRIPTION
+            and len(fields) <= MAX_FIELDS
+            and all(len(field.get('name') or '') <= MAX_FIELD_NAME
+                    and len(field.get('value') or '') <= MAX_FIELD_VALUE for field in fields)
+            and len((payload.get('footer') or {}).get('text') or '') <= MAX_FOOTER
+            and len((payload.get('author') or {}).get('name') or '') <= MAX_AUTHOR_NAME
+            and embed_length(payload) <= MAX_EMBED_CHARS)
+
+
+def fit(payload: dict) -> List[dict]:
+    """
+    Make an embed fit Discord's limits, splitting it if needed.
+
+    Titles, field names, author names and footers are truncated. Long
+    descriptions and field values are continued in the next embed or in
+    untitled fields right after the original. The first embed keeps the
+    title, author and thumbnail, the last keeps the footer and image, and
+    every embed keeps the other keys (e.g. color).
+
+    Returns:
+        The embed itself if it already fits, otherwise its pieces in order
+    """
+    if within_limits(payload):
+        return [payload]
+
+    head = {key: payload[key] for key in _HEAD_KEYS if key in payload}
+    tail = {key: payload[key] for key in _TAIL_KEYS if key in payload}
+    common = {key: value for key, value in payload.items()
+              if key not in _HEAD_KEYS + _TAIL_KEYS + ('description', 'fields')}
+    if 'title' in head:
+        head['title'] = truncate(head['title'], MAX_TITLE)
+    if (head.get('author') or {}).get('name'):
+        head['author'] = {**head['author'], 'name': truncate(head['author']['name'], MAX_AUTHOR_NAME)}
+    if (tail.get('footer') or {}).get('text'):
+        tail['footer'] = {**tail['footer'], 'text': truncate(tail['footer']['text'], MAX_FOOTER)}
+
+    # Room in every embed is reserved for the footer, since the last embed
+    # isn't known until the content has been laid out
+    budget = MAX_EMBED_CHARS - embed_length(tail)
+
+    pieces = [{**common, **head}]
+
+    def room():
+        return budget - embed_length(pieces[-1])
+
+    description = payload.get('description') or ''
+    while description:
+        if 'description' in pieces[-1] or room() <= 0:
+            pieces.append(dict(common))
+        pieces[-1]['description'], description = take(description, min(MAX_DESCRIPTION, room()))
+
+    for field in payload.get('fields') or ():
+        name = truncate(field.get('name') or '', MAX_FIELD_NAME)
+        value = field.get('value') or ''
+        first = True
+        while first or value:
+            fields = pieces[-1].setdefault('fields', [])
+            limit = min(MAX_FIELD_VALUE, room() - len(name))
+            # Start a new embed when this one is full or the next chunk of
+            # the value doesn't fit; a fresh embed always has room for one
+            if len(fields) >= MAX_FIELDS or limit < min(max(len(value), 1), MAX_FIELD_VALUE):
+                pieces.append({**common, 'fields': []})
+                continue
+            chunk, value = take(value, limit)
+            fields.append({**field, 'name': name, 'value': chunk})
+            name, first = CONTINUATION_NAME, False
+
+    for piece in pieces:
+        if not piece.get('fields'):
+            piece.pop('fields', None)
+    pieces[-1].update(tail)
+    return pieces
+
+
+def pack(payloads: Iterable[dict],
+         max_embeds: int = MAX_EMBEDS_PER_MESSAGE,
+         max_chars: int = MAX_MESSAGE_CHARS) -> List[List[dict]]:
+    """
+    Group embeds into as few messages as Discord's limits allow.
+
+    Each embed is first fit() to Discord's per-embed limits. Embeds keep
+    their order; each message takes as many consecutive embeds as fit.
+
+    Returns:
+        One list of embed payloads per message
+    """
+    messages: List[List[dict]] = []
+    current: List[dict] = []
+    current_chars = 0
+
+    for payload in (piece for payload in payloads for piece in fit(payload)):
+        length = embed_length(payload)
+        if current and (len(current) >= max_embeds or current_chars + length > max_chars):
+            messages.append(current)
+            current, current_chars = [], 0
+        current.append(payload)
+        current_chars += length
+
+    if current:
+        messages.append(current)
+    return messages
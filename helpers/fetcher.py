@@ -0,0 +1,181 @@
+"""
+Shared HTTP fetch helpers for the lectionaries.
+
+This module tracks per-host response latency. Every outgoing request also
+goes through a central FetchScheduler, which rate-limits each host with a
+token bucket and serves waiting requests by priority: interactive commands
+first, then scheduled pushes, then background prefetching.
+"""
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class Priority(IntEnum):
+    """Fetch priority classes; lower values are served first."""
+    INTERACTIVE = 0
+    SCHEDULED = 1
+    BACKGROUND = 2
+
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar('fetch_priority', default=Priority.BACKGROUND)
+
+
+@contextmanager
+def priority(level: Priority):
+    """
+    Run the enclosed fetches at the given priority.
+
+    Usage:
+        with fetcher.priority(Priority.INTERACTIVE):
+            lec = lec.refreshed()
+    """
+    token = _current_priority.set(level)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _current_priority.get()
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def try_take(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            0 if a token was taken, otherwise the seconds until one will be
+        """
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self.rate
+
+
+class FetchScheduler:
+    """
+    Per-host politeness limiter with priority-ordered waiting.
+
+    Each host gets its own token bucket. When a host is out of tokens,
+    waiting requests are granted in priority order (FIFO within a class),
+    so user-facing requests never queue behind bulk work.
+    """
+
+    # Requests per second and burst size per host
+    DEFAULT_RATE = 2.0
+    DEFAULT_BURST = 5
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._cond = threading.Condition()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._waiting: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._sequence = itertools.count()
+
+    def acquire(self, host: str, level: Priority) -> None:
+        """Block until a request to this host may be sent at this priority."""
+        with self._cond:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+
+            waiting = self._waiting[host]
+            ticket = (int(level), next(self._sequence))
+            heapq.heappush(waiting, ticket)
+            try:
+                while True:
+                    if waiting[0] != ticket:
+                        self._cond.wait()
+                        continue
+                    delay = bucket.try_take()
+                    if delay == 0:
+                        return
+                    self._cond.wait(delay)
+            finally:
+                waiting.remove(ticket)
+                heapq.heapify(waiting)
+                self._cond.notify_all()
+
+    def wait_for_slot(self, url: str) -> None:
+        """Block until a request to this URL may be sent at the current priority."""
+        self.acquire(host_of(url), current_priority())
+
+
+scheduler = FetchScheduler()
+
+
+def wait_for_slot(url: str) -> None:
+    """
+    Wait for the shared scheduler to allow a request to this URL.
+
+    Call this right before every outgoing request to a lectionary source.
+    """
+    scheduler.wait_for_slot(url)
+
+
+class LatencyTracker:
+    """Rolling window of response times (in seconds) per host."""
+
+    WINDOW = 50
+    MIN_SAMPLES = 5
+
+    def __init__(self):
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.WINDOW))
+        self._lock = threading.Lock()
+
+    def record(self, host: str, seconds: float) -> None:
+        """Record one response time for a host."""
+        with self._lock:
+            self._samples[host].append(seconds)
+
+    def percentile(self, host: str, pct: float) -> Optional[float]:
+        """
+        Get a latency percentile for a host.
+
+        Returns:
+            The percentile in seconds, or None if there aren't enough samples yet
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(host, ()))
+        if len(samples) < self.MIN_SAMPLES:
+            return None
+        rank = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[rank]
+
+    def p95(self, host: str) -> Optional[float]:
+        return self.percentile(host, 95)
+
+
+latency = LatencyTracker()
+
+
+def host_of(url: str) -> str:
+    """Get the host name of a URL (used as the latency/rate-limit key)."""
+    return urlparse(url).netloc.lower()
+
+
+def record_latency(url: str, seconds: float) -> None:
+    """Record how long a request to a URL took."""
+    latency.record(host_of(url), seconds)
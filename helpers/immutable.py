@@ -0,0 +1,60 @@
+"""
+Immutable embed payloads.
+
+A rendered lectionary is shared by every delivery of it, so its payloads
+are frozen: dicts become FrozenDicts and lists become tuples. Variants such
+as the combined-links version are derived with FrozenDict.set(), which
+copies only the top level and shares everything else with the original.
+
+FrozenDict is a dict subclass, so frozen payloads still go straight into
+discord.Embed.from_dict() and json.dumps().
+"""
+from typing import Any
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError(f'{type(self).__name__} is immutable; derive a variant with set() instead')
+
+
+class FrozenDict(dict):
+    """A dict that can't be modified after it's created."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def set(self, key, value) -> 'FrozenDict':
+        """Get a copy with one key changed (the values themselves are shared)."""
+        return FrozenDict({**self, key: value})
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # The default dict pickling fills the dict in after creating it
+        return FrozenDict, (dict(self),)
+
+
+def freeze(value: Any) -> Any:
+    """Deeply convert dicts to FrozenDicts and lists to tuples."""
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Deeply convert a frozen payload back into plain dicts and lists."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
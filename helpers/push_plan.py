@@ -0,0 +1,102 @@
+"""
+The day's push plan.
+
+Once a day (and again whenever a schedule changes) the push loop reads every
+subscription due that day in one index range scan and groups them by the
+time they fire. During a slot's refresh lead the cog turns the slot's
+entries into delivery jobs, resolving each channel (or webhook) and
+rendering each variant once; when the slot arrives its push walks those
+prepared jobs and only sends. The per-hour stats show the load to expect.
+
+Each prepared job is still claimed from the delivery outbox, so nothing is
+sent twice. When a guild changes a setting or unsubscribes, the cog drops
+the jobs prepared for its channels. Deliveries the plan doesn't cover (such
+jobs, a subscription added since it was built, or a job left over from an
+earlier push) are picked up from the outbox by the same push, with the
+current settings.
+"""
+import datetime
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from helpers.schedule import local_date
+
+
+class PlanEntry(NamedTuple):
+    """One subscription's delivery in a slot."""
+    channel_id: int
+    sub_type: int
+    combined_links: bool
+    delivery_date: datetime.date  # The guild's local date; keys the outbox job
+
+
+class Slot(NamedTuple):
+    """Everything due at one time."""
+    due: datetime.datetime  # Naive UTC
+    entries: Tuple[PlanEntry, ...]
+
+    @property
+    def variants(self) -> FrozenSet[Tuple[int, bool]]:
+        """The (sub_type, combined_links) renders the slot needs."""
+        return frozenset((entry.sub_type, entry.combined_links) for entry in self.entries)
+
+    @property
+    def readings(self) -> FrozenSet[Tuple[int, datetime.date]]:
+        """The (sub_type, delivery_date) snapshots the slot needs."""
+        return frozenset((entry.sub_type, entry.delivery_date) for entry in self.entries)
+
+
+class HourStats(NamedTuple):
+    """The load to expect in one hour of the day."""
+    hour: int  # UTC
+    slots: int  # Distinct times something fires
+    channels: int  # Deliveries
+    variants: int  # Renders needed (each variant counted once per slot)
+
+
+class PushPlan:
+    """The slots of one (UTC) day, in order."""
+
+    def __init__(self, day: datetime.date, slots: Iterable[Slot]):
+        self.day = day
+        self.slots: Dict[datetime.datetime, Slot] = {slot.due: slot for slot in sorted(slots)}
+
+    @classmethod
+    def build(cls, day: datetime.date,
+              rows: Iterable[Tuple[datetime.datetime, int, int, bool, str]]) -> 'PushPlan':
+        """
+        Group a day's subscriptions into slots.
+
+        Args:
+            day: The UTC day planned for
+            rows: Tuples of (next_fire, channel_id, sub_type, combined_links, timezone)
+        """
+        entries: Dict[datetime.datetime, List[PlanEntry]] = {}
+        for due, channel_id, sub_type, combined_links, timezone in rows:
+            entries.setdefault(due, []).append(
+                PlanEntry(channel_id, sub_type, bool(combined_links), local_date(due, timezone)))
+        return cls(day, (Slot(due, tuple(slot_entries)) for due, slot_entries in entries.items()))
+
+    @staticmethod
+    def bounds(day: datetime.date) -> Tuple[datetime.datetime, datetime.datetime]:
+        """The naive UTC range a day's plan covers (end excluded)."""
+        start = datetime.datetime.combine(day, datetime.time())
+        return start, start + datetime.timedelta(days=1)
+
+    def slot(self, due: datetime.datetime) -> Optional[Slot]:
+        return self.slots.get(due)
+
+    def hourly_stats(self) -> List[HourStats]:
+        """Stats for every hour with something due, in order."""
+        hours: Dict[int, List[Slot]] = {}
+        for slot in self.slots.values():
+            hours.setdefault(slot.due.hour, []).append(slot)
+        return [HourStats(hour, len(slots), sum(len(slot.entries) for slot in slots),
+                          sum(len(slot.variants) for slot in slots))
+                for hour, slots in sorted(hours.items())]
+
+    def summary(self) -> str:
+        total = sum(len(slot.entries) for slot in self.slots.values())
+        lines = [f'Push plan for {self.day}: {total} deliveries in {len(self.slots)} slots']
+        lines += [f'{stats.hour:02d}:00 GMT - {stats.channels} channels, {stats.slots} slots, '
+                  f'{stats.variants} renders' for stats in self.hourly_stats()]
+        return '\n'.join(lines)
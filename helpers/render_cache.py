@@ -0,0 +1,64 @@
+"""
+Render-once cache for subscription pushes.
+
+Hundreds of channels can subscribe to the same lectionary, and every one of
+them gets identical embeds. RenderCache builds each variant once, keyed by
+(lectionary, date, combined_links, content version), so fanning out to the
+channels only costs the sends.
+"""
+import asyncio
+import datetime
+from typing import Awaitable, Callable, Dict, Generic, Hashable, NamedTuple, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class RenderKey(NamedTuple):
+    """Everything that can change the embeds a channel receives."""
+    lectionary: int  # Registry index
+    date: datetime.date
+    combined_links: bool
+    version: Hashable  # Content version of the snapshot
+
+
+class RenderCache(Generic[T]):
+    """
+    Cache of built embeds, one entry per (lectionary, combined_links).
+
+    A new date or content version replaces the old entry, so the cache
+    never holds more than two variants per lectionary. Concurrent requests
+    for the same variant share a single build.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[int, bool], Tuple[RenderKey, 'asyncio.Future[T]']] = {}
+
+    async def get(self, key: RenderKey, build: Callable[[], Awaitable[T]]) -> T:
+        """
+        Get the embeds for a variant, building them if needed.
+
+        Args:
+            key: The variant to get
+            build: Coroutine function that builds the variant
+
+        Returns:
+            The built variant (shared; treat as read-only)
+        """
+        slot = (key.lectionary, key.combined_links)
+        entry = self._entries.get(slot)
+        if entry is None or entry[0] != key:
+            future = asyncio.ensure_future(build())
+            self._entries[slot] = (key, future)
+        else:
+            future = entry[1]
+
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            # Don't cache failures; the next caller builds again
+            if self._entries.get(slot, (None, None))[1] is future:
+                del self._entries[slot]
+            raise
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -4,11 +4,14 @@ Database repository classes for guild settings and subscriptions.
 This module provides a clean abstraction over the database operations,
 replacing raw SQL scattered throughout the cog file.
 """
+import datetime
 from contextlib import contextmanager
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from helpers.bot_database import db
 from helpers.logger import get_logger
+from helpers.schedule import Schedule
+from helpers.webhook import ManagedWebhook
 
 _logger = get_logger(__name__)
 
@@ -42,6 +45,9 @@ def init_database_schema():
     Creates:
         - GuildSettings: Stores per-guild time preferences and combined_links setting
         - Subscriptions: Stores channel subscriptions to lectionaries
+        - DeliveryOutbox: Stores one delivery job per (channel, lectionary, guild's local date)
+        - ChannelWebhooks: Stores the managed webhook for each channel (webhook mode)
+        - ChannelFailures: Counts each channel's consecutive permanent delivery failures
     """
     _logger.debug('Initializing database schema')
     with get_cursor() as c:
@@ -62,6 +68,43 @@ def init_database_schema():
                 FOREIGN KEY (guild_id) REFERENCES GuildSettings(guild_id) ON DELETE CASCADE
             )
         ''')
+        # Delivery outbox: status is 'pending' until claimed for sending
+        # ('sending'), then 'done' or 'failed'. Claimed jobs are never
+        # retried, so each channel gets each day's reading at most once.
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS DeliveryOutbox (
+                channel_id    BIGINT NOT NULL,
+                sub_type      BIGINT NOT NULL,
+                delivery_date DATE NOT NULL,
+                due_at        TIMESTAMP NOT NULL,
+                status        TEXT NOT NULL DEFAULT 'pending',
+                updated_at    TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+                PRIMARY KEY (channel_id, sub_type, delivery_date)
+            )
+        ''')
+        c.execute('''
+            CREATE INDEX IF NOT EXISTS DeliveryOutbox_due
+            ON DeliveryOutbox (due_at) WHERE status = 'pending'
+        ''')
+        # Webhooks the bot manages for webhook-mode pushes
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS ChannelWebhooks (
+                channel_id BIGINT NOT NULL,
+                webhook_id BIGINT NOT NULL,
+                token      TEXT NOT NULL,
+                PRIMARY KEY (channel_id)
+            )
+        ''')
+        # Channels whose deliveries keep failing permanently, pruned once
+        # they reach the cog's limit
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS ChannelFailures (
+                channel_id   BIGINT NOT NULL,
+                failures     BIGINT NOT NULL DEFAULT 1,
+                last_failure TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+                PRIMARY KEY (channel_id)
+            )
+        ''')
     # Add combined_links column if it doesn't exist (migration for existing databases)
     # Use a separate transaction to avoid PostgreSQL transaction abort issues
     try:
@@ -79,29 +122,45 @@ def init_database_schema():
                 _logger.debug('Added combined_links column to GuildSettings')
     except Exception as e:
         _logger.debug(f'Migration check for combined_links: {e}')
+    _migrate_schedules()
+
+
+def _migrate_schedules():
+    """
+    Add per-guild minute and time zone settings, and the indexed next-fire
+    time of each subscription (filled in by the cog).
+    """
+    try:
+        with get_cursor() as c:
+            c.execute("ALTER TABLE GuildSettings ADD COLUMN IF NOT EXISTS minute BIGINT NOT NULL DEFAULT 0")
+            c.execute("ALTER TABLE GuildSettings ADD COLUMN IF NOT EXISTS timezone TEXT NOT NULL DEFAULT 'UTC'")
+            c.execute('ALTER TABLE Subscriptions ADD COLUMN IF NOT EXISTS next_fire TIMESTAMP')
+            c.execute('CREATE INDEX IF NOT EXISTS Subscriptions_next_fire ON Subscriptions (next_fire)')
+    except Exception as e:
+        _logger.error(f'Schedule migration failed: {e}', exc_info=True)
 
 
 class GuildSettingsRepository:
-    """Repository for guild settings (time preferences)."""
+    """Repository for guild settings (delivery schedule and combined links)."""
     
     @staticmethod
-    def get_time(guild_id: int) -> Optional[int]:
-        """Get the scheduled time for a guild, or None if not set."""
+    def get_schedule(guild_id: int) -> Optional[Schedule]:
+        """Get the delivery schedule for a guild, or None if it has no settings."""
         with get_cursor() as c:
-            c.execute('SELECT time FROM GuildSettings WHERE guild_id = %s', (guild_id,))
+            c.execute('SELECT time, minute, timezone FROM GuildSettings WHERE guild_id = %s', (guild_id,))
             row = c.fetchone()
-            return row[0] if row else None
-    
+            return Schedule(*row) if row else None
+
     @staticmethod
-    def set_time(guild_id: int, time: int) -> None:
-        """Set or update the scheduled time for a guild."""
+    def set_schedule(guild_id: int, schedule: Schedule) -> None:
+        """Set or update the delivery schedule for a guild."""
         with get_cursor() as c:
-            c.execute('SELECT * FROM GuildSettings WHERE guild_id = %s', (guild_id,))
-            if c.fetchone():
-                c.execute('UPDATE GuildSettings SET time = %s WHERE guild_id = %s', (time, guild_id))
-            else:
-                c.execute('INSERT INTO GuildSettings VALUES (%s, %s)', (guild_id, time))
-    
+            c.execute('''
+                INSERT INTO GuildSettings (guild_id, time, minute, timezone) VALUES (%s, %s, %s, %s)
+                ON CONFLICT (guild_id) DO UPDATE
+                SET time = EXCLUDED.time, minute = EXCLUDED.minute, timezone = EXCLUDED.timezone
+            ''', (guild_id, schedule.hour, schedule.minute, schedule.timezone))
+
     @staticmethod
     def ensure_exists(guild_id: int, default_time: int = 0) -> None:
         """Ensure a guild has a settings entry, creating one if needed."""
@@ -183,24 +242,103 @@ class SubscriptionsRepository:
             return c.fetchall()
     
     @staticmethod
-    def get_for_hour(hour: int) -> List[Tuple[int, int, bool]]:
+    def get_due(through: datetime.datetime) -> List[Tuple[int, Schedule, datetime.datetime]]:
         """
-        Get all subscriptions scheduled for a specific hour.
-        
+        Get the guilds whose schedule fires at or before a time, via an index
+        range scan on next_fire (only due rows are read).
+
         Returns:
-            List of tuples: (channel_id, sub_type, combined_links)
+            List of tuples: (guild_id, schedule, next_fire)
         """
         with get_cursor() as c:
             c.execute('''
-                SELECT Subscriptions.channel_id, Subscriptions.sub_type, 
-                       COALESCE(GuildSettings.combined_links, TRUE)
+                SELECT DISTINCT Subscriptions.guild_id, GuildSettings.time, GuildSettings.minute,
+                       GuildSettings.timezone, Subscriptions.next_fire
                 FROM Subscriptions
                 INNER JOIN GuildSettings
                 ON Subscriptions.guild_id = GuildSettings.guild_id
-                WHERE GuildSettings.time = %s
-            ''', (hour,))
+                WHERE Subscriptions.next_fire <= %s
+            ''', (through,))
+            return [(row[0], Schedule(row[1], row[2], row[3]), row[4]) for row in c.fetchall()]
+
+    @staticmethod
+    def get_scheduled_between(start: datetime.datetime,
+                              end: datetime.datetime) -> List[Tuple[datetime.datetime, int, int, bool, str]]:
+        """
+        Get the subscriptions due from a time up to (not including) another,
+        via an index range scan on next_fire.
+
+        Returns:
+            List of tuples: (next_fire, channel_id, sub_type, combined_links,
+            timezone), in order of next_fire
+        """
+        with get_cursor() as c:
+            c.execute('''
+                SELECT Subscriptions.next_fire, Subscriptions.channel_id, Subscriptions.sub_type,
+                       COALESCE(GuildSettings.combined_links, TRUE),
+                       COALESCE(GuildSettings.timezone, 'UTC')
+                FROM Subscriptions
+                LEFT JOIN GuildSettings
+                ON Subscriptions.guild_id = GuildSettings.guild_id
+                WHERE Subscriptions.next_fire >= %s
+                AND Subscriptions.next_fire < %s
+                ORDER BY Subscriptions.next_fire
+            ''', (start, end))
             return c.fetchall()
-    
+
+    @staticmethod
+    def get_unscheduled() -> List[Tuple[int, Schedule]]:
+        """
+        Get the guilds with subscriptions that have no next_fire yet (new,
+        or from before schedules were stored).
+
+        Returns:
+            List of tuples: (guild_id, schedule)
+        """
+        with get_cursor() as c:
+            c.execute('''
+                SELECT DISTINCT Subscriptions.guild_id, GuildSettings.time, GuildSettings.minute,
+                       GuildSettings.timezone
+                FROM Subscriptions
+                INNER JOIN GuildSettings
+                ON Subscriptions.guild_id = GuildSettings.guild_id
+                WHERE Subscriptions.next_fire IS NULL
+            ''')
+            return [(row[0], Schedule(row[1], row[2], row[3])) for row in c.fetchall()]
+
+    @staticmethod
+    def next_fire() -> Optional[datetime.datetime]:
+        """Get the earliest time any subscription is due (an index lookup)."""
+        with get_cursor() as c:
+            c.execute('SELECT MIN(next_fire) FROM Subscriptions')
+            return c.fetchone()[0]
+
+    @staticmethod
+    def set_next_fire(guild_id: int, next_fire: datetime.datetime) -> None:
+        """Set when all of a guild's subscriptions are next due."""
+        with get_cursor() as c:
+            c.execute('UPDATE Subscriptions SET next_fire = %s WHERE guild_id = %s', (next_fire, guild_id))
+
+    @staticmethod
+    def advance(fires: List[Tuple[int, datetime.datetime, datetime.datetime]]) -> None:
+        """
+        Move fired guilds on to their next fire time, in one statement.
+
+        Args:
+            fires: Tuples of (guild_id, fired next_fire, new next_fire). Rows
+                   whose next_fire has changed since (e.g. the guild changed
+                   its time) are left alone.
+        """
+        if not fires:
+            return
+        guild_ids, fired, upcoming = (list(column) for column in zip(*fires))
+        with get_cursor() as c:
+            c.execute('''
+                UPDATE Subscriptions SET next_fire = fire.upcoming
+                FROM unnest(%s::BIGINT[], %s::TIMESTAMP[], %s::TIMESTAMP[]) AS fire(guild_id, fired, upcoming)
+                WHERE Subscriptions.guild_id = fire.guild_id AND Subscriptions.next_fire = fire.fired
+            ''', (guild_ids, fired, upcoming))
+
     @staticmethod
     def exists(channel_id: int, sub_type: int) -> bool:
         """Check if a specific subscription already exists."""
@@ -254,3 +392,189 @@ class SubscriptionsRepository:
         with get_cursor() as c:
             c.execute('DELETE FROM Subscriptions WHERE channel_id = %s', (channel_id,))
 
+    @staticmethod
+    def get_all_channel_ids() -> List[int]:
+        """Get the IDs of all channels with at least one subscription."""
+        with get_cursor() as c:
+            c.execute('SELECT DISTINCT channel_id FROM Subscriptions')
+            return [row[0] for row in c.fetchall()]
+
+    @staticmethod
+    def delete_many_channels(channel_ids: List[int]) -> int:
+        """Delete all subscriptions for several channels at once. Returns count deleted."""
+        if not channel_ids:
+            return 0
+        with get_cursor() as c:
+            c.execute('DELETE FROM Subscriptions WHERE channel_id IN %s', (tuple(channel_ids),))
+            return c.rowcount
+
+
+class DeliveryOutboxRepository:
+    """
+    Repository for the durable delivery outbox.
+
+    Each fired schedule's subscriptions are enqueued as (channel,
+    lectionary, date) jobs. A job is claimed right before it's sent and marked done or failed
+    afterwards, so a push that crashes or is interrupted by a restart
+    resumes with the jobs still pending and never sends a claimed one twice.
+    """
+
+    @staticmethod
+    def enqueue(fires: List[Tuple[int, datetime.datetime, datetime.date]]) -> int:
+        """
+        Enqueue a job for every subscription of guilds whose schedule fired.
+        Idempotent: jobs that already exist for the date are left alone.
+
+        Args:
+            fires: Tuples of (guild_id, the next_fire that is due, the
+                   guild's local date then; see Schedule.local_date)
+
+        Returns:
+            The number of new jobs
+        """
+        if not fires:
+            return 0
+        guild_ids, fired, days = (list(column) for column in zip(*fires))
+        with get_cursor() as c:
+            c.execute('''
+                INSERT INTO DeliveryOutbox (channel_id, sub_type, delivery_date, due_at)
+                SELECT Subscriptions.channel_id, Subscriptions.sub_type, fire.day, fire.fired
+                FROM unnest(%s::BIGINT[], %s::TIMESTAMP[], %s::DATE[]) AS fire(guild_id, fired, day)
+                INNER JOIN Subscriptions
+                ON Subscriptions.guild_id = fire.guild_id AND Subscriptions.next_fire = fire.fired
+                ON CONFLICT DO NOTHING
+            ''', (guild_ids, fired, days))
+            return c.rowcount
+
+    @staticmethod
+    def get_pending(since: datetime.datetime,
+                    through: datetime.datetime) -> List[Tuple[int, int, bool, datetime.datetime, datetime.date]]:
+        """
+        Get the jobs still pending that were due in a time range.
+        Jobs left over from earlier (e.g. after a restart) are included;
+        jobs for channels that have since unsubscribed are not.
+
+        Returns:
+            List of tuples: (channel_id, sub_type, combined_links, due_at, delivery_date)
+        """
+        with get_cursor() as c:
+            c.execute('''
+                SELECT DeliveryOutbox.channel_id, DeliveryOutbox.sub_type,
+                       COALESCE(GuildSettings.combined_links, TRUE), DeliveryOutbox.due_at,
+                       DeliveryOutbox.delivery_date
+                FROM DeliveryOutbox
+                INNER JOIN Subscriptions
+                ON DeliveryOutbox.channel_id = Subscriptions.channel_id
+                AND DeliveryOutbox.sub_type = Subscriptions.sub_type
+                INNER JOIN GuildSettings
+                ON Subscriptions.guild_id = GuildSettings.guild_id
+                WHERE DeliveryOutbox.status = 'pending'
+                AND DeliveryOutbox.due_at > %s
+                AND DeliveryOutbox.due_at <= %s
+                ORDER BY DeliveryOutbox.due_at
+            ''', (since, through))
+            return c.fetchall()
+
+    @staticmethod
+    def claim(channel_id: int, sub_type: int, delivery_date: datetime.date) -> bool:
+        """
+        Claim a pending job for sending.
+
+        Returns:
+            True if this caller claimed it, False if it was already claimed
+            (or no longer exists)
+        """
+        with get_cursor() as c:
+            c.execute('''
+                UPDATE DeliveryOutbox SET status = 'sending', updated_at = NOW() AT TIME ZONE 'utc'
+                WHERE channel_id = %s AND sub_type = %s AND delivery_date = %s AND status = 'pending'
+            ''', (channel_id, sub_type, delivery_date))
+            return c.rowcount == 1
+
+    @staticmethod
+    def settle(channel_id: int, sub_type: int, delivery_date: datetime.date, succeeded: bool) -> None:
+        """Record the outcome of a claimed job."""
+        with get_cursor() as c:
+            c.execute('''
+                UPDATE DeliveryOutbox SET status = %s, updated_at = NOW() AT TIME ZONE 'utc'
+                WHERE channel_id = %s AND sub_type = %s AND delivery_date = %s
+            ''', ('done' if succeeded else 'failed', channel_id, sub_type, delivery_date))
+
+    @staticmethod
+    def delete_before(delivery_date: datetime.date) -> int:
+        """Delete jobs older than a date. Returns count deleted."""
+        with get_cursor() as c:
+            c.execute('DELETE FROM DeliveryOutbox WHERE delivery_date < %s', (delivery_date,))
+            return c.rowcount
+
+
+class WebhooksRepository:
+    """Repository for the webhooks managed for webhook-mode pushes."""
+
+    @staticmethod
+    def get_for_channels(channel_ids: List[int]) -> Dict[int, ManagedWebhook]:
+        """Get the managed webhooks for several channels at once, keyed by channel ID."""
+        if not channel_ids:
+            return {}
+        with get_cursor() as c:
+            c.execute('SELECT channel_id, webhook_id, token FROM ChannelWebhooks WHERE channel_id IN %s',
+                      (tuple(channel_ids),))
+            return {row[0]: ManagedWebhook(*row) for row in c.fetchall()}
+
+    @staticmethod
+    def save(webhook: ManagedWebhook) -> None:
+        """Store (or replace) the managed webhook for a channel."""
+        with get_cursor() as c:
+            c.execute('''
+                INSERT INTO ChannelWebhooks (channel_id, webhook_id, token) VALUES (%s, %s, %s)
+                ON CONFLICT (channel_id) DO UPDATE SET webhook_id = EXCLUDED.webhook_id, token = EXCLUDED.token
+            ''', (webhook.channel_id, webhook.webhook_id, webhook.token))
+
+    @staticmethod
+    def delete(channel_id: int) -> None:
+        """Forget a channel's managed webhook (e.g. after it was deleted)."""
+        with get_cursor() as c:
+            c.execute('DELETE FROM ChannelWebhooks WHERE channel_id = %s', (channel_id,))
+
+    @staticmethod
+    def delete_many(channel_ids: List[int]) -> None:
+        """Forget the managed webhooks of several channels (e.g. deleted channels)."""
+        if not channel_ids:
+            return
+        with get_cursor() as c:
+            c.execute('DELETE FROM ChannelWebhooks WHERE channel_id IN %s', (tuple(channel_ids),))
+
+
+class ChannelFailuresRepository:
+    """
+    Repository for channels whose deliveries fail permanently (deleted,
+    or the bot lost access), so they can be pruned after repeated failures.
+    """
+
+    @staticmethod
+    def record(channel_ids: List[int]) -> Dict[int, int]:
+        """
+        Count one more failure for each channel.
+
+        Returns:
+            Each channel's consecutive failure count, including this one
+        """
+        if not channel_ids:
+            return {}
+        with get_cursor() as c:
+            c.execute('''
+                INSERT INTO ChannelFailures (channel_id) SELECT unnest(%s::BIGINT[])
+                ON CONFLICT (channel_id) DO UPDATE
+                SET failures = ChannelFailures.failures + 1,
+                    last_failure = NOW() AT TIME ZONE 'utc'
+                RETURNING channel_id, failures
+            ''', (list(channel_ids),))
+            return dict(c.fetchall())
+
+    @staticmethod
+    def clear(channel_ids: List[int]) -> None:
+        """Reset the failure count of channels that were delivered to (or pruned)."""
+        if not channel_ids:
+            return
+        with get_cursor() as c:
+            c.execute('DELETE FROM ChannelFailures WHERE channel_id IN %s', (tuple(channel_ids),))
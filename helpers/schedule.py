@@ -0,0 +1,139 @@
+"""
+Per-guild delivery schedules.
+
+Each guild picks a wall-clock time in its own IANA time zone ("7:30 AM
+America/New_York"). Every subscription stores the UTC instant its guild's
+schedule next fires, computed here, so the push loop only has to sleep
+until the earliest one and fetch the rows that are due. Daylight saving
+changes are handled by recomputing from the wall-clock time each day.
+
+Any local time can be chosen. Each delivery is keyed by the guild's own
+date at the time it fires (see local_date()), and that date picks its
+readings, so a guild ahead of or behind UTC still gets its own day's.
+"""
+import datetime
+import re
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
+
+DEFAULT_TIMEZONE = 'UTC'
+MINUTES_PER_DAY = 24 * 60
+
+_TIME_PATTERN = re.compile(r'^(\d{1,2})(?::(\d{2}))? *([ap]\.?m\.?)?$', re.IGNORECASE)
+
+
+class Schedule(NamedTuple):
+    """A guild's daily delivery time."""
+    hour: int  # Local wall-clock time
+    minute: int = 0
+    timezone: str = DEFAULT_TIMEZONE  # IANA name
+
+    @property
+    def zone(self) -> ZoneInfo:
+        return ZoneInfo(self.timezone)
+
+    def next_fire(self, after: datetime.datetime) -> datetime.datetime:
+        """
+        The first time this schedule fires strictly after a moment.
+
+        A time skipped by a daylight saving change fires when the clocks
+        have gone forward, and a repeated time fires on its first occurrence.
+
+        Args:
+            after: Naive UTC datetime (as stored in the database)
+
+        Returns:
+            Naive UTC datetime
+        """
+        local = after.replace(tzinfo=datetime.timezone.utc).astimezone(self.zone)
+        for days in range(3):
+            day = local.date() + datetime.timedelta(days=days)
+            fire = datetime.datetime.combine(day, datetime.time(self.hour, self.minute), self.zone)
+            fire = fire.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+            if fire > after:
+                return fire
+        raise AssertionError('A daily schedule always fires within two days')
+
+    def local_date(self, fire: datetime.datetime) -> datetime.date:
+        """
+        The guild's own date at a fire time. Two local days can fire on the
+        same UTC date across a daylight saving change, so deliveries are
+        keyed by this rather than the UTC date.
+
+        Args:
+            fire: Naive UTC datetime, e.g. from next_fire()
+        """
+        return local_date(fire, self.timezone)
+
+    @property
+    def label(self) -> str:
+        """The time zone's name for display ('GMT' for UTC)."""
+        return 'GMT' if self.timezone == DEFAULT_TIMEZONE else self.timezone
+
+    def clock(self) -> str:
+        """E.g. '7:30 AM'."""
+        meridiem = 'AM' if self.hour < 12 else 'PM'
+        return f'{(self.hour - 1) % 12 + 1}:{self.minute:02d} {meridiem}'
+
+    def describe(self) -> str:
+        """E.g. '7:30 AM (America/New_York)'."""
+        return f'{self.clock()} ({self.label})'
+
+
+def local_date(fire: datetime.datetime, timezone: str) -> datetime.date:
+    """The date in a time zone at a naive UTC time (see Schedule.local_date())."""
+    return fire.replace(tzinfo=datetime.timezone.utc).astimezone(ZoneInfo(timezone)).date()
+
+
+@lru_cache(maxsize=1)
+def _timezones() -> Dict[str, str]:
+    """Lower-case name -> canonical IANA name."""
+    names = {name.lower(): name for name in available_timezones()}
+    names.update({'utc': 'UTC', 'gmt': 'UTC'})
+    return names
+
+
+def find_timezone(name: str) -> Optional[str]:
+    """Get the canonical IANA name of a time zone (case-insensitive), or None."""
+    canonical = _timezones().get(name.strip().lower())
+    if canonical is None:
+        return None
+    try:
+        ZoneInfo(canonical)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+    return canonical
+
+
+def parse_time(text: str) -> Optional[Schedule]:
+    """
+    Parse a delivery time such as '7', '19:30', '7pm' or '7:30 am',
+    optionally followed by a time zone ('7:30 am America/New_York').
+
+    Returns:
+        The schedule (with timezone '' if none was given), or None if the
+        text isn't a valid time
+    """
+    text = text.strip()
+    timezone = ''
+    if ' ' in text:
+        rest, last = text.rsplit(' ', 1)
+        found = find_timezone(last)
+        if found is not None:
+            text, timezone = rest.strip(), found
+
+    match = _TIME_PATTERN.match(text)
+    if match is None:
+        return None
+    hour = int(match.group(1))
+    minute = int(match.group(2) or 0)
+    meridiem = (match.group(3) or '').lower()
+
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.startswith('p') else 0)
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        return None
+    return Schedule(hour, minute, timezone)
@@ -0,0 +1,173 @@
+"""
+Webhook delivery for scheduled pushes.
+
+In webhook mode each subscribed channel gets a managed webhook, and each
+message is serialized to JSON bytes once per lectionary variant and POSTed
+as-is over one pooled aiohttp session. Webhook executions are rate-limited
+per webhook rather than against the bot's global limit, so WebhookClient
+tracks a bucket per webhook from Discord's rate-limit headers.
+"""
+import asyncio
+import json
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import aiohttp
+
+from helpers.logger import get_logger
+
+_logger = get_logger(__name__)
+
+API_BASE = 'https://discord.com/api/v10'
+# Seconds to wait after a 429 that doesn't say how long
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class ManagedWebhook(NamedTuple):
+    """A webhook the bot created for a channel."""
+    channel_id: int
+    webhook_id: int
+    token: str
+
+    @property
+    def url(self) -> str:
+        return f'{API_BASE}/webhooks/{self.webhook_id}/{self.token}'
+
+
+class WebhookGone(Exception):
+    """The webhook was deleted (or its token revoked) and must be recreated."""
+
+
+class WebhookError(Exception):
+    """Discord rejected a webhook execution."""
+
+
+class WebhookRateLimited(WebhookError):
+    """The webhook stayed rate limited through every retry."""
+
+
+def serialize_messages(messages: Iterable[List[dict]], username: Optional[str] = None,
+                       avatar_url: Optional[str] = None) -> List[bytes]:
+    """
+    Serialize packed embed payloads into webhook request bodies.
+
+    Args:
+        messages: One list of embed payloads per message (see embed_layout.pack)
+        username: Display name for the webhook messages
+        avatar_url: Avatar for the webhook messages
+
+    Returns:
+        One JSON body per message, ready to POST
+    """
+    identity = {}
+    if username:
+        identity['username'] = username
+    if avatar_url:
+        identity['avatar_url'] = avatar_url
+    return [json.dumps({**identity, 'embeds': message}, ensure_ascii=False, separators=(',', ':')).encode()
+            for message in messages]
+
+
+class _Bucket:
+    """Rate-limit state for one webhook."""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.remaining = 1
+        self.reset_at = 0.0
+
+    def update(self, headers) -> None:
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset_after = headers.get('X-RateLimit-Reset-After')
+        if remaining is not None:
+            self.remaining = int(remaining)
+        if reset_after is not None:
+            self.reset_at = time.monotonic() + float(reset_after)
+
+    def delay(self) -> float:
+        """Seconds to wait before the next request may be sent."""
+        if self.remaining > 0:
+            return 0.0
+        return max(0.0, self.reset_at - time.monotonic())
+
+
+async def _retry_after(response) -> float:
+    """
+    Seconds to wait after a 429. Discord's JSON body is preferred; a 429
+    from a proxy (e.g. Cloudflare's HTML page) falls back to the Retry-After
+    header, then to a default.
+    """
+    if response.content_type == 'application/json':
+        try:
+            retry_after = (await response.json()).get('retry_after')
+            if retry_after is not None:
+                return float(retry_after)
+        except (ValueError, AttributeError, TypeError):
+            pass
+    try:
+        return float(response.headers.get('Retry-After', DEFAULT_RETRY_AFTER))
+    except ValueError:
+        return DEFAULT_RETRY_AFTER
+
+
+class WebhookClient:
+    """
+    Executes webhooks over one pooled HTTP session.
+
+    Requests to the same webhook are serialized and paced by that webhook's
+    rate-limit bucket; different webhooks run independently.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        self._session = session
+        self._buckets: Dict[int, _Bucket] = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100),
+                headers={'Content-Type': 'application/json'},
+            )
+        return self._session
+
+    async def execute(self, webhook: ManagedWebhook, body: bytes) -> None:
+        """
+        POST a pre-serialized message body to a webhook.
+
+        Raises:
+            WebhookGone: The webhook no longer exists
+            WebhookRateLimited: Still rate limited after MAX_ATTEMPTS tries
+            WebhookError: Discord rejected the message
+        """
+        bucket = self._buckets.setdefault(webhook.webhook_id, _Bucket())
+        async with bucket.lock:
+            for attempt in range(self.MAX_ATTEMPTS):
+                delay = bucket.delay()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                async with self.session.post(webhook.url, data=body) as response:
+                    bucket.update(response.headers)
+                    if response.status in (200, 204):
+                        return
+                    if response.status in (401, 404):
+                        raise WebhookGone(f'Webhook for channel {webhook.channel_id} is gone')
+                    if response.status == 429:
+                        retry_after = await _retry_after(response)
+                        _logger.debug(f'Webhook for channel {webhook.channel_id} rate limited, '
+                                      f'retrying in {retry_after}s')
+                        bucket.remaining = 0
+                        bucket.reset_at = time.monotonic() + retry_after
+                        continue
+                    raise WebhookError(f'Webhook for channel {webhook.channel_id} failed: '
+                                       f'{response.status} {await response.text()}')
+
+        raise WebhookRateLimited(f'Webhook for channel {webhook.channel_id} still rate limited '
+                                 f'after {self.MAX_ATTEMPTS} attempts')
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -5,9 +5,10 @@ import requests
 from bs4 import BeautifulSoup
 from typing import Optional, List, Any
 
-from helpers import bible_url, date_expand
+from helpers import bible_url, date_expand, fetcher
+from helpers.bible_reference import normalize_book_names
 from helpers.logger import get_logger
-from lectionary.base import Lectionary
+from lectionary.base import Lectionary, RenderedEmbed, current_reading_date
 
 _logger = get_logger(__name__)
 
@@ -38,13 +39,6 @@ class ArmenianLectionary(Lectionary):
         """
         pass
 
-    SUBSTITUTIONS = {
-        "III ": "3 ",
-        "II ": "2 ",
-        "I ": "1 ",
-        "Azariah": "Prayer of Azariah",
-    }
-
     def __init__(self) -> None:
         """
         Initialize the ArmenianLectionary instance and populate its data.
@@ -56,6 +50,13 @@ class ArmenianLectionary(Lectionary):
         self.using_previous_day = False
         self.regenerate()
 
+    @property
+    def provisional(self) -> bool:
+        """
+        Yesterday's readings are only a fallback until today's are posted.
+        """
+        return self.using_previous_day
+
     def clear(self) -> None:
         """
         Reset all instance attributes to their default state.
@@ -226,11 +227,8 @@ class ArmenianLectionary(Lectionary):
         if not readings_list:
             return ["[No readings for this day]"]
 
-        # Perform substitutions
-        for original, substitute in self.SUBSTITUTIONS.items():
-            readings_list = [
-                reading.replace(original, substitute) for reading in readings_list
-            ]
+        # Normalize Roman-numeral ordinals and aliased book names
+        readings_list = [normalize_book_names(reading) for reading in readings_list]
 
         return readings_list
 
@@ -251,11 +249,12 @@ class ArmenianLectionary(Lectionary):
         Get the daily synaxarium link from the Armenian Church calendar website.
         Returns the link as a string, or an empty string if not found.
         """
-        today = datetime.date.today()
+        today = current_reading_date()
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
         try:
+            fetcher.wait_for_slot(ARMENIAN_CHURCH_GE_URL)
             r = requests.get(ARMENIAN_CHURCH_GE_URL, headers=headers, timeout=30)
             r.raise_for_status()
         except requests.exceptions.RequestException as e:
@@ -284,14 +283,14 @@ class ArmenianLectionary(Lectionary):
                     continue
         return ""
 
-    def build_json(self) -> List[dict]:
+    def build_embeds(self) -> List[RenderedEmbed]:
         """
-        Build a JSON-serializable representation of the lectionary data for Discord embeds.
+        Build the Discord embeds for the lectionary data.
         """
         if not self.ready:
             _logger.warning("Data not ready for JSON build.")
             # Return a helpful message instead of empty list
-            return [
+            return [RenderedEmbed.build(
                 {
                     "title": "Armenian Lectionary",
                     "color": 0x202225,
@@ -299,31 +298,31 @@ class ArmenianLectionary(Lectionary):
                     "footer": {"text": "Source: armenianscripture.wordpress.com"},
                     "author": {"name": "Armenian Lectionary", "url": self.url or "https://armenianscripture.wordpress.com"},
                 }
-            ]
+            )]
 
         footer_text = "Source: armenianscripture.wordpress.com"
         if self.using_previous_day:
             footer_text = "⚠️ Showing previous day's readings (today's not yet posted)\n" + footer_text
         
-        json = [
-            {
-                "title": self.title + "\n" + self.subtitle,
-                "color": 0xCA0000 if self.synaxarium else 0x202225,
-                "description": self._build_description(),
-                "footer": {"text": footer_text},
-                "author": {"name": "Armenian Lectionary", "url": self.url},
-            }
-        ]
-        return json
-
-    def _build_description(self) -> str:
+        references = []
+        payload = {
+            "title": self.title + "\n" + self.subtitle,
+            "color": 0xCA0000 if self.synaxarium else 0x202225,
+            "description": self._build_description(references),
+            "footer": {"text": footer_text},
+            "author": {"name": "Armenian Lectionary", "url": self.url},
+        }
+        return [RenderedEmbed.build(payload, references)]
+
+    def _build_description(self, references: Optional[list] = None) -> str:
         """
         Build the description string for the embed, including synaxarium, readings, and notes.
+        Linked references are appended to the references list if one is given.
         """
         synaxarium = f"[Synaxarium]({self.synaxarium})\n\n" if self.synaxarium else ""
         readings = "\n".join(
             (
-                bible_url.convert(reading)
+                bible_url.convert(reading, references)
                 if reading != "[No readings for this day]"
                 else reading
             )
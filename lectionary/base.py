@@ -1,19 +1,124 @@
 # todo: make a generic lectionary class that all the others inherit from
 # so it's easier to make new ones
+import contextvars
 import datetime
+import time
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, List, NamedTuple, Optional, Tuple
 
 import requests
 from bs4 import BeautifulSoup
 
+from helpers import bible_url, fetcher
+from helpers.bible_reference import BibleReference
+from helpers.immutable import FrozenDict, freeze, thaw
+
+COMBINED_LINK_TEXT = 'Read all on Bible Gateway'
+COMBINED_LINK_DIVIDER = '─────────────────────'
+
+
+class RenderedEmbed(NamedTuple):
+    """
+    One rendered embed plus what went into it.
+
+    Lectionaries build these at render time, so the combined Bible Gateway
+    link is computed once from the parsed references instead of being
+    scraped back out of the Markdown on every send. The payload is frozen,
+    so one render can be shared by every delivery; variants are derived
+    copy-on-write.
+    """
+    payload: FrozenDict  # Discord embed dict (discord.Embed.from_dict)
+    references: Tuple[BibleReference, ...] = ()  # Every reference linked in the payload
+    combined_link: str = ''  # Markdown link to all references, or '' if none
+
+    @classmethod
+    def build(cls, payload: dict, references=()) -> 'RenderedEmbed':
+        references = tuple(references)
+        return cls(freeze(payload), references, bible_url.build_combined_link(references, COMBINED_LINK_TEXT))
+
+    def with_combined_link(self) -> FrozenDict:
+        """
+        Get the payload with the combined link added.
+
+        Embeds with fields get the link as a new last field; description-only
+        embeds (e.g. Armenian) get it appended to the description. Only the
+        top level is copied; everything else is shared with the payload.
+        """
+        payload = self.payload
+        if not self.combined_link:
+            return payload
+
+        if payload.get('fields'):
+            return payload.set('fields', payload['fields'] + (freeze({
+                'name': COMBINED_LINK_DIVIDER,
+                'value': self.combined_link,
+                'inline': False
+            }),))
+        if payload.get('description'):
+            return payload.set('description', f"{payload['description']}\n\n{COMBINED_LINK_DIVIDER}\n{self.combined_link}")
+        return payload.set('description', self.combined_link)
+
+
+_reading_date: contextvars.ContextVar = contextvars.ContextVar('lectionary_reading_date', default=None)
+
+
+@contextmanager
+def reading_date(day: Optional[datetime.date]):
+    """
+    Build lectionaries with the readings for a date other than today
+    (None keeps today's).
+
+    Usage:
+        with reading_date(delivery_date):
+            lec = BookOfCommonPrayer()
+    """
+    token = _reading_date.set(day)
+    try:
+        yield
+    finally:
+        _reading_date.reset(token)
+
+
+def current_reading_date() -> datetime.date:
+    """The date lectionaries built here fetch readings for (today unless set by reading_date())."""
+    return _reading_date.get() or datetime.date.today()
+
+
+_partial_sink: contextvars.ContextVar = contextvars.ContextVar('lectionary_partial_sink', default=None)
+
+
+@contextmanager
+def streaming(sink: Callable[[RenderedEmbed], None]):
+    """
+    Receive a lectionary's leading embeds while it is still regenerating.
+
+    Usage:
+        with streaming(queue.put):
+            lec = CatholicLectionary()
+    """
+    token = _partial_sink.set(sink)
+    try:
+        yield
+    finally:
+        _partial_sink.reset(token)
+
 
 class Lectionary(ABC):
     """
     Abstract Base Class for a lectionary.
     """
 
+    # strftime template for the daily page's URL (see fetch_from_source)
+    SOURCE = ''
+    # Whether readings can be fetched for any date (see reading_date());
+    # False for sources that only serve today's page
+    DATED = True
+
     def __init__(self):
-        self.today = datetime.date.today()
+        self._frozen = False
+        self._rendered = None
+        self.today = current_reading_date()
         self.url = ''
         self.title = ''
         self.subtitle = ''
@@ -22,6 +127,54 @@ class Lectionary(ABC):
         self.ready = False
         self.last_regeneration = datetime.datetime.min
 
+    def __setattr__(self, name, value):
+        # Published snapshots are shared by every reader, so they must never
+        # change underneath them. Build a new instance with refreshed() instead.
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f'{type(self).__name__} is a published snapshot and cannot be modified')
+        super().__setattr__(name, value)
+        # Any change while still being built invalidates the cached render
+        if name != '_rendered':
+            super().__setattr__('_rendered', None)
+
+    def freeze(self):
+        """
+        Mark this instance as a published, read-only snapshot.
+
+        Once frozen, any attribute assignment (including regenerate() and
+        clear()) raises AttributeError. Freezing twice is harmless.
+        """
+        object.__setattr__(self, '_frozen', True)
+
+    @property
+    def frozen(self):
+        return self._frozen
+
+    @property
+    def provisional(self):
+        """
+        Whether the data is a stand-in (e.g. the previous day's readings) and
+        the source should be re-polled sooner than the normal cache duration.
+        """
+        return False
+
+    @property
+    def content_version(self):
+        """
+        Identifies this instance's content, for caches of rendered output.
+        Every regeneration produces a new version.
+        """
+        return self.last_regeneration
+
+    def refreshed(self):
+        """
+        Build a brand-new, fully regenerated instance of this lectionary.
+
+        The current instance is left untouched, so readers holding it keep
+        seeing consistent data until the new one is published.
+        """
+        return type(self)()
+
     def clear(self):
         self.today = None
         self.url = ''
@@ -34,22 +187,47 @@ class Lectionary(ABC):
     @abstractmethod
     def regenerate(self):
         self.last_regeneration = datetime.datetime.now()
-        self.today = datetime.date.today()
+        self.today = current_reading_date()
         pass
 
     def fetch_and_parse_html(self, url):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
+        fetcher.wait_for_slot(url)
+        start = time.monotonic()
         try:
             r = requests.get(url, headers=headers, timeout=30)
             if r.status_code != 200:
                 return None
         except requests.RequestException:
             return None
+        finally:
+            fetcher.record_latency(url, time.monotonic() - start)
 
         return BeautifulSoup(r.text, 'html.parser')
 
+    def source_url(self):
+        """The reading date's URL from SOURCE."""
+        return self.today.strftime(self.SOURCE)
+
+    def fetch_from_source(self, validate=None):
+        """
+        Fetch the reading date's page from SOURCE.
+
+        Args:
+            validate: Optional callable taking the soup; a falsy result marks
+                      the page as invalid (e.g. the site layout changed)
+
+        Returns:
+            (url, soup), with soup None if the page was missing or invalid
+        """
+        url = self.source_url()
+        soup = self.fetch_and_parse_html(url)
+        if soup is None or (validate is not None and not validate(soup)):
+            return url, None
+        return url, soup
+
     @abstractmethod
     def extract_title(self, soup):
         pass
@@ -66,6 +244,47 @@ class Lectionary(ABC):
     def extract_synaxarium(self, soup):
         pass
 
-    @abstractmethod
-    def build_json(self):
-        pass
+    def emit_partial(self, embed: RenderedEmbed) -> None:
+        """
+        Hand out an embed before regeneration finishes (see streaming()).
+
+        Lectionaries that fetch several pages call this as soon as an embed's
+        data is parsed. Emitted embeds must be, in order, the first embeds of
+        the finished render.
+        """
+        sink = _partial_sink.get()
+        if sink is not None:
+            sink(embed)
+
+    def render(self) -> Tuple[RenderedEmbed, ...]:
+        """
+        Render this lectionary's embeds, with their references and combined
+        links.
+
+        The result is cached until the instance changes, so a published
+        snapshot is rendered at most once (the registry renders new
+        snapshots while building them). Treat the payloads as read-only.
+        """
+        if self._rendered is None:
+            object.__setattr__(self, '_rendered', tuple(self.build_embeds()))
+        return self._rendered
+
+    @property
+    def rendered(self) -> Optional[Tuple[RenderedEmbed, ...]]:
+        """The cached render, or None if the instance hasn't been rendered."""
+        return self._rendered
+
+    def build_embeds(self) -> List[RenderedEmbed]:
+        """
+        Build the rendered embeds. Lectionaries override this (or, for plain
+        payloads without references, build_json).
+        """
+        return [RenderedEmbed.build(payload) for payload in self.build_json()]
+
+    def build_json(self) -> List[dict]:
+        """
+        Build Discord embed json for this lectionary.
+
+        Returns plain, mutable copies of the cached render's payloads.
+        """
+        return [thaw(embed.payload) for embed in self.render()]
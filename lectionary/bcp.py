@@ -1,8 +1,10 @@
 from helpers import bible_url, date_expand
-from .base import Lectionary
+from .base import Lectionary, RenderedEmbed
 
 
 class BookOfCommonPrayer(Lectionary):
+    SOURCE = 'https://www.biblegateway.com/reading-plans/bcp-daily-office/%Y/%m/%d'
+
     def extract_subtitle(self, soup):
         pass
 
@@ -15,8 +17,7 @@ class BookOfCommonPrayer(Lectionary):
 
     def regenerate(self):
         super().regenerate()  # Update last_regeneration timestamp
-        self.url = self.today.strftime('https://www.biblegateway.com/reading-plans/bcp-daily-office/%Y/%m/%d')
-        soup = self.fetch_and_parse_html(self.url)
+        self.url, soup = self.fetch_from_source()
         if soup is not None:
             self.title = self.extract_title(soup)
             self.readings = self.extract_readings(soup)
@@ -31,19 +32,20 @@ class BookOfCommonPrayer(Lectionary):
             for reading in soup.select("[class='rp-passage-display']")
         ]
 
-    def build_json(self):
+    def build_embeds(self):
         """
-        Build Discord embed json representing the calendar entry
+        Build Discord embeds representing the calendar entry
         """
         if not self.ready:
             return []
 
-        return [{
+        references = []
+        return [RenderedEmbed.build({
             'title': self.title,
-            'description': '\n'.join(bible_url.convert(reading) for reading in self.readings),
+            'description': '\n'.join(bible_url.convert(reading, references) for reading in self.readings),
             'footer': {'text': 'Source: biblegateway.com'},
             'author': {
                 'name': 'The Book of Common Prayer',
                 'url': self.url
             }
-        }]
+        }, references)]
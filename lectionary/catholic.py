@@ -4,10 +4,10 @@ import re
 import requests
 from bs4 import BeautifulSoup
 
-from helpers import bible_url, date_expand
+from helpers import bible_url, date_expand, fetcher
 from helpers.bible_reference import normalize_usccb_reference
 from helpers.logger import get_logger
-from lectionary.base import Lectionary
+from lectionary.base import Lectionary, RenderedEmbed
 
 _logger = get_logger(__name__)
 
@@ -49,6 +49,7 @@ class CatholicPage:
     @staticmethod
     def _make_request(url):
         try:
+            fetcher.wait_for_slot(url)
             r = requests.get(url)
             if r.status_code == 200:
                 return r
@@ -129,7 +130,9 @@ class CatholicLectionary(Lectionary):
         }
 
         try:
-            r = requests.get('https://www.divinemercyrosary.com/roman-calendar.php')
+            url = 'https://www.divinemercyrosary.com/roman-calendar.php'
+            fetcher.wait_for_slot(url)
+            r = requests.get(url)
             r.raise_for_status()
         except (requests.exceptions.HTTPError, requests.exceptions.ConnectionError):
             return color_mappings['green']
@@ -153,8 +156,11 @@ class CatholicLectionary(Lectionary):
             return
 
         if self._append_page_if_ready(page_content):
-            self._append_linked_pages(page_content)
+            # The colour is needed for every embed, so fetch it before the
+            # linked pages and send the first page on ahead
             self.color = self.get_color()
+            self.emit_partial(self._build_embed_for_page(self.pages[0]))
+            self._append_linked_pages(page_content)
             self.ready = True
         else:
             self.clear()
@@ -175,6 +181,7 @@ class CatholicLectionary(Lectionary):
     @staticmethod
     def _fetch_page_content(url):
         try:
+            fetcher.wait_for_slot(url)
             r = requests.get(url)
             if r.status_code == 200:
                 return r.text
@@ -201,23 +208,24 @@ class CatholicLectionary(Lectionary):
         links = re.findall(r'/bible/readings/[0-9]{4}[a-z-]+\.cfm', page_content)
         return ['https://bible.usccb.org' + link if 'https://' != link[:8] else link for link in links]
 
-    def build_json(self):
+    def build_embeds(self):
         if not self.ready:
             return []
 
         return [self._build_embed_for_page(page) for page in self.pages]
 
     def _build_embed_for_page(self, page):
-        return {
+        references = []
+        return RenderedEmbed.build({
             'title': page.title,
             'description': page.desc,
             'color': self.color,
             'footer': {'text': page.footer + '\nSource: bible.usccb.org'},
             'author': {'name': 'Catholic Lectionary', 'url': page.url},
-            'fields': self._build_fields_for_page(page),
-        }
+            'fields': self._build_fields_for_page(page, references),
+        }, references)
 
     @staticmethod
-    def _build_fields_for_page(page):
-        return [{'name': header, 'value': bible_url.html_convert(page.sections[header]), 'inline': False}
+    def _build_fields_for_page(page, references=None):
+        return [{'name': header, 'value': bible_url.html_convert(page.sections[header], references), 'inline': False}
                 for header in page.sections]
@@ -1,20 +1,21 @@
 import re
 
 from helpers import bible_url, date_expand
-from lectionary.base import Lectionary
+from lectionary.base import Lectionary, RenderedEmbed
 
 
 class OrthodoxAmericanLectionary(Lectionary):
+    SOURCE = 'https://www.oca.org/readings/daily/%Y/%m/%d'
+
     def __init__(self):
         super().__init__()
         self.regenerate()
 
     def regenerate(self):
         super().regenerate()
-        self.url = self.today.strftime('https://www.oca.org/readings/daily/%Y/%m/%d')
         self.extract_title(None)
 
-        soup = self.fetch_and_parse_html(self.url)
+        self.url, soup = self.fetch_from_source()
         if not soup:
             return
 
@@ -64,12 +65,13 @@ class OrthodoxAmericanLectionary(Lectionary):
         # Not required in this class as no subtitle is extracted
         pass
 
-    def build_json(self):
+    def build_embeds(self):
         if not self.ready:
             return []
 
+        references = []
         return [
-            {
+            RenderedEmbed.build({
                 'title': self.title,
                 'description': self.build_description(),
                 'footer': {'text': 'Source: oca.org'},
@@ -80,12 +82,12 @@ class OrthodoxAmericanLectionary(Lectionary):
                 'fields': [
                     {
                         'name': section[0],
-                        'value': bible_url.html_convert('\n'.join(section[1])),
+                        'value': bible_url.html_convert('\n'.join(section[1]), references),
                         'inline': False
                     }
                     for section in self.readings
                 ]
-            }
+            }, references)
         ]
 
     def build_description(self):
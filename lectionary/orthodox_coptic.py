@@ -1,6 +1,6 @@
 from helpers import bible_url, date_expand
 from helpers.bible_reference import normalize_coptic_reference
-from lectionary.base import Lectionary
+from lectionary.base import Lectionary, RenderedEmbed
 
 
 class OrthodoxCopticLectionary(Lectionary):
@@ -10,6 +10,8 @@ class OrthodoxCopticLectionary(Lectionary):
     (https://copticchurch.net/readings)
     """
 
+    SOURCE = 'https://copticchurch.net/readings??g_year=%Y&g_month=%m&g_day=%d'
+
     @staticmethod
     def clean_reference(string):
         """
@@ -19,9 +21,7 @@ class OrthodoxCopticLectionary(Lectionary):
 
     def regenerate(self):
         super().regenerate()
-        self.url = self.today.strftime('https://copticchurch.net/readings??g_year=%Y&g_month=%m&g_day=%d')
-
-        soup = self.fetch_and_parse_html(self.url)
+        self.url, soup = self.fetch_from_source()
         if not soup:
             return
 
@@ -50,21 +50,20 @@ class OrthodoxCopticLectionary(Lectionary):
     def extract_title(self, soup):
         self.title = date_expand.expand(self.today)
 
-    def build_json(self):
+    def build_embeds(self):
         if not self.ready:
             return []
 
-        links = [bible_url.convert(reading) for reading in self.readings]
-        final = [self.build_base_json()]
+        references = []
+        links = [bible_url.convert(reading, references) for reading in self.readings]
+        payload = self.build_base_json()
 
-        if len(links) == 0:
-            return final
-        elif len(links) > 7:
-            final[0]['fields'] = self.build_vespers_json(links)
-        else:
-            final[0]['fields'] = self.build_no_vespers_json(links)
+        if len(links) > 7:
+            payload['fields'] = self.build_vespers_json(links)
+        elif links:
+            payload['fields'] = self.build_no_vespers_json(links)
 
-        return final
+        return [RenderedEmbed.build(payload, references)]
 
     def build_base_json(self):
         return {
@@ -1,7 +1,7 @@
 from helpers import bible_url
 from helpers import date_expand
 from helpers.logger import log
-from lectionary.base import Lectionary
+from lectionary.base import Lectionary, RenderedEmbed
 
 
 class OrthodoxGreekLectionary(Lectionary):
@@ -85,9 +85,9 @@ class OrthodoxGreekLectionary(Lectionary):
         return [(f'[{item.a.text}]({item.a["href"]})' if item.a else item.span.text) for item in
                 soup.select('[class="ss-result-element"]')]
 
-    def build_json(self):
+    def build_embeds(self):
         if not self.ready:
-            return [
+            return [RenderedEmbed.build(
                 {
                     'title': 'Greek Orthodox Lectionary',
                     'color': 0xA68141,  # Golden brown
@@ -106,10 +106,11 @@ class OrthodoxGreekLectionary(Lectionary):
                         }
                     ]
                 }
-            ]
+            )]
 
+        references = []
         return [
-            {
+            RenderedEmbed.build({
                 'title': self.title,
                 'color': 0xA68141,  # Golden brown
                 'footer': {'text': 'Source: goarch.org'},
@@ -131,9 +132,9 @@ class OrthodoxGreekLectionary(Lectionary):
                     },
                     {
                         'name': 'Scripture Readings',
-                        'value': bible_url.html_convert('\n'.join(self.readings)),
+                        'value': bible_url.html_convert('\n'.join(self.readings), references),
                         'inline': False
                     }
                 ]
-            }
+            }, references)
         ]
@@ -2,7 +2,7 @@ import re
 
 from helpers import bible_url
 from helpers.logger import get_logger
-from lectionary.base import Lectionary
+from lectionary.base import Lectionary, RenderedEmbed
 
 _logger = get_logger(__name__)
 
@@ -11,7 +11,12 @@ class OrthodoxRussianLectionary(Lectionary):
     def extract_synaxarium(self, soup):
         pass
 
-    BASE_URL = 'https://holytrinityorthodox.com/calendar/calendar.php'
+    SOURCE = ('https://holytrinityorthodox.com/calendar/calendar.php?month={month}&today={day}&year={year}'
+              '&dt=1&header=1&lives=1&trp=2&scripture=2')
+
+    def source_url(self):
+        # The calendar takes unpadded numbers, which strftime can't portably produce
+        return self.SOURCE.format(month=self.today.month, day=self.today.day, year=self.today.year)
 
     def __init__(self):
         super().__init__()
@@ -28,9 +33,7 @@ class OrthodoxRussianLectionary(Lectionary):
 
     def regenerate(self):
         super().regenerate()
-        self.url = self._build_calendar_url()
-
-        soup = self.fetch_and_parse_html(self.url)
+        self.url, soup = self.fetch_from_source(validate=self._has_calendar)
         if soup is not None:
             try:
                 self.title = self.extract_title(soup)
@@ -42,13 +45,9 @@ class OrthodoxRussianLectionary(Lectionary):
             except Exception as e:
                 _logger.error(f"Failed to parse the webpage: {e}", exc_info=True)
 
-    def _build_calendar_url(self):
-        url = f'{self.BASE_URL}' \
-              f'?month={self.today.month}' \
-              f'&today={self.today.day}' \
-              f'&year={self.today.year}' \
-              f'&dt=1&header=1&lives=1&trp=2&scripture=2'
-        return url
+    @staticmethod
+    def _has_calendar(soup):
+        return soup.select_one('span[class="dataheader"]') is not None
 
     def extract_title(self, soup):
         return soup.select_one('span[class="dataheader"]').text
@@ -89,7 +88,7 @@ class OrthodoxRussianLectionary(Lectionary):
         values = [value.replace('\n', '').replace('\r', '') for value in values]
         return dict(zip(keys, values))
 
-    def build_json(self):
+    def build_embeds(self):
         if not self.ready:
             return []
 
@@ -101,28 +100,29 @@ class OrthodoxRussianLectionary(Lectionary):
         ]
 
     def _build_main_embed(self):
-        return {
+        return RenderedEmbed.build({
             'title': self.title,
             'description': '\n'.join(self.subtitles),
             'author': {'name': 'Russian Orthodox Lectionary', 'url': self.url},
-        }
+        })
 
     def _build_saints_embed(self):
-        return {
+        return RenderedEmbed.build({
             'title': 'Saints & Feasts',
             'description': '\n'.join(self.saints),
-        }
+        })
 
     def _build_readings_embed(self):
-        return {
+        references = []
+        return RenderedEmbed.build({
             'title': 'The Scripture Readings',
-            'description': bible_url.html_convert(''.join(self.readings)),
-        }
+            'description': bible_url.html_convert(''.join(self.readings), references),
+        }, references)
 
     def _build_troparion_embed(self):
-        return {
+        return RenderedEmbed.build({
             'title': 'Troparion',
             'footer': {'text': '© Holy Trinity Russian Orthodox Church'},
             'fields': [{'name': saint, 'value': troparion, 'inline': False} for saint, troparion in
                        self.troparion.items()],
-        }
+        })
@@ -6,7 +6,8 @@ from bs4 import BeautifulSoup
 
 from helpers import bible_url
 from helpers import date_expand
-from lectionary.base import Lectionary
+from helpers import fetcher
+from lectionary.base import Lectionary, RenderedEmbed
 
 
 class RevisedCommonLectionary(Lectionary):
@@ -17,6 +18,9 @@ class RevisedCommonLectionary(Lectionary):
     a flat readings list. Currently disabled in the cog but kept for future use.
     """
 
+    # daily.php only serves today's readings
+    DATED = False
+
     def __init__(self):
         super().__init__()  # Initialize base class attributes
         self.url = 'https://lectionary.library.vanderbilt.edu/daily.php'
@@ -67,6 +71,7 @@ class RevisedCommonLectionary(Lectionary):
     def _fetch_page(self):
         """Fetch and parse the RCL daily readings page."""
         try:
+            fetcher.wait_for_slot(self.url)
             r = requests.get(self.url)
             if r.status_code != 200:
                 self.clear()
@@ -157,6 +162,7 @@ class RevisedCommonLectionary(Lectionary):
         helper method scrapes from that.
         """
         try:
+            fetcher.wait_for_slot(url)
             r = requests.get(url)
             if r.status_code != 200:
                 return []
@@ -194,6 +200,7 @@ class RevisedCommonLectionary(Lectionary):
         url = self.today.strftime('https://liturgical.today/reformed/%Y-%m-%d')
 
         try:
+            fetcher.wait_for_slot(url)
             r = requests.get(url=url)
             if r.status_code != 200:
                 return 0
@@ -207,18 +214,19 @@ class RevisedCommonLectionary(Lectionary):
         else:
             return 0
 
-    def build_json(self):
+    def build_embeds(self):
         """
-        Convert daily calendar info to discord Embed json data
+        Convert daily calendar info to discord embeds
         """
         if not self.ready:
             return []
 
+        references = []
         return [
-            {
+            RenderedEmbed.build({
                 'title': self.title,
                 'description': (
-                    bible_url.html_convert(self.sections[''])
+                    bible_url.html_convert(self.sections[''], references)
                     if '' in self.sections
                     else ''
                 ),
@@ -232,10 +240,10 @@ class RevisedCommonLectionary(Lectionary):
                 'fields': [
                     {
                         'name': key,
-                        'value': bible_url.html_convert(self.sections[key]),
+                        'value': bible_url.html_convert(self.sections[key], references),
                         'inline': False
                     }
                     for key in self.sections if key
                 ]
-            }
+            }, references)
         ]
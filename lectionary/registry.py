@@ -3,12 +3,22 @@ Centralized lectionary management and caching.
 
 This module provides a single registry for all lectionary instances,
 replacing the scattered initialization and lookup logic in the cog.
+
+Regeneration (fetching and HTML parsing) and rendering are CPU and I/O
+heavy, so the *_async methods run them in an executor pool and marshal the
+results back to the event loop.
 """
+import asyncio
 import datetime
-from typing import Optional, Dict, List
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Optional, Dict, List, NamedTuple, Tuple
 
+from helpers import fetcher
+from helpers.bot_config import Config
+from helpers.fetcher import Priority
 from helpers.logger import get_logger
-from lectionary.base import Lectionary
+from lectionary.base import Lectionary, RenderedEmbed, reading_date, streaming
 from lectionary.armenian import ArmenianLectionary
 from lectionary.bcp import BookOfCommonPrayer
 from lectionary.catholic import CatholicLectionary
@@ -21,6 +31,59 @@ from lectionary.orthodox_russian import OrthodoxRussianLectionary
 _logger = get_logger(__name__)
 
 
+class _Backoff(NamedTuple):
+    """Negative-cache entry for a source that hasn't published today's data."""
+    day: datetime.date
+    failures: int
+    retry_after: datetime.datetime
+
+
+def _create_executor(kind: str, workers: int) -> Executor:
+    """
+    Create the pool used for regeneration and rendering.
+
+    A process pool keeps parsing off the bot's interpreter entirely, but each
+    worker has its own fetch scheduler, so per-host rate limits apply per
+    process rather than globally.
+    """
+    if kind == 'process':
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='lectionary')
+
+
+def _build_snapshot(lectionary_class: type, priority: Priority,
+                    sink: Optional[Callable[[RenderedEmbed], None]] = None,
+                    day: Optional[datetime.date] = None) -> Lectionary:
+    """
+    Construct (and thereby regenerate) a lectionary in a pool worker, and
+    render it there too, so the published snapshot carries its embeds and
+    combined links. Embeds the lectionary emits early are passed to sink.
+    The readings are for day if given, otherwise today.
+    """
+    with fetcher.priority(priority), streaming(sink), reading_date(day):
+        lec = lectionary_class()
+    _prerender(lec)
+    return lec
+
+
+def _prerender(lec: Lectionary) -> None:
+    """Render a new snapshot before it's published."""
+    try:
+        lec.render()
+    except Exception as e:
+        # Publish anyway; rendering is retried (and fails visibly) on send
+        _logger.error(f'Error rendering {type(lec).__name__}: {e}', exc_info=True)
+
+
+def _render(lec: Lectionary) -> Tuple[RenderedEmbed, ...]:
+    """Render a lectionary's embeds in a pool worker."""
+    return lec.render()
+
+
+def _build_json(lec: Lectionary) -> List[dict]:
+    return lec.build_json()
+
+
 class LectionaryRegistry:
     """
     Manages lectionary instances with caching and lazy regeneration.
@@ -29,6 +92,11 @@ class LectionaryRegistry:
     - Lectionary instantiation
     - Name/alias to index mapping
     - Cache management (regenerate if stale or not ready)
+
+    Each slot in _instances holds an immutable (frozen) lectionary snapshot.
+    Regeneration builds a new snapshot off to the side and publishes it with
+    a single list assignment, so readers never see half-built state and never
+    need to lock.
     """
     
     # Centralized name-to-index mapping (single source of truth)
@@ -59,19 +127,47 @@ class LectionaryRegistry:
     # Cache duration - regenerate if older than this
     CACHE_DURATION = datetime.timedelta(hours=1)
 
-    def __init__(self):
-        """Initialize all lectionary instances."""
+    # Re-poll schedule for sources that haven't published yet (or where only a
+    # fallback is available): 5, 10, 20, 40 minutes, then hourly
+    RETRY_BACKOFF_BASE = datetime.timedelta(minutes=5)
+    RETRY_BACKOFF_MAX = datetime.timedelta(hours=1)
+
+    def __init__(self, instances: Optional[List[Lectionary]] = None, executor: Optional[Executor] = None):
+        """
+        Initialize all lectionary instances.
+
+        Args:
+            instances: Lectionaries to manage, in index order. Defaults to the
+                       enabled lectionaries (mainly overridden by tests).
+            executor: Pool for regeneration and rendering. Defaults to one
+                      built from the bot config on first use.
+        """
         _logger.debug('Initializing lectionary registry')
-        self._instances: List[Lectionary] = [
-            ArmenianLectionary(),
-            BookOfCommonPrayer(),
-            CatholicLectionary(),
-            OrthodoxAmericanLectionary(),
-            OrthodoxCopticLectionary(),
-            # OrthodoxGreekLectionary(),  # Disabled
-            OrthodoxRussianLectionary(),
-            # RevisedCommonLectionary(),  # Disabled
-        ]
+        if instances is None:
+            instances = [
+                ArmenianLectionary(),
+                BookOfCommonPrayer(),
+                CatholicLectionary(),
+                OrthodoxAmericanLectionary(),
+                OrthodoxCopticLectionary(),
+                # OrthodoxGreekLectionary(),  # Disabled
+                OrthodoxRussianLectionary(),
+                # RevisedCommonLectionary(),  # Disabled
+            ]
+        self._instances: List[Lectionary] = instances
+        # Only writers take this lock; readers just index into _instances
+        self._publish_lock = threading.Lock()
+        # Index -> backoff state for lectionaries whose last refresh failed
+        self._backoff: Dict[int, _Backoff] = {}
+        self._executor = executor
+        # Index -> in-flight async refresh, so concurrent requests share one
+        self._inflight: Dict[int, asyncio.Future] = {}
+        # (index, date) -> snapshot of another day's readings, and its in-flight build
+        self._dated: Dict[Tuple[int, datetime.date], Lectionary] = {}
+        self._inflight_dated: Dict[Tuple[int, datetime.date], asyncio.Future] = {}
+        for index, lec in enumerate(instances):
+            lec.freeze()
+            self._record_outcome(index, lec)
 
     def get_index(self, name: str) -> int:
         """
@@ -99,12 +195,13 @@ class LectionaryRegistry:
             return self.NAMES[index]
         return "Unknown"
 
-    def get(self, index: int) -> Optional[Lectionary]:
+    def get(self, index: int, priority: Priority = Priority.INTERACTIVE) -> Optional[Lectionary]:
         """
         Get lectionary by index, regenerating if stale.
         
         Args:
             index: The lectionary index
+            priority: Fetch priority for any regeneration this triggers
             
         Returns:
             The lectionary instance, or None if invalid index.
@@ -116,27 +213,277 @@ class LectionaryRegistry:
         
         lec = self._instances[index]
         
-        if self._needs_regeneration(lec):
-            lec.regenerate()
+        if self._needs_regeneration(index):
+            lec = self._refresh(index, priority)
             if not lec.ready:
                 _logger.warning(f'Lectionary {type(lec).__name__} not ready (source may be unavailable)')
         
         return lec
 
-    def _needs_regeneration(self, lec: Lectionary) -> bool:
-        """Check if a lectionary needs to be regenerated."""
+    async def get_async(self, index: int, priority: Priority = Priority.INTERACTIVE,
+                        day: Optional[datetime.date] = None) -> Optional[Lectionary]:
+        """
+        Like get(), but any regeneration runs in the executor pool so the
+        event loop stays responsive.
+
+        Args:
+            day: Whose readings to get (e.g. a delivery's local date), if not
+                 today's. Lectionaries whose source only serves today's
+                 readings ignore it.
+        """
+        if not (0 <= index < len(self._instances)):
+            return None
+
+        if day is not None and day != datetime.date.today() and self._instances[index].DATED:
+            return await self._get_dated_async(index, day, priority)
+
+        lec = self._instances[index]
+
+        if self._needs_regeneration(index):
+            lec = await self._refresh_async(index, priority)
+            if not lec.ready:
+                _logger.warning(f'Lectionary {type(lec).__name__} not ready (source may be unavailable)')
+
+        return lec
+
+    async def _get_dated_async(self, index: int, day: datetime.date, priority: Priority) -> Lectionary:
+        """
+        Get a lectionary's snapshot for a day other than today (e.g. tomorrow,
+        for a guild already past midnight), building it if it's missing or
+        stale. Concurrent callers share a single build.
+        """
+        key = (index, day)
+        lec = self._dated.get(key)
+        if lec is not None and not self._dated_needs_regeneration(lec):
+            return lec
+
+        inflight = self._inflight_dated.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._build_dated(index, day, priority))
+            self._inflight_dated[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight_dated.pop(key, None))
+        return await asyncio.shield(inflight)
+
+    async def _build_dated(self, index: int, day: datetime.date, priority: Priority) -> Lectionary:
+        """
+        Build and keep another day's snapshot. A failed build never replaces a
+        good snapshot, and snapshots for days that have passed are dropped.
+        """
+        loop = asyncio.get_running_loop()
+        lectionary_class = type(self._instances[index])
+        fresh = await loop.run_in_executor(self.executor, _build_snapshot, lectionary_class, priority, None, day)
+        fresh.freeze()
+
+        current = self._dated.get((index, day))
+        if current is not None and current.ready and not fresh.ready:
+            _logger.warning(f'Keeping previous {type(current).__name__} snapshot for {day} after failed refresh')
+            return current
+        if not fresh.ready:
+            _logger.warning(f'Lectionary {type(fresh).__name__} not ready for {day} (source may be unavailable)')
+
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        for stale in [key for key in self._dated if key[1] < yesterday]:
+            del self._dated[stale]
+        self._dated[(index, day)] = fresh
+        return fresh
+
+    def _dated_needs_regeneration(self, lec: Lectionary) -> bool:
+        """Check if another day's snapshot needs to be rebuilt (failed ones are retried after the first backoff step)."""
+        max_age = self.CACHE_DURATION if lec.ready and not lec.provisional else self.RETRY_BACKOFF_BASE
+        return datetime.datetime.now() - lec.last_regeneration > max_age
+
+    async def build_json_async(self, lec: Lectionary) -> List[dict]:
+        """Render a lectionary's embed json in the executor pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _build_json, lec)
+
+    async def render_async(self, lec: Lectionary) -> Tuple[RenderedEmbed, ...]:
+        """
+        Get a lectionary's rendered embeds.
+
+        Snapshots are normally rendered while they're built, in which case
+        this returns immediately; otherwise the render runs in the executor
+        pool. With a process pool the render can't be cached on the shared
+        snapshot, so each call renders again.
+        """
+        if lec.rendered is not None:
+            return lec.rendered
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _render, lec)
+
+    async def stream_async(self, index: int,
+                           priority: Priority = Priority.INTERACTIVE) -> AsyncIterator[Tuple[RenderedEmbed, ...]]:
+        """
+        Get a lectionary's rendered embeds as soon as each is available.
+
+        A fresh snapshot is yielded in one batch. If the lectionary has to
+        be regenerated, any embeds it emits early (e.g. Catholic's first
+        page while the linked pages load) are yielded one at a time, and the
+        rest in a final batch once the new snapshot is published. Early
+        embeds can only cross thread boundaries, so with a process pool this
+        behaves like get_async() followed by render_async().
+
+        Yields:
+            Batches of embeds, in order
+        """
+        if not (0 <= index < len(self._instances)):
+            return
+
+        streamable = isinstance(self.executor, ThreadPoolExecutor)
+        if not self._needs_regeneration(index) or index in self._inflight or not streamable:
+            lec = await self.get_async(index, priority)
+            yield await self.render_async(lec)
+            return
+
+        loop = asyncio.get_running_loop()
+        early: asyncio.Queue = asyncio.Queue()
+        refresh = asyncio.ensure_future(
+            self._refresh_async(index, priority, lambda embed: loop.call_soon_threadsafe(early.put_nowait, embed)))
+
+        sent: List[RenderedEmbed] = []
+        while not refresh.done():
+            getter = asyncio.ensure_future(early.get())
+            await asyncio.wait((getter, refresh), return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                sent.append(getter.result())
+                yield (sent[-1],)
+            else:
+                getter.cancel()
+        # Emitted before the build returned, so already queued
+        while not early.empty():
+            sent.append(early.get_nowait())
+            yield (sent[-1],)
+
+        lec = refresh.result()
         if not lec.ready:
+            _logger.warning(f'Lectionary {type(lec).__name__} not ready (source may be unavailable)')
+        embeds = await self.render_async(lec)
+        if tuple(embeds[:len(sent)]) != tuple(sent):
+            # Another snapshot was published instead (e.g. the refresh failed
+            # after its first page); send it whole rather than spliced
+            _logger.warning(f'Streamed {type(lec).__name__} embeds superseded, sending the published snapshot')
+            yield embeds
+        elif len(embeds) > len(sent):
+            yield embeds[len(sent):]
+
+    def _refresh(self, index: int, priority: Priority = Priority.BACKGROUND) -> Lectionary:
+        """
+        Build a new snapshot for a lectionary and atomically publish it.
+
+        Returns:
+            The snapshot that is published once the refresh completes.
+        """
+        with fetcher.priority(priority):
+            fresh = self._instances[index].refreshed()
+        _prerender(fresh)
+        return self._publish(index, fresh)
+
+    async def _refresh_async(self, index: int, priority: Priority,
+                             sink: Optional[Callable[[RenderedEmbed], None]] = None) -> Lectionary:
+        """
+        Like _refresh(), with the regeneration running in the executor pool.
+        Concurrent callers for the same lectionary share a single refresh,
+        which is published (and its outcome recorded) once; only the caller
+        that starts it gets early embeds in sink.
+        """
+        inflight = self._inflight.get(index)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._build_and_publish(index, priority, sink))
+            self._inflight[index] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(index, None))
+        return await asyncio.shield(inflight)
+
+    async def _build_and_publish(self, index: int, priority: Priority,
+                                 sink: Optional[Callable[[RenderedEmbed], None]]) -> Lectionary:
+        """Build a snapshot in the executor pool and publish it."""
+        loop = asyncio.get_running_loop()
+        lectionary_class = type(self._instances[index])
+        fresh = await loop.run_in_executor(self.executor, _build_snapshot, lectionary_class, priority, sink)
+        return self._publish(index, fresh)
+
+    def _publish(self, index: int, fresh: Lectionary) -> Lectionary:
+        """
+        Freeze a freshly built snapshot and atomically publish it.
+
+        A failed refresh never replaces the snapshot for the same day (keeping
+        any good data it holds), and a slower concurrent refresh never
+        overwrites a newer one.
+
+        Returns:
+            The snapshot that is published afterwards.
+        """
+        fresh.freeze()
+
+        with self._publish_lock:
+            self._record_outcome(index, fresh)
+            current = self._instances[index]
+            if fresh.last_regeneration < current.last_regeneration:
+                return current
+            if not fresh.ready:
+                if not current.ready:
+                    return current
+                if current.today == datetime.date.today():
+                    _logger.warning(f'Keeping previous {type(current).__name__} snapshot after failed refresh')
+                    return current
+            self._instances[index] = fresh
+            return fresh
+
+    def _record_outcome(self, index: int, fresh: Lectionary) -> None:
+        """
+        Remember a failed or fallback-only refresh so the source is re-polled
+        on a backoff schedule instead of on every request.
+        """
+        if fresh.ready and not fresh.provisional:
+            self._backoff.pop(index, None)
+            return
+
+        today = datetime.date.today()
+        previous = self._backoff.get(index)
+        failures = previous.failures + 1 if previous and previous.day == today else 1
+        delay = min(self.RETRY_BACKOFF_BASE * 2 ** (failures - 1), self.RETRY_BACKOFF_MAX)
+        self._backoff[index] = _Backoff(today, failures, datetime.datetime.now() + delay)
+        _logger.debug(f'{type(fresh).__name__} not fully available, re-polling in {delay}')
+
+    def _needs_regeneration(self, index: int) -> bool:
+        """Check if a lectionary needs to be regenerated."""
+        backoff = self._backoff.get(index)
+        if backoff is not None and backoff.day == datetime.date.today():
+            # Serve the current snapshot (or its fallback) until the next poll
+            return datetime.datetime.now() >= backoff.retry_after
+
+        lec = self._instances[index]
+        if not lec.ready or lec.today != datetime.date.today():
             return True
         time_since_regen = datetime.datetime.now() - lec.last_regeneration
         return time_since_regen > self.CACHE_DURATION
 
-    def regenerate_all(self) -> None:
-        """Force regeneration of all lectionaries."""
-        for lec in self._instances:
-            if self._needs_regeneration(lec):
-                lec.regenerate()
+    def regenerate_all(self, priority: Priority = Priority.SCHEDULED) -> None:
+        """Regenerate every lectionary that is stale or not ready."""
+        for index in range(len(self._instances)):
+            if self._needs_regeneration(index):
+                self._refresh(index, priority)
         _logger.debug('Regenerated all lectionaries')
 
+    async def regenerate_all_async(self, priority: Priority = Priority.SCHEDULED) -> None:
+        """Like regenerate_all(), refreshing stale lectionaries concurrently in the executor pool."""
+        stale = [index for index in range(len(self._instances)) if self._needs_regeneration(index)]
+        await asyncio.gather(*(self._refresh_async(index, priority) for index in stale))
+        _logger.debug('Regenerated all lectionaries')
+
+    @property
+    def executor(self) -> Executor:
+        """The pool used for regeneration and rendering."""
+        if self._executor is None:
+            config = Config()
+            self._executor = _create_executor(config.executor, config.executor_workers)
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Shut down the executor pool (on bot shutdown)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
     @property
     def lectionary_names(self) -> List[str]:
         """Get the list of display names (for backwards compatibility)."""
@@ -69,7 +69,7 @@ class TestBibleReferenceUSCCB(unittest.TestCase):
         self.assertEqual(result, 'Acts 2:1-4')
 
     def test_judith_before_deuteronomy(self):
-        """JDT should match before DT (order matters)."""
+        """JDT should expand to Judith, not J + Deuteronomy."""
         from helpers.bible_reference import normalize_usccb_reference
         result = normalize_usccb_reference('JDT 8:1-8')
         self.assertEqual(result, 'Judith 8:1-8')
@@ -80,6 +80,20 @@ class TestBibleReferenceUSCCB(unittest.TestCase):
         result = normalize_usccb_reference('DT 6:4-9')
         self.assertEqual(result, 'Deuteronomy 6:4-9')
 
+    def test_whole_token_match(self):
+        """Abbreviations should only match as whole tokens."""
+        from helpers.bible_reference import normalize_usccb_reference
+        self.assertEqual(normalize_usccb_reference('1 JN 4:7-10'), '1 John 4:7-10')
+        self.assertEqual(normalize_usccb_reference('JN 4:7-10'), 'John 4:7-10')
+        self.assertEqual(normalize_usccb_reference('TB 3:1-11'), 'Tobit 3:1-11')
+
+    def test_independent_of_table_order(self):
+        """The matcher shouldn't depend on the order of the table."""
+        from helpers import bible_reference
+        reordered = dict(reversed(list(bible_reference.USCCB_ABBREVIATIONS.items())))
+        pattern = bible_reference._abbreviation_pattern(reordered, bible_reference.re.IGNORECASE)
+        self.assertEqual(pattern.sub(lambda m: reordered[m.group(0).upper()], 'JDT 8:1-8'), 'Judith 8:1-8')
+
 
 class TestBibleReferenceCoptic(unittest.TestCase):
     """Unit tests for Coptic reference normalization."""
@@ -139,6 +153,94 @@ class TestBibleReferenceCoptic(unittest.TestCase):
         result = normalize_coptic_reference('Genesis 1:1')
         self.assertEqual(result, 'Genesis 1:1')
 
+    def test_full_names_not_expanded_again(self):
+        """Full names and abbreviations inside other tokens should be left alone."""
+        from helpers.bible_reference import normalize_coptic_reference
+        self.assertEqual(normalize_coptic_reference('Romans 1:1'), 'Romans 1:1')
+        self.assertEqual(normalize_coptic_reference('1Jn 1:1  & Jn 2:1'), '1 John 1:1; John 2:1')
+
+
+class TestBibleReferenceParse(unittest.TestCase):
+    """Unit tests for the structured reference parser."""
+
+    def test_book_and_ranges(self):
+        """Book IDs, codes and verse ranges should be parsed."""
+        from helpers.bible_reference import parse, VerseRange
+        ref = parse('Psalm 95:1-2, 6-7')
+        self.assertEqual(len(ref.passages), 1)
+        self.assertEqual(ref.passages[0].code, 'Ps')
+        self.assertEqual(ref.passages[0].ranges, (
+            VerseRange(95, 1, 95, 2),
+            VerseRange(95, 6, 95, 7),
+        ))
+
+    def test_cross_chapter_and_whole_chapter(self):
+        """'1:1-2:5' spans chapters; a bare number is a whole chapter."""
+        from helpers.bible_reference import parse, VerseRange
+        self.assertEqual(parse('John 1:1-2:5').passages[0].ranges, (VerseRange(1, 1, 2, 5),))
+        self.assertEqual(parse('Psalm 23').passages[0].ranges, (VerseRange(23, None, 23, None),))
+
+    def test_cleanup_applied(self):
+        """Verse letters and bracketed alternative chapters should be cleaned."""
+        from helpers.bible_reference import parse
+        ref = parse('4[2] Kings 2:6-14ab')
+        self.assertEqual(ref.text, '4[2] Kings 2:6-14ab')
+        self.assertEqual(ref.passages[0].code, '2Ki')
+        self.assertEqual(ref.passages[0].spec, '2:6-14')
+
+    def test_multiple_books(self):
+        """Semicolon-separated books should become separate passages."""
+        from helpers.bible_reference import parse
+        ref = parse('Matthew 1:1; Luke 1:1')
+        self.assertEqual([p.code for p in ref.passages], ['Mt', 'Lk'])
+
+    def test_comma_before_book_starts_a_passage(self):
+        """A comma followed by a book name separates books; before a number it doesn't."""
+        from helpers.bible_reference import parse
+        ref = parse('Matthew 1:1, 5, 1 John 2:3')
+        self.assertEqual([p.code for p in ref.passages], ['Mt', '1Jn'])
+        self.assertEqual(ref.passages[0].spec, '1:1,5')
+        self.assertEqual(ref.separators, (',',))
+
+    def test_continuation_keeps_book(self):
+        """A chapter after a semicolon without a book continues the previous book."""
+        from helpers.bible_reference import parse
+        ref = parse('Genesis 1:1; 2:3')
+        self.assertEqual(len(ref.passages), 1)
+        self.assertEqual(ref.passages[0].spec, '1:1;2:3')
+
+    def test_deuterocanon(self):
+        """Deuterocanonical books should be flagged by canonical ID."""
+        from helpers.bible_reference import parse
+        self.assertTrue(parse('Tobit 3:1-11').deuterocanon)
+        self.assertTrue(parse('Matthew 1:1; Sirach 2:1').deuterocanon)
+        self.assertFalse(parse('Genesis 1:1').deuterocanon)
+
+    def test_roman_ordinals_and_aliases(self):
+        """Roman ordinals and aliases should map to canonical books."""
+        from helpers.bible_reference import parse, normalize_book_names
+        self.assertEqual(parse('II Kings 2:1').passages[0].code, '2Ki')
+        self.assertEqual(parse('Azariah 1:1').passages[0].code, 'PrAz')
+        self.assertEqual(normalize_book_names('III John 1:1'), '3 John 1:1')
+        self.assertEqual(normalize_book_names('Prayer of Azariah 1:1'), 'Prayer of Azariah 1:1')
+
+    def test_unknown_book(self):
+        """Unknown books should parse without a book ID."""
+        from helpers.bible_reference import parse
+        self.assertIsNone(parse('Hezekiah 1:1').passages[0].book)
+
+    def test_merge_passages(self):
+        """Merging should combine, deduplicate and order passages by book."""
+        from helpers.bible_reference import parse, merge_passages
+        merged = merge_passages(parse(r) for r in ['John 1:5-9', 'Genesis 2:1', 'John 1:1-4', 'John 1:1-4'])
+        self.assertEqual([(p.code, p.spec) for p in merged], [('Ge', '2:1'), ('Jn', '1:1-9')])
+
+    def test_merge_keeps_unparsed(self):
+        """Passages that couldn't be parsed should pass through verbatim."""
+        from helpers.bible_reference import parse, merge_passages
+        merged = merge_passages([parse('Hezekiah 1:1'), parse('Genesis 1:1')])
+        self.assertEqual([p.name for p in merged], ['Ge', 'Hezekiah'])
+
 
 # =============================================================================
 # UNIT TESTS: helpers/date_expand.py
@@ -295,6 +397,30 @@ class TestBibleUrlConvert(unittest.TestCase):
         self.assertTrue(result.startswith('*'))
         self.assertTrue(result.endswith('*'))
 
+    def test_bracketed_alternative_chapter(self):
+        """'4[2] Kings' keeps its anchor text but links to 2 Kings."""
+        from helpers.bible_url import convert
+        result = convert('4[2] Kings 2:6-14')
+        self.assertEqual(result, '[4[2] Kings 2:6-14](https://biblegateway.com/passage/?search=2Ki+2:6-14)')
+
+    def test_verse_letters_lowercased_and_stripped(self):
+        from helpers.bible_url import convert
+        result = convert('1 Samuel 2:1-8ABCD, 10')
+        self.assertEqual(result, '[1 Samuel 2:1-8abcd, 10](https://biblegateway.com/passage/?search=1Sa+2:1-8,10)')
+
+    def test_alternative_readings_shortened(self):
+        """Unparsed remainders like 'or Psalm 100' are shortened, as before parsing existed."""
+        from helpers.bible_url import convert
+        result = convert('Psalm 23:1-6 or Psalm 100')
+        self.assertEqual(result, '[Psalm 23:1-6 or Psalm 100](https://biblegateway.com/passage/?search=Ps+23:1-6+Or+Ps+100)')
+
+    def test_comma_joined_books_keep_their_separators(self):
+        from helpers.bible_url import convert
+        self.assertEqual(convert('Matthew 1:1; 2:3, Luke 2:3-5'),
+                         '[Matthew 1:1; 2:3, Luke 2:3-5](https://biblegateway.com/passage/?search=Mt+1:1;2:3,Lk+2:3-5)')
+        self.assertEqual(convert('Wisdom 1:1, 1 John 2:3'),
+                         '[Wisdom 1:1, 1 John 2:3](https://biblegateway.com/passage/?search=Ws+1:1,1Jn+2:3&version=NRSVCE)')
+
 
 class TestBibleUrlHtmlConvert(unittest.TestCase):
     """Unit tests for HTML-to-markdown conversion."""
@@ -318,6 +444,11 @@ class TestBibleUrlHtmlConvert(unittest.TestCase):
         self.assertIn('Read', result)
         self.assertIn('today', result)
 
+    def test_repeated_anchor_converted_everywhere(self):
+        from helpers.bible_url import html_convert
+        result = html_convert('<a>John 3:16</a>\n<a>John 3:16</a>')
+        self.assertEqual(result.count('[John 3:16]'), 2)
+
 
 class TestBibleUrlShorten(unittest.TestCase):
     """Unit tests for reference shortening."""
@@ -337,6 +468,18 @@ class TestBibleUrlShorten(unittest.TestCase):
         result = shorten('Genesis 1:1; 2:1')
         self.assertNotIn('; ', result)
 
+    def test_longest_book_name_wins(self):
+        """'1 John' should use its own abbreviation, not '1 ' + John's."""
+        from helpers.bible_url import shorten
+        self.assertEqual(shorten('1 John 4:7-12'), '1Jn 4:7-12')
+        self.assertEqual(shorten('John 4:7-12'), 'Jn 4:7-12')
+        self.assertEqual(shorten('Psalms 23'), 'Ps 23')
+        self.assertEqual(shorten('Wisdom of Solomon 1:1'), 'Ws 1:1')
+
+    def test_multiple_books_in_one_pass(self):
+        from helpers.bible_url import shorten
+        self.assertEqual(shorten('Matthew 1:1; Luke 1:1'), 'Mt 1:1;Lk 1:1')
+
 
 class TestBibleUrlExtractReferences(unittest.TestCase):
     """Unit tests for extracting references from anchor tags."""
@@ -417,6 +560,22 @@ class TestBibleUrlBuildCombinedUrl(unittest.TestCase):
         result = build_combined_url(['Genesis 1:1', 'Sirach 2:3'])
         self.assertIn('version=NRSVCE', result)
 
+    def test_overlapping_ranges_merged(self):
+        """Repeated and overlapping passages should be requested once."""
+        from helpers.bible_url import build_combined_url
+        result = build_combined_url(['Psalm 23:1-3, 4, 5-6', 'Psalm 23:1-6', 'Genesis 1:1-5', 'Genesis 1:3-10'])
+        self.assertIn('search=Ge+1:1-10,+Ps+23:1-6)', result)
+
+    def test_books_in_canonical_order(self):
+        from helpers.bible_url import build_combined_url
+        result = build_combined_url(['John 3:16', 'Isaiah 1:1', 'Acts 2:1'])
+        self.assertIn('search=Is+1:1,+Jn+3:16,+Ac+2:1)', result)
+
+    def test_separate_chapters_kept(self):
+        from helpers.bible_url import build_combined_url
+        result = build_combined_url(['Psalm 23', 'Psalm 24', 'Psalm 26:1-3'])
+        self.assertIn('search=Ps+23-24;26:1-3)', result)
+
 
 class TestBibleUrlExtractAndBuildCombinedUrl(unittest.TestCase):
     """Unit tests for the convenience function."""
@@ -428,6 +587,77 @@ class TestBibleUrlExtractAndBuildCombinedUrl(unittest.TestCase):
         self.assertIn('Read all on Bible Gateway', result)
 
 
+# =============================================================================
+# UNIT TESTS: helpers/fetcher.py
+# =============================================================================
+
+class TestLatencyTracker(unittest.TestCase):
+    """Unit tests for per-host latency percentiles."""
+
+    def test_no_percentile_without_samples(self):
+        from helpers.fetcher import LatencyTracker
+        tracker = LatencyTracker()
+        tracker.record('example.com', 1.0)
+        self.assertIsNone(tracker.p95('example.com'))
+
+    def test_p95(self):
+        from helpers.fetcher import LatencyTracker
+        tracker = LatencyTracker()
+        for i in range(1, 21):
+            tracker.record('example.com', float(i))
+        self.assertEqual(tracker.p95('example.com'), 19.0)
+
+
+class TestFetchScheduler(unittest.TestCase):
+    """Unit tests for per-host rate limiting and priority ordering."""
+
+    def test_token_bucket_burst_then_wait(self):
+        from helpers.fetcher import TokenBucket
+        bucket = TokenBucket(rate=1.0, capacity=2)
+        self.assertEqual(bucket.try_take(), 0)
+        self.assertEqual(bucket.try_take(), 0)
+        self.assertGreater(bucket.try_take(), 0)
+
+    def test_hosts_have_separate_buckets(self):
+        import time
+        from helpers.fetcher import FetchScheduler, Priority
+        scheduler = FetchScheduler(rate=0.1, burst=1)
+        start = time.monotonic()
+        scheduler.acquire('a.test', Priority.BACKGROUND)
+        scheduler.acquire('b.test', Priority.BACKGROUND)
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_interactive_served_before_background(self):
+        import threading
+        import time
+        from helpers.fetcher import FetchScheduler, Priority
+        scheduler = FetchScheduler(rate=10.0, burst=1)
+        scheduler.acquire('a.test', Priority.BACKGROUND)  # Drain the bucket
+        order = []
+
+        def worker(level):
+            scheduler.acquire('a.test', level)
+            order.append(level)
+
+        background = threading.Thread(target=worker, args=(Priority.BACKGROUND,))
+        background.start()
+        time.sleep(0.02)
+        interactive = threading.Thread(target=worker, args=(Priority.INTERACTIVE,))
+        interactive.start()
+        background.join(2)
+        interactive.join(2)
+
+        self.assertEqual(order, [Priority.INTERACTIVE, Priority.BACKGROUND])
+
+    def test_priority_context(self):
+        from helpers import fetcher
+        from helpers.fetcher import Priority
+        self.assertEqual(fetcher.current_priority(), Priority.BACKGROUND)
+        with fetcher.priority(Priority.INTERACTIVE):
+            self.assertEqual(fetcher.current_priority(), Priority.INTERACTIVE)
+        self.assertEqual(fetcher.current_priority(), Priority.BACKGROUND)
+
+
 # =============================================================================
 # UNIT TESTS: lectionary/registry.py
 # =============================================================================
@@ -518,6 +748,318 @@ class TestLectionaryRegistryGet(unittest.TestCase):
         self.assertIsNone(lec)
 
 
+def _make_fake_lectionary_class(outcomes):
+    """
+    Build a minimal Lectionary subclass for registry tests.
+
+    Each regenerate() pops the next value from outcomes to decide whether
+    the fetch "succeeded". No network access is involved.
+    """
+    from lectionary.base import Lectionary
+
+    class FakeLectionary(Lectionary):
+        def __init__(self):
+            super().__init__()
+            self.regenerate()
+
+        def regenerate(self):
+            super().regenerate()
+            if outcomes.pop(0):
+                self.title = f'Fetched {self.last_regeneration.isoformat()}'
+                self.ready = True
+
+        def extract_title(self, soup):
+            pass
+
+        def extract_subtitle(self, soup):
+            pass
+
+        def extract_readings(self, soup):
+            pass
+
+        def extract_synaxarium(self, soup):
+            pass
+
+        def build_json(self):
+            return [{'title': self.title}] if self.ready else []
+
+    return FakeLectionary
+
+
+class TestLectionaryRegistrySnapshots(unittest.TestCase):
+    """Unit tests for immutable snapshot publishing in the registry."""
+
+    def test_instances_are_frozen(self):
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([True])
+        registry = LectionaryRegistry([fake()])
+        with self.assertRaises(AttributeError):
+            registry.lectionaries[0].title = 'changed'
+
+    def test_refresh_publishes_new_snapshot(self):
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([True, True])
+        registry = LectionaryRegistry([fake()])
+        old = registry.lectionaries[0]
+
+        new = registry._refresh(0)
+
+        self.assertIsNot(old, new)
+        self.assertIs(registry.lectionaries[0], new)
+        self.assertTrue(new.frozen)
+        # The old snapshot is untouched for readers still holding it
+        self.assertTrue(old.ready)
+
+    def test_failed_refresh_keeps_good_snapshot(self):
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([True, False])
+        registry = LectionaryRegistry([fake()])
+        old = registry.lectionaries[0]
+
+        result = registry._refresh(0)
+
+        self.assertIs(result, old)
+        self.assertEqual(registry.lectionaries[0].build_json(), [{'title': old.title}])
+
+    def test_successful_refresh_replaces_unready_snapshot(self):
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([False, True])
+        registry = LectionaryRegistry([fake()])
+
+        result = registry._refresh(0)
+
+        self.assertTrue(result.ready)
+        self.assertIs(registry.lectionaries[0], result)
+
+    def test_snapshot_from_yesterday_is_refreshed(self):
+        """Content refreshed just before midnight must not be served the next day."""
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([True, True])
+        stale = fake()
+        stale.today -= datetime.timedelta(days=1)
+        registry = LectionaryRegistry([stale])
+
+        self.assertEqual(registry.get(0).today, datetime.date.today())
+
+
+class TestLectionaryRegistryBackoff(unittest.TestCase):
+    """Unit tests for negative caching of unavailable sources."""
+
+    def test_unavailable_source_not_refetched_every_request(self):
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([False])
+        registry = LectionaryRegistry([fake()])
+
+        # Would raise IndexError from the fake if another fetch happened
+        for _ in range(3):
+            self.assertFalse(registry.get(0).ready)
+
+    def test_repolls_after_backoff_expires(self):
+        from lectionary.registry import LectionaryRegistry
+        outcomes = [False, True]
+        fake = _make_fake_lectionary_class(outcomes)
+        registry = LectionaryRegistry([fake()])
+        registry._backoff[0] = registry._backoff[0]._replace(retry_after=datetime.datetime.min)
+
+        self.assertTrue(registry.get(0).ready)
+        self.assertNotIn(0, registry._backoff)
+
+    def test_backoff_grows_with_consecutive_failures(self):
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([False, False, False])
+        registry = LectionaryRegistry([fake()])
+        first_delay = registry._backoff[0].retry_after - datetime.datetime.now()
+
+        registry._refresh(0)
+        registry._refresh(0)
+
+        self.assertEqual(registry._backoff[0].failures, 3)
+        second_delay = registry._backoff[0].retry_after - datetime.datetime.now()
+        self.assertGreater(second_delay, first_delay * 3)
+
+    def test_provisional_snapshot_is_served_and_repolled(self):
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([True])
+        fake.provisional = True
+        registry = LectionaryRegistry([fake()])
+
+        self.assertTrue(registry.get(0).ready)
+        self.assertIn(0, registry._backoff)
+
+
+class TestLectionaryRegistryAsync(unittest.TestCase):
+    """Unit tests for running regeneration and rendering in the executor pool."""
+
+    def setUp(self):
+        from concurrent.futures import ThreadPoolExecutor
+        self.executor = ThreadPoolExecutor(max_workers=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_get_async_refreshes_in_pool(self):
+        import asyncio
+        import threading
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([False, True])
+        threads = []
+        original_regenerate = fake.regenerate
+
+        def regenerate(self):
+            threads.append(threading.current_thread())
+            original_regenerate(self)
+
+        fake.regenerate = regenerate
+        registry = LectionaryRegistry([fake()], executor=self.executor)
+        registry._backoff.clear()
+        threads.clear()
+
+        lec = asyncio.run(registry.get_async(0))
+
+        self.assertTrue(lec.ready)
+        self.assertTrue(lec.frozen)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+    def test_concurrent_get_async_shares_refresh(self):
+        import asyncio
+        from lectionary.registry import LectionaryRegistry
+        # Only one extra outcome: a second refresh would raise IndexError
+        fake = _make_fake_lectionary_class([False, True])
+        registry = LectionaryRegistry([fake()], executor=self.executor)
+        registry._backoff.clear()
+
+        async def fetch_twice():
+            return await asyncio.gather(registry.get_async(0), registry.get_async(0))
+
+        first, second = asyncio.run(fetch_twice())
+        self.assertIs(first, second)
+
+    def test_shared_refresh_records_one_failure(self):
+        import asyncio
+        import threading
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([False, False])
+        registry = LectionaryRegistry([fake()], executor=self.executor)
+        registry._backoff.clear()
+        release = threading.Event()
+        original_regenerate = fake.regenerate
+
+        def regenerate(self):
+            # Hold the build until every caller is waiting on it
+            release.wait(5)
+            original_regenerate(self)
+
+        fake.regenerate = regenerate
+
+        async def fetch_concurrently():
+            calls = [asyncio.ensure_future(registry.get_async(0)) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*calls)
+
+        results = asyncio.run(fetch_concurrently())
+        self.assertEqual(len({id(lec) for lec in results}), 1)
+        self.assertEqual(registry._backoff[0].failures, 1)
+
+    def test_get_async_for_another_day(self):
+        import asyncio
+        from lectionary.registry import LectionaryRegistry
+        # One outcome for today's snapshot, one for tomorrow's: a rebuild would raise IndexError
+        fake = _make_fake_lectionary_class([True, True])
+        registry = LectionaryRegistry([fake()], executor=self.executor)
+        tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+
+        async def fetch_tomorrow():
+            return await registry.get_async(0, day=tomorrow), await registry.get_async(0, day=tomorrow)
+
+        first, second = asyncio.run(fetch_tomorrow())
+        self.assertEqual(first.today, tomorrow)
+        self.assertTrue(first.frozen)
+        self.assertIs(first, second)
+        self.assertEqual(registry.lectionaries[0].today, datetime.date.today())
+
+    def test_undated_source_serves_today(self):
+        import asyncio
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([True])
+        fake.DATED = False
+        registry = LectionaryRegistry([fake()], executor=self.executor)
+        tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+
+        self.assertIs(asyncio.run(registry.get_async(0, day=tomorrow)), registry.lectionaries[0])
+
+    def test_build_json_async(self):
+        import asyncio
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([True])
+        registry = LectionaryRegistry([fake()], executor=self.executor)
+        lec = registry.lectionaries[0]
+
+        self.assertEqual(asyncio.run(registry.build_json_async(lec)), lec.build_json())
+
+    def test_render_async_uses_snapshot_render(self):
+        """Snapshots are rendered while being built, so render_async shouldn't re-render."""
+        import asyncio
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([True, True])
+        registry = LectionaryRegistry([fake()], executor=self.executor)
+        lec = registry._refresh(0)
+
+        self.assertIsNotNone(lec.rendered)
+        self.assertIs(asyncio.run(registry.render_async(lec)), lec.rendered)
+
+    def test_stream_async_sends_early_embeds_first(self):
+        """An embed emitted mid-regeneration should arrive before the build finishes."""
+        import asyncio
+        import threading
+        from lectionary.base import RenderedEmbed
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([False, True])
+        release = threading.Event()
+        original_regenerate = fake.regenerate
+
+        def regenerate(self):
+            self.emit_partial(RenderedEmbed.build({'title': 'first'}))
+            # Only finish once the first embed has been received
+            release.wait(5)
+            original_regenerate(self)
+
+        fake.build_json = lambda self: [{'title': 'first'}, {'title': 'second'}] if self.ready else []
+        registry = LectionaryRegistry([fake()], executor=self.executor)
+        registry._backoff.clear()
+        fake.regenerate = regenerate
+
+        async def collect():
+            batches = []
+            async for batch in registry.stream_async(0):
+                batches.append([embed.payload['title'] for embed in batch])
+                release.set()
+            return batches
+
+        self.assertEqual(asyncio.run(collect()), [['first'], ['second']])
+
+    def test_stream_async_fresh_snapshot_is_one_batch(self):
+        import asyncio
+        from lectionary.registry import LectionaryRegistry
+        fake = _make_fake_lectionary_class([True])
+        registry = LectionaryRegistry([fake()], executor=self.executor)
+
+        async def collect():
+            return [batch async for batch in registry.stream_async(0)]
+
+        self.assertEqual(asyncio.run(collect()), [registry.lectionaries[0].render()])
+
+    def test_process_executor_option(self):
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        from lectionary.registry import _create_executor
+        process_pool = _create_executor('process', 1)
+        thread_pool = _create_executor('thread', 1)
+        self.assertIsInstance(process_pool, ProcessPoolExecutor)
+        self.assertIsInstance(thread_pool, ThreadPoolExecutor)
+        process_pool.shutdown()
+        thread_pool.shutdown()
+
+
 # =============================================================================
 # UNIT TESTS: Lectionary Base Class
 # =============================================================================
@@ -749,6 +1291,13 @@ class TestOrthodoxRussianLectionary(unittest.TestCase):
         lec = OrthodoxRussianLectionary()
         self.assertIsInstance(lec, Lectionary)
 
+    def test_source_url_has_unpadded_date(self):
+        from lectionary.orthodox_russian import OrthodoxRussianLectionary
+        lec = OrthodoxRussianLectionary.__new__(OrthodoxRussianLectionary)
+        lec.today = datetime.date(2026, 3, 8)
+        url = lec.source_url()
+        self.assertIn('month=3&today=8&year=2026&', url)
+
 
 class TestRevisedCommonLectionary(unittest.TestCase):
     """Integration tests for RevisedCommonLectionary."""
@@ -886,58 +1435,694 @@ class TestE2ELectionaryFlow(unittest.TestCase):
             self.assertIsInstance(result, list)
 
 
-class TestInjectCombinedLink(unittest.TestCase):
-    """Unit tests for the _inject_combined_link static method."""
+class TestRenderedEmbed(unittest.TestCase):
+    """Unit tests for rendered embeds carrying their references."""
 
-    def test_inject_from_fields(self):
-        """Should extract refs from fields and add combined link to description."""
-        import re
+    def test_references_collected_by_convert(self):
+        """convert/html_convert should collect the references they link."""
         from helpers import bible_url
-        
-        piece = {
-            'title': 'Test',
-            'description': 'Original description',
-            'fields': [
-                {'name': 'Reading', 'value': '[Genesis 1:1](https://biblegateway.com/passage/?search=Ge+1:1)'}
-            ]
-        }
-        
-        # Simulate _inject_combined_link logic
-        all_refs_text = ' '.join(f.get('value', '') for f in piece.get('fields', []))
-        all_refs_text += ' ' + piece.get('description', '')
-        markdown_refs = re.findall(r'\[([^\]]+)\]\(https://biblegateway\.com/passage/\?search=', all_refs_text)
-        
-        self.assertEqual(markdown_refs, ['Genesis 1:1'])
-
-    def test_inject_from_description(self):
-        """Should extract refs from description (Armenian-style)."""
-        import re
-        
-        piece = {
-            'title': 'Test',
-            'description': '[Wisdom 9:9-12](https://biblegateway.com/passage/?search=Ws+9:9-12&version=NRSVCE)\n[Isaiah 41:15-19](https://biblegateway.com/passage/?search=Is+41:15-19)'
+        references = []
+        bible_url.html_convert('<a>Genesis 1:1</a> and <a>Not a verse</a>', references)
+        bible_url.convert('Psalm 23:1-6', references)
+        self.assertEqual([r.text for r in references], ['Genesis 1:1', 'Psalm 23:1-6'])
+
+    def test_combined_link_computed_once(self):
+        from helpers.bible_url import build_combined_url, parse
+        from lectionary.base import RenderedEmbed
+        embed = RenderedEmbed.build({'title': 'Test'}, [parse('Genesis 1:1'), parse('Wisdom 9:9')])
+        self.assertEqual(embed.combined_link, build_combined_url(['Genesis 1:1', 'Wisdom 9:9']))
+
+    def test_with_combined_link_fields(self):
+        """Embeds with fields should get the link as a new field, without modifying the payload."""
+        from helpers.bible_url import parse
+        from lectionary.base import RenderedEmbed
+        payload = {'title': 'Test', 'fields': [{'name': 'Reading', 'value': 'x'}]}
+        embed = RenderedEmbed.build(payload, [parse('Genesis 1:1')])
+        piece = embed.with_combined_link()
+        self.assertEqual(len(piece['fields']), 2)
+        self.assertIn('Read all on Bible Gateway', piece['fields'][-1]['value'])
+        self.assertEqual(len(payload['fields']), 1)
+
+    def test_with_combined_link_description(self):
+        """Description-only embeds should get the link appended to the description."""
+        from helpers.bible_url import parse
+        from lectionary.base import RenderedEmbed
+        embed = RenderedEmbed.build({'description': 'Readings'}, [parse('Isaiah 41:15-19')])
+        self.assertTrue(embed.with_combined_link()['description'].startswith('Readings\n\n'))
+
+    def test_with_combined_link_without_description(self):
+        """An embed with neither fields nor a description gets the link as its description."""
+        from helpers.bible_url import parse
+        from lectionary.base import RenderedEmbed
+        embed = RenderedEmbed.build({'title': 'Test'}, [parse('Genesis 1:1')])
+        self.assertEqual(embed.with_combined_link()['description'], embed.combined_link)
+        self.assertNotIn('description', embed.payload)
+
+    def test_no_references_no_link(self):
+        from lectionary.base import RenderedEmbed
+        embed = RenderedEmbed.build({'description': 'St. John the Baptist'})
+        self.assertEqual(embed.with_combined_link(), {'description': 'St. John the Baptist'})
+
+    def test_render_cached_on_snapshot(self):
+        """A frozen snapshot should be rendered only once."""
+        fake = _make_fake_lectionary_class([True])
+        lec = fake()
+        lec.freeze()
+        self.assertIs(lec.render(), lec.render())
+        self.assertEqual(lec.build_json(), [{'title': lec.title}])
+
+    def test_render_invalidated_by_changes(self):
+        fake = _make_fake_lectionary_class([True])
+        lec = fake()
+        first = lec.render()
+        lec.title = 'Changed'
+        self.assertIsNot(lec.render(), first)
+        self.assertEqual(lec.render()[0].payload['title'], 'Changed')
+
+
+class TestImmutablePayloads(unittest.TestCase):
+    """Unit tests for frozen, copy-on-write embed payloads."""
+
+    def test_rendered_payload_is_read_only(self):
+        from lectionary.base import RenderedEmbed
+        embed = RenderedEmbed.build({'title': 'Test', 'fields': [{'name': 'Reading', 'value': 'x'}]})
+        with self.assertRaises(TypeError):
+            embed.payload['title'] = 'Changed'
+        with self.assertRaises(TypeError):
+            embed.payload['fields'][0]['value'] = 'y'
+        with self.assertRaises(AttributeError):
+            embed.payload['fields'].append({})
+
+    def test_variant_shares_unchanged_parts(self):
+        from helpers.bible_url import parse
+        from lectionary.base import RenderedEmbed
+        embed = RenderedEmbed.build({'title': 'Test', 'footer': {'text': 'f'},
+                                     'fields': [{'name': 'Reading', 'value': 'x'}]}, [parse('Genesis 1:1')])
+        variant = embed.with_combined_link()
+        self.assertIs(variant['footer'], embed.payload['footer'])
+        self.assertIs(variant['fields'][0], embed.payload['fields'][0])
+        self.assertEqual(len(embed.payload['fields']), 1)
+
+    def test_frozen_payload_serializes_and_pickles(self):
+        import json
+        import pickle
+        from helpers.immutable import FrozenDict, freeze, thaw
+        payload = {'title': 'Test', 'fields': [{'name': 'a', 'value': 'b'}]}
+        frozen = freeze(payload)
+        self.assertEqual(json.loads(json.dumps(frozen)), payload)
+        self.assertEqual(thaw(frozen), payload)
+        restored = pickle.loads(pickle.dumps(frozen))
+        self.assertIsInstance(restored, FrozenDict)
+        self.assertEqual(restored, frozen)
+
+    def test_discord_embed_from_frozen_payload(self):
+        import json
+        import discord
+        from helpers.immutable import freeze
+        payload = {'title': 'Test', 'color': 1, 'fields': [{'name': 'a', 'value': 'b', 'inline': False}],
+                   'footer': {'text': 'f'}}
+        embed = discord.Embed.from_dict(freeze(payload))
+        self.assertEqual(embed.fields[0].value, 'b')
+        sent = json.loads(json.dumps(embed.to_dict()))
+        self.assertEqual(sent['fields'], payload['fields'])
+        self.assertEqual(sent['footer'], payload['footer'])
+
+    def test_build_json_returns_mutable_copies(self):
+        fake = _make_fake_lectionary_class([True])
+        lec = fake()
+        lec.freeze()
+        pieces = lec.build_json()
+        pieces[0]['title'] = 'Changed'
+        self.assertNotEqual(lec.render()[0].payload['title'], 'Changed')
+
+
+class TestRenderCache(unittest.TestCase):
+    """Unit tests for the render-once cache used by subscription pushes."""
+
+    def _run(self, keys):
+        import asyncio
+        from helpers.render_cache import RenderCache
+        cache = RenderCache()
+        builds = []
+
+        async def get(key):
+            async def build():
+                builds.append(key)
+                await asyncio.sleep(0)
+                return ['embed', key]
+            return await cache.get(key, build)
+
+        async def main():
+            return await asyncio.gather(*(get(key) for key in keys))
+
+        return asyncio.run(main()), builds
+
+    def test_same_variant_built_once(self):
+        import datetime
+        from helpers.render_cache import RenderKey
+        key = RenderKey(0, datetime.date(2024, 1, 1), True, 'v1')
+        results, builds = self._run([key] * 50)
+        self.assertEqual(len(builds), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_variants_built_separately(self):
+        import datetime
+        from helpers.render_cache import RenderKey
+        day = datetime.date(2024, 1, 1)
+        keys = [RenderKey(0, day, True, 'v1'), RenderKey(0, day, False, 'v1'),
+                RenderKey(1, day, True, 'v1'), RenderKey(0, day, True, 'v2')]
+        # The v2 render replaces v1 for lectionary 0 with combined links
+        _, builds = self._run(keys + keys[1:])
+        self.assertEqual(builds, keys)
+
+    def test_failed_build_not_cached(self):
+        import asyncio
+        import datetime
+        from helpers.render_cache import RenderCache, RenderKey
+        cache = RenderCache()
+        key = RenderKey(0, datetime.date(2024, 1, 1), False, 'v1')
+        attempts = []
+
+        async def build():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError('boom')
+            return ['embed']
+
+        async def main():
+            with self.assertRaises(RuntimeError):
+                await cache.get(key, build)
+            return await cache.get(key, build)
+
+        self.assertEqual(asyncio.run(main()), ['embed'])
+        self.assertEqual(len(attempts), 2)
+
+
+class TestDelivery(unittest.TestCase):
+    """Unit tests for the concurrent delivery engine."""
+
+    def test_parallel_and_bounded(self):
+        """Channels should be sent to in parallel, never more than the limit at once."""
+        import asyncio
+        from helpers.delivery import DeliveryJob, deliver
+        active = []
+        peak = []
+
+        async def send(target, item):
+            active.append(item)
+            peak.append(len(active))
+            await asyncio.sleep(0.01)
+            active.remove(item)
+
+        jobs = [DeliveryJob(i, i, [f'{i}-a', f'{i}-b']) for i in range(20)]
+        report = asyncio.run(deliver(jobs, send, concurrency=4))
+
+        self.assertEqual(report.delivered, 20)
+        self.assertEqual(report.sends, 40)
+        self.assertEqual(max(peak), 4)
+
+    def test_per_channel_order(self):
+        """Each channel's items should arrive in order, even across duplicate jobs."""
+        import asyncio
+        import random
+        from helpers.delivery import DeliveryJob, deliver
+        received = {}
+
+        async def send(target, item):
+            await asyncio.sleep(random.random() / 1000)
+            received.setdefault(target, []).append(item)
+
+        jobs = [DeliveryJob(i % 5, i % 5, [i * 10 + n for n in range(3)]) for i in range(15)]
+        asyncio.run(deliver(jobs, send, concurrency=8))
+
+        for channel, items in received.items():
+            self.assertEqual(items, sorted(items))
+            self.assertEqual(len(items), 9)
+
+    def test_failure_isolated(self):
+        import asyncio
+        from helpers.delivery import DeliveryJob, deliver
+
+        async def send(target, item):
+            if target == 'broken':
+                raise RuntimeError('Missing Access')
+
+        jobs = [DeliveryJob('broken', 'broken', ['x']), DeliveryJob('ok', 'ok', ['x', 'y'])]
+        report = asyncio.run(deliver(jobs, send))
+
+        self.assertEqual((report.delivered, report.failed, report.sends), (1, 1, 2))
+
+    def test_plan_is_stable_and_spread(self):
+        """Channels should land at the same place in the window every time, spread across it."""
+        from helpers.delivery import DeliveryJob, plan
+        jobs = [DeliveryJob(channel_id, None, ['x']) for channel_id in range(1000, 1400)]
+        first = {job.key: job.delay for job in plan(jobs, 1800)}
+        second = {job.key: job.delay for job in plan(reversed(jobs), 1800)}
+
+        self.assertEqual(first, second)
+        self.assertTrue(all(0 <= delay < 1800 for delay in first.values()))
+        # Roughly even: every ten-minute third of the window gets a fair share
+        thirds = [sum(1 for delay in first.values() if n * 600 <= delay < (n + 1) * 600) for n in range(3)]
+        self.assertTrue(all(count > 80 for count in thirds), thirds)
+
+    def test_plan_offset_independent_of_slot_size(self):
+        """A channel's place in the window shouldn't move as others join or leave its slot."""
+        from helpers.delivery import DeliveryJob, plan
+        alone, = plan([DeliveryJob(1234, None, ['x'])], 300)
+        crowded = {job.key: job.delay for job in plan([DeliveryJob(key, None, ['x']) for key in range(1200, 1300)], 300)}
+        self.assertEqual(alone.delay, crowded[1234])
+
+    def test_plan_late_start(self):
+        """Jobs whose time already passed should be due immediately."""
+        from helpers.delivery import DeliveryJob, plan, slot
+        jobs = plan([DeliveryJob(key, None, ['x']) for key in range(100)], 600, elapsed=300)
+        for job in jobs:
+            self.assertAlmostEqual(job.delay, max(0.0, slot(job.key) * 600 - 300))
+        self.assertEqual([job.delay for job in jobs], sorted(job.delay for job in jobs))
+
+    def test_deliver_waits_for_delay(self):
+        import asyncio
+        import time
+        from helpers.delivery import DeliveryJob, deliver
+        sent = {}
+
+        async def send(target, item):
+            sent[target] = time.monotonic()
+
+        start = time.monotonic()
+        asyncio.run(deliver([DeliveryJob('late', 'late', ['x'], 0.05), DeliveryJob('now', 'now', ['x'])], send))
+
+        self.assertLess(sent['now'] - start, 0.04)
+        self.assertGreaterEqual(sent['late'] - start, 0.05)
+
+    def test_claim_and_settle(self):
+        """Jobs that can't be claimed are skipped; claimed jobs are settled with their outcome."""
+        import asyncio
+        from helpers.delivery import DeliveryJob, deliver
+        claimed = {'a': True, 'b': False, 'c': True}
+        settled = {}
+        sent = []
+
+        async def send(target, item):
+            if target == 'c':
+                raise RuntimeError('Missing Permissions')
+            sent.append(target)
+
+        jobs = [DeliveryJob(key, key, ['x'], tag=key) for key in 'abc']
+        report = asyncio.run(deliver(
+            jobs, send,
+            claim=lambda job: claimed[job.tag],
+            settle=lambda job, succeeded: settled.__setitem__(job.tag, succeeded)))
+
+        self.assertEqual(sent, ['a'])
+        self.assertEqual(settled, {'a': True, 'c': False})
+        self.assertEqual((report.delivered, report.failed, report.skipped), (1, 1, 1))
+
+    def test_claimed_once_across_runs(self):
+        """A job delivered by an interrupted run shouldn't be sent again when resumed."""
+        import asyncio
+        from helpers.delivery import DeliveryJob, deliver
+        status = {key: 'pending' for key in range(10)}
+        sent = []
+
+        def claim(job):
+            if status[job.tag] != 'pending':
+                return False
+            status[job.tag] = 'sending'
+            return True
+
+        def settle(job, succeeded):
+            status[job.tag] = 'done' if succeeded else 'failed'
+
+        async def send(target, item):
+            sent.append(target)
+
+        jobs = [DeliveryJob(key, key, ['x'], tag=key) for key in range(10)]
+        asyncio.run(deliver(jobs[:4], send, claim=claim, settle=settle))
+        asyncio.run(deliver(jobs, send, claim=claim, settle=settle))
+
+        self.assertEqual(sorted(sent), list(range(10)))
+
+    def test_failures_classified_per_channel(self):
+        """A permanent failure should stop the channel's later jobs from being sent, but no one else's."""
+        import asyncio
+        from helpers.delivery import DeliveryJob, Failure, deliver
+        sent = []
+
+        class Gone(Exception):
+            pass
+
+        async def send(target, item):
+            if target == 'gone':
+                raise Gone()
+            if target == 'flaky':
+                raise RuntimeError('503')
+            sent.append(target)
+
+        def classify(error):
+            return Failure.PERMANENT if isinstance(error, Gone) else Failure.TRANSIENT
+
+        jobs = [DeliveryJob(key, key, ['x'], tag=(key, n)) for key in ('gone', 'flaky', 'ok') for n in range(2)]
+        settled = []
+        report = asyncio.run(deliver(jobs, send, classify=classify,
+                                     settle=lambda job, succeeded: settled.append((job.tag, succeeded))))
+
+        self.assertEqual(sent, ['ok', 'ok'])
+        self.assertEqual(report.failed_keys(Failure.PERMANENT), ['gone'])
+        self.assertEqual(report.failed_keys(Failure.TRANSIENT), ['flaky'])
+        self.assertEqual(report.delivered_keys, ['ok'])
+        self.assertEqual((report.delivered, report.failed), (2, 4))
+        # Skipped jobs are still settled as failed
+        self.assertIn((('gone', 1), False), settled)
+        self.assertIn('1 permanent', report.summary())
+
+    def test_report_percentiles(self):
+        from helpers.delivery import DeliveryReport
+        report = DeliveryReport(1, 0, 100, 2.0, [i / 1000 for i in range(1, 101)])
+        self.assertEqual(report.throughput, 50.0)
+        self.assertAlmostEqual(report.p50, 0.051)
+        self.assertAlmostEqual(report.p99, 0.099)
+        self.assertIn('p99', report.summary())
+
+
+class TestCleanupQueue(unittest.TestCase):
+    """Unit tests for the batched guild and channel cleanup."""
+
+    def _queue(self, fail=False):
+        from helpers.cleanup import CleanupQueue
+        batches = []
+
+        def purge(kind):
+            def run(ids):
+                if fail:
+                    raise RuntimeError('database is down')
+                batches.append((kind, sorted(ids)))
+                return len(ids)
+            return run
+
+        return CleanupQueue(purge('guilds'), purge('channels')), batches
+
+    def test_events_flushed_in_one_batch_each(self):
+        queue, batches = self._queue()
+        queue.guild_removed(1)
+        queue.guild_removed(2)
+        queue.channel_deleted(10)
+        queue.channel_deleted(11)
+        queue.channel_deleted(10)
+        self.assertEqual(tuple(queue.flush()), (2, 2))
+        self.assertEqual(batches, [('guilds', [1, 2]), ('channels', [10, 11])])
+        # Nothing left for the next flush
+        self.assertEqual(tuple(queue.flush()), (0, 0))
+        self.assertEqual(len(batches), 2)
+
+    def test_failed_flush_is_requeued(self):
+        queue, _ = self._queue(fail=True)
+        queue.guild_removed(1)
+        queue.channel_deleted(10)
+        self.assertEqual(tuple(queue.flush()), (0, 0))
+        queue.channel_deleted(11)
+        self.assertEqual(queue.guilds, {1})
+        self.assertEqual(queue.channels, {10, 11})
+
+    def test_rejoined_guild_is_kept(self):
+        queue, batches = self._queue()
+        queue.guild_removed(1)
+        queue.reconcile([], [10, 11], lambda guild_id: True, lambda channel_id: False)
+        queue.guild_joined(1, [10])
+        queue.flush()
+        self.assertEqual(batches, [('channels', [11])])
+
+    def test_reconcile_queues_what_is_gone(self):
+        queue, _ = self._queue()
+        gone = queue.reconcile([1, 2, 3], [10, 11], lambda guild_id: guild_id != 2,
+                               lambda channel_id: channel_id == 10)
+        self.assertEqual(tuple(gone), (1, 1))
+        self.assertEqual(queue.guilds, {2})
+        self.assertEqual(queue.channels, {11})
+
+
+class TestSchedule(unittest.TestCase):
+    """Unit tests for per-guild delivery schedules."""
+
+    def test_next_fire_in_local_time(self):
+        from helpers.schedule import Schedule
+        schedule = Schedule(7, 30, 'America/New_York')
+        # 7:30 EST is 12:30 UTC
+        self.assertEqual(schedule.next_fire(datetime.datetime(2026, 1, 15, 12, 0)),
+                         datetime.datetime(2026, 1, 15, 12, 30))
+        # Strictly after: once it has fired, the next one is tomorrow
+        self.assertEqual(schedule.next_fire(datetime.datetime(2026, 1, 15, 12, 30)),
+                         datetime.datetime(2026, 1, 16, 12, 30))
+        # After UTC midnight it's still the previous day in New York
+        self.assertEqual(schedule.next_fire(datetime.datetime(2026, 1, 16, 3, 0)),
+                         datetime.datetime(2026, 1, 16, 12, 30))
+
+    def test_next_fire_across_daylight_saving(self):
+        from helpers.schedule import Schedule
+        schedule = Schedule(7, 0, 'America/New_York')
+        # EST (UTC-5) before the change on March 8, 2026; EDT (UTC-4) after
+        self.assertEqual(schedule.next_fire(datetime.datetime(2026, 3, 7, 13, 0)),
+                         datetime.datetime(2026, 3, 8, 11, 0))
+        # 2:30 doesn't exist that day; it fires once the clocks have gone forward
+        skipped = Schedule(2, 30, 'America/New_York')
+        self.assertEqual(skipped.next_fire(datetime.datetime(2026, 3, 8, 0, 0)),
+                         datetime.datetime(2026, 3, 8, 7, 30))
+        # 1:30 happens twice on November 1, 2026; it fires the first time
+        repeated = Schedule(1, 30, 'America/New_York')
+        self.assertEqual(repeated.next_fire(datetime.datetime(2026, 11, 1, 0, 0)),
+                         datetime.datetime(2026, 11, 1, 5, 30))
+        self.assertEqual(repeated.next_fire(datetime.datetime(2026, 11, 1, 5, 30)),
+                         datetime.datetime(2026, 11, 2, 6, 30))
+
+    def test_local_date_keys_fires_across_daylight_saving(self):
+        """Two evenings can fire on one UTC date when the clocks go forward; each keeps its own day."""
+        from helpers.schedule import Schedule
+        schedule = Schedule(19, 30, 'America/New_York')
+        first = schedule.next_fire(datetime.datetime(2026, 3, 7, 12, 0))
+        second = schedule.next_fire(first)
+        self.assertEqual(first, datetime.datetime(2026, 3, 8, 0, 30))
+        self.assertEqual(second, datetime.datetime(2026, 3, 8, 23, 30))
+        self.assertEqual([schedule.local_date(first), schedule.local_date(second)],
+                         [datetime.date(2026, 3, 7), datetime.date(2026, 3, 8)])
+
+    def test_parse_time(self):
+        from helpers.schedule import Schedule, parse_time
+        self.assertEqual(parse_time('7'), Schedule(7, 0, ''))
+        self.assertEqual(parse_time('19:30'), Schedule(19, 30, ''))
+        self.assertEqual(parse_time('7pm'), Schedule(19, 0, ''))
+        self.assertEqual(parse_time('12 am'), Schedule(0, 0, ''))
+        self.assertEqual(parse_time('7:30 am america/new_york'), Schedule(7, 30, 'America/New_York'))
+        self.assertEqual(parse_time('9 GMT'), Schedule(9, 0, 'UTC'))
+        for invalid in ('', '24', '7:60', '13pm', 'noon', '7 Mars/Olympus'):
+            self.assertIsNone(parse_time(invalid), invalid)
+
+    def test_morning_east_of_utc_keeps_local_date(self):
+        """7 AM in Sydney fires on the previous UTC date but is delivered for the guild's own."""
+        from helpers.schedule import Schedule
+        sydney = Schedule(7, 0, 'Australia/Sydney')
+        fire = sydney.next_fire(datetime.datetime(2026, 3, 9, 12, 0))
+        self.assertEqual(fire, datetime.datetime(2026, 3, 9, 20, 0))
+        self.assertEqual(sydney.local_date(fire), datetime.date(2026, 3, 10))
+
+    def test_describe(self):
+        from helpers.schedule import Schedule
+        self.assertEqual(Schedule(0).describe(), '12:00 AM (GMT)')
+        self.assertEqual(Schedule(19, 5, 'Europe/Athens').describe(), '7:05 PM (Europe/Athens)')
+
+
+class TestPushPlan(unittest.TestCase):
+    """Unit tests for the day's push plan."""
+
+    def test_slots_and_hourly_stats(self):
+        from helpers.push_plan import HourStats, PlanEntry, PushPlan
+        day = datetime.date(2026, 1, 15)
+        at = lambda hour, minute: datetime.datetime(2026, 1, 15, hour, minute)
+        plan = PushPlan.build(day, [
+            (at(7, 0), 1, 0, True, 'UTC'),
+            (at(7, 0), 2, 0, True, 'UTC'),
+            (at(7, 0), 3, 1, False, 'Pacific/Auckland'),
+            (at(7, 30), 4, 0, True, 'UTC'),
+            (at(12, 30), 5, 2, True, 'UTC'),
+        ])
+
+        slot = plan.slot(at(7, 0))
+        # Entries carry the guild's local date, which keys their outbox job
+        self.assertEqual(slot.entries[2], PlanEntry(3, 1, False, datetime.date(2026, 1, 15)))
+        self.assertEqual(slot.entries[0].delivery_date, day)
+        self.assertEqual(slot.variants, {(0, True), (1, False)})
+        self.assertEqual(slot.readings, {(0, day), (1, day)})
+        self.assertIsNone(plan.slot(at(8, 0)))
+        self.assertEqual(plan.hourly_stats(), [HourStats(7, 2, 4, 3), HourStats(12, 1, 1, 1)])
+        self.assertTrue(plan.summary().startswith('Push plan for 2026-01-15: 5 deliveries in 3 slots'))
+
+    def test_bounds_cover_the_utc_day(self):
+        from helpers.push_plan import PushPlan
+        self.assertEqual(PushPlan.bounds(datetime.date(2026, 1, 15)),
+                         (datetime.datetime(2026, 1, 15), datetime.datetime(2026, 1, 16)))
+
+
+class TestEmbedPacking(unittest.TestCase):
+    """Unit tests for packing embeds into messages."""
+
+    def test_embed_length(self):
+        from helpers.embed_layout import embed_length
+        payload = {
+            'title': 'abc',
+            'description': 'de',
+            'fields': [{'name': 'f', 'value': 'ghij', 'inline': False}],
+            'footer': {'text': 'kl'},
+            'author': {'name': 'm', 'url': 'https://example.com/not-counted'},
+            'color': 0xFFFFFF,
         }
-        
-        all_refs_text = piece.get('description', '')
-        markdown_refs = re.findall(r'\[([^\]]+)\]\(https://biblegateway\.com/passage/\?search=', all_refs_text)
-        
-        self.assertEqual(len(markdown_refs), 2)
-        self.assertIn('Wisdom 9:9-12', markdown_refs)
-        self.assertIn('Isaiah 41:15-19', markdown_refs)
-
-    def test_no_injection_when_no_refs(self):
-        """Should not modify piece if no Bible references found."""
-        import re
-        
-        piece = {
-            'title': 'Saints & Feasts',
-            'description': 'St. John the Baptist'
+        self.assertEqual(embed_length(payload), 13)
+
+    def test_small_embeds_share_a_message(self):
+        """Four small embeds (e.g. Russian) should go out as one message."""
+        from helpers.embed_layout import pack
+        payloads = [{'title': str(n), 'description': 'x' * 100} for n in range(4)]
+        self.assertEqual(pack(payloads), [payloads])
+
+    def test_character_limit_splits_in_order(self):
+        from helpers.embed_layout import pack
+        payloads = [{'description': 'x' * 2500, 'title': str(n)} for n in range(5)]
+        messages = pack(payloads)
+        self.assertEqual([len(m) for m in messages], [2, 2, 1])
+        self.assertEqual([p for m in messages for p in m], payloads)
+
+    def test_embed_count_limit(self):
+        from helpers.embed_layout import pack
+        payloads = [{'title': str(n)} for n in range(23)]
+        self.assertEqual([len(m) for m in pack(payloads)], [10, 10, 3])
+
+    def test_empty(self):
+        from helpers.embed_layout import pack
+        self.assertEqual(pack([]), [])
+
+    def test_fitting_embed_is_untouched(self):
+        from helpers.embed_layout import fit
+        payload = {'title': 't', 'fields': [{'name': 'n', 'value': 'v', 'inline': False}], 'color': 1}
+        self.assertIs(fit(payload)[0], payload)
+        self.assertEqual(len(fit(payload)), 1)
+
+    def test_long_title_is_truncated(self):
+        from helpers.embed_layout import fit
+        piece, = fit({'title': 'x' * 300})
+        self.assertEqual(len(piece['title']), 256)
+        self.assertTrue(piece['title'].endswith('[truncated]'))
+
+    def test_long_field_continues_in_next_field(self):
+        from helpers.embed_layout import fit, within_limits, CONTINUATION_NAME
+        lines = '\n'.join(f'line {n} ' + 'x' * 40 for n in range(60))
+        pieces = fit({'title': 'Troparia', 'color': 1, 'fields': [{'name': 'Tone 8', 'value': lines, 'inline': False}]})
+        self.assertEqual(len(pieces), 1)
+        fields = pieces[0]['fields']
+        self.assertGreater(len(fields), 1)
+        self.assertEqual(fields[0]['name'], 'Tone 8')
+        self.assertTrue(all(field['name'] == CONTINUATION_NAME for field in fields[1:]))
+        self.assertEqual('\n'.join(field['value'] for field in fields), lines)
+        self.assertTrue(within_limits(pieces[0]))
+
+    def test_oversized_embed_splits_across_embeds(self):
+        from helpers.embed_layout import embed_length, fit, pack, within_limits
+        payload = {
+            'title': 'Synaxarium',
+            'description': ' '.join(['word'] * 2000),
+            'fields': [{'name': f'Saint {n}', 'value': 'y' * 900, 'inline': False} for n in range(30)],
+            'footer': {'text': 'footer'},
+            'color': 7,
         }
-        
-        all_refs_text = piece.get('description', '')
-        markdown_refs = re.findall(r'\[([^\]]+)\]\(https://biblegateway\.com/passage/\?search=', all_refs_text)
-        
-        self.assertEqual(markdown_refs, [])
+        pieces = fit(payload)
+        self.assertGreater(len(pieces), 1)
+        self.assertTrue(all(within_limits(piece) for piece in pieces))
+        self.assertEqual(pieces[0]['title'], 'Synaxarium')
+        self.assertNotIn('title', pieces[1])
+        self.assertEqual(pieces[-1]['footer'], {'text': 'footer'})
+        self.assertTrue(all(piece['color'] == 7 for piece in pieces))
+        self.assertEqual(' '.join(piece.get('description', '') for piece in pieces).split(), ['word'] * 2000)
+        names = [field['name'] for piece in pieces for field in piece.get('fields', ())]
+        self.assertEqual(names, [f'Saint {n}' for n in range(30)])
+        for message in pack([payload]):
+            self.assertLessEqual(sum(map(embed_length, message)), 6000)
+
+
+class TestWebhookDelivery(unittest.TestCase):
+    """Unit tests for webhook payload serialization and execution."""
+
+    class FakeResponse:
+        def __init__(self, status, headers=None, body=None, content_type='application/json'):
+            self.status = status
+            self.headers = headers or {}
+            self.body = body or {}
+            self.content_type = content_type
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def json(self):
+            return self.body
+
+        async def text(self):
+            return str(self.body)
+
+    class FakeSession:
+        closed = False
+
+        def __init__(self, responses):
+            self.responses = list(responses)
+            self.posts = []
+
+        def post(self, url, data=None):
+            self.posts.append((url, data))
+            return self.responses.pop(0)
+
+    def test_serialize_messages(self):
+        import json
+        from helpers.webhook import serialize_messages
+        bodies = serialize_messages([[{'title': 'a'}, {'title': 'b'}], [{'title': 'é'}]], 'Lector', 'https://x/a.png')
+        self.assertEqual(len(bodies), 2)
+        self.assertIsInstance(bodies[0], bytes)
+        self.assertEqual(json.loads(bodies[0]), {'username': 'Lector', 'avatar_url': 'https://x/a.png',
+                                                 'embeds': [{'title': 'a'}, {'title': 'b'}]})
+        self.assertEqual(json.loads(bodies[1])['embeds'], [{'title': 'é'}])
+
+    def test_execute_posts_body(self):
+        import asyncio
+        from helpers.webhook import ManagedWebhook, WebhookClient
+        session = self.FakeSession([self.FakeResponse(204)])
+        hook = ManagedWebhook(1, 2, 'tok')
+        asyncio.run(WebhookClient(session).execute(hook, b'{}'))
+        self.assertEqual(session.posts, [('https://discord.com/api/v10/webhooks/2/tok', b'{}')])
+
+    def test_execute_retries_after_rate_limit(self):
+        import asyncio
+        from helpers.webhook import ManagedWebhook, WebhookClient
+        session = self.FakeSession([self.FakeResponse(429, body={'retry_after': 0.01}),
+                                    self.FakeResponse(200)])
+        asyncio.run(WebhookClient(session).execute(ManagedWebhook(1, 2, 'tok'), b'{}'))
+        self.assertEqual(len(session.posts), 2)
+
+    def test_rate_limit_without_json_uses_retry_after_header(self):
+        import asyncio
+        from helpers.webhook import ManagedWebhook, WebhookClient
+
+        class HtmlResponse(self.FakeResponse):
+            async def json(self):
+                raise AssertionError('body is not JSON')
+
+        session = self.FakeSession([HtmlResponse(429, headers={'Retry-After': '0.01'}, content_type='text/html'),
+                                    self.FakeResponse(204)])
+        asyncio.run(WebhookClient(session).execute(ManagedWebhook(1, 2, 'tok'), b'{}'))
+        self.assertEqual(len(session.posts), 2)
+
+    def test_deleted_webhook_raises_gone(self):
+        import asyncio
+        from helpers.webhook import ManagedWebhook, WebhookClient, WebhookGone
+        session = self.FakeSession([self.FakeResponse(404)])
+        with self.assertRaises(WebhookGone):
+            asyncio.run(WebhookClient(session).execute(ManagedWebhook(1, 2, 'tok'), b'{}'))
 
 
 class TestE2EBibleUrlFlow(unittest.TestCase):